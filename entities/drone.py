@@ -4,7 +4,7 @@ import numpy as np
 import random
 import math
 import queue
-from entities.packet import DataPacket
+from entities.packet import DataPacket, RtsPacket, CtsPacket, AggregatedPacket, BlockAckPacket
 from routing.dsdv.dsdv import Dsdv
 from routing.greedy.greedy import Greedy
 from routing.grad.grad import Grad
@@ -12,6 +12,10 @@ from routing.opar.opar import Opar
 from routing.q_routing.q_routing import QRouting
 from mac.csma_ca import CsmaCa
 from mac.pure_aloha import PureAloha
+from mac.slotted_aloha import SlottedAloha
+from mac.p_persistent_csma import PPersistentCsma
+from mac.tdma import Tdma
+from mac.analytical_csma_ca import AnalyticalCsmaCa
 from mobility.gauss_markov_3d import GaussMarkov3D
 from mobility.random_walk_3d import RandomWalk3D
 from mobility.random_waypoint_3d import RandomWaypoint3D
@@ -19,7 +23,7 @@ from topology.virtual_force.vf_motion_control import VfMotionController
 from energy.energy_model import EnergyModel
 from utils import config
 from utils.util_function import has_intersection
-from phy.large_scale_fading import sinr_calculator
+from phy.large_scale_fading import sinr_calculator, sic_decoder
 
 # config logging
 logging.basicConfig(filename='running_log.log',
@@ -62,12 +66,22 @@ class Drone:
         waiting_list: for reactive routing protocol, if there is no available next hop, it will put the data packet into
                       "waiting_list". Once the routing information bound for a destination is obtained, drone will get
                       the data packets related to this destination, and put them into "transmitting_queue"
-        mac_protocol: installed mac protocol (CSMA/CA, ALOHA, etc.)
+        mac_protocol: installed mac protocol (CSMA/CA, pure or slotted ALOHA, p-persistent CSMA, TDMA, abstract CSMA/CA,
+                      etc.)
         mac_process_dict: a dictionary, used to store the mac_process that is launched each time
         mac_process_finish: a dictionary, used to indicate the completion of the process
         mac_process_count: used to distinguish between different "mac_send" processes
         enable_blocking: describe whether the process of waiting for an ACK blocks the delivery of subsequent packets
-                         1: stop-and-wait protocol; 0: sliding window (need further implemented)
+                         1: stop-and-wait protocol; 0: sliding window, at most "window_size" frames towards each
+                         next hop (and "max_outstanding_num" frames in total) can wait for their ACKs at the same
+                         time, see the installed mac protocol
+        window_deferred_packets: in sliding window mode, the data packets whose next hop has a full window, they are set
+                                 aside so that the packets towards the other next hops are not blocked
+        enable_sic: receive the overlapping packets with successive interference cancellation (SIC) or not
+                    1: decode the strongest packet, cancel it and try the remaining ones; 0: only the packet with the
+                    maximum SINR can be received
+        sic_depth: maximum number of overlapping packets decoded on a channel when SIC is enabled
+        sic_residual_error: fraction of the power of a decoded packet that remains after cancellation
         routing_protocol: routing protocol installed (GPSR, DSDV, etc.)
         mobility_model: mobility model installed (3-D Gauss-markov, 3-D random waypoint, etc.)
         energy_model: energy consumption model installed
@@ -76,7 +90,7 @@ class Drone:
 
     Author: Zihao Zhou, eezihaozhou@gmail.com
     Created at: 2024/1/11
-    Updated at: 2025/1/7
+    Updated at: 2026/10/19
     """
 
     def __init__(self,
@@ -117,6 +131,13 @@ class Drone:
         self.mac_process_finish = dict()
         self.mac_process_count = 0
         self.enable_blocking = 1  # enable "stop-and-wait" protocol
+        self.window_deferred_packets = []
+
+        self.enable_sic = 0
+        self.sic_depth = 2
+        self.sic_residual_error = 0.01
+        self.sic_decoded_frames = []  # the packets decoded recently, used when SIC is enabled
+        self.sic_failed_frames = []  # the packets that could not be decoded recently, used when SIC is enabled
 
         self.routing_protocol = Greedy(self.simulator, self)
 
@@ -193,7 +214,8 @@ class Drone:
     def blocking(self):
         """
         The process of waiting for an ACK will block subsequent incoming data packets to simulate the
-        "head-of-line blocking problem"
+        "head-of-line blocking problem". In sliding window mode, the drone is blocked only when the number of
+        unacknowledged frames reaches the upper limit
         :return: none
         """
 
@@ -209,7 +231,7 @@ class Drone:
                 else:
                     flag = False  # there is currently no waiting process for ACK
         else:
-            flag = False
+            flag = self.mac_protocol.get_outstanding_num() >= self.mac_protocol.max_outstanding_num
 
         return flag
 
@@ -233,7 +255,15 @@ class Drone:
                 yield self.env.timeout(10)  # for speed up the simulation
 
                 if not self.blocking():
-                    if not self.transmitting_queue.empty():
+                    deferred_packet = self.get_deferred_packet()
+
+                    if deferred_packet is not None:
+                        if self.mac_protocol.enable_aggregation:
+                            deferred_packet = self.mac_protocol.aggregate(deferred_packet)
+
+                        yield self.env.process(self.packet_coming(deferred_packet))
+
+                    elif not self.transmitting_queue.empty():
                         packet = self.transmitting_queue.get()  # get the packet at the head of the queue
 
                         if self.env.now < packet.creation_time + packet.deadline:  # this packet has not expired
@@ -247,8 +277,18 @@ class Drone:
                                         logging.info('UAV: %s obtain the next hop: %s of data packet (id: %s)',
                                                      self.identifier, packet.next_hop_id, packet.packet_id)
 
-                                        # in this case, the "final_packet" is actually the data packet
-                                        yield self.env.process(self.packet_coming(final_packet))
+                                        if (not self.enable_blocking and
+                                                not self.mac_protocol.window_available(packet.next_hop_id)):
+                                            # wait until the window towards the next hop slides, without blocking
+                                            # the packets towards the other next hops
+                                            self.window_deferred_packets.append(packet)
+                                        else:
+                                            if self.mac_protocol.enable_aggregation:
+                                                final_packet = self.mac_protocol.aggregate(final_packet)
+
+                                            # in this case, the "final_packet" is actually the data packet (or an
+                                            # A-MPDU)
+                                            yield self.env.process(self.packet_coming(final_packet))
                                     else:
                                         self.waiting_list.append(packet)
                                         self.remove_from_queue(packet)
@@ -264,6 +304,22 @@ class Drone:
             else:  # this drone runs out of energy
                 break  # it is important to break the while loop
 
+    def get_deferred_packet(self):
+        """
+        Take the oldest packet set aside in sliding window mode whose window towards the next hop has slid, the expired
+        packets are dropped
+        :return: the packet, or "None" if no window has slid
+        """
+
+        for packet in list(self.window_deferred_packets):
+            if self.env.now >= packet.creation_time + packet.deadline:
+                self.window_deferred_packets.remove(packet)  # means dropping this data packet for expiration
+            elif self.mac_protocol.window_available(packet.next_hop_id):
+                self.window_deferred_packets.remove(packet)
+                return packet
+
+        return None
+
     def packet_coming(self, pkd):
         """
         When drone has a packet ready to transmit, yield it.
@@ -291,6 +347,13 @@ class Drone:
                 if pkd.number_retransmission_attempt[self.identifier] == 1:
                     pkd.time_transmitted_at_last_hop = self.env.now
 
+                if isinstance(pkd, AggregatedPacket):
+                    for subframe in pkd.subframes:
+                        subframe.number_retransmission_attempt[self.identifier] += 1
+
+                        if subframe.number_retransmission_attempt[self.identifier] == 1:
+                            subframe.time_transmitted_at_last_hop = self.env.now
+
                 logging.info('Re-transmission times of pkd: %s at UAV: %s is: %s',
                              pkd.packet_id, self.identifier, pkd.number_retransmission_attempt[self.identifier])
 
@@ -331,64 +394,241 @@ class Drone:
     def receive(self):
         """
         Core receiving function of drone
-        1. the drone checks its "inbox" to see if there is incoming packet every 5 units (in us) from the time it is
-           instantiated to the end of the simulation
+        1. the drone checks its "inbox" each time a packet is put into it, or the transmission of a packet in it ends,
+           from the time it is instantiated to the end of the simulation
         2. update the "inbox" by deleting the inconsequential data packet
         3. then the drone will detect if it receives a (or multiple) complete data packet(s)
-        4. SINR calculation
+        4. SINR calculation, with successive interference cancellation if it is enabled
         :return: none
         """
 
+        if isinstance(self.mac_protocol, AnalyticalCsmaCa):
+            return  # the frames are handed to the routing protocol by the abstract physical layer directly
+
         while True:
             if not self.sleep:
                 # delete packets that have been processed and do not interfere with
                 # the transmission and reception of all current packets
                 self.update_inbox()
 
-                flag, all_drones_send_to_me, time_span, potential_packet = self.trigger()
+                flag, all_drones_send_to_me, time_span, potential_packet, channels = self.trigger()
 
                 if flag:
-                    # find the transmitters of all packets currently transmitted on the channel
-                    transmitting_node_list = []
-                    for drone in self.simulator.drones:
-                        for item in drone.inbox:
-                            packet = item[0]
-                            insertion_time = item[1]
-                            transmitter = item[2]
-                            transmitting_time = packet.packet_length / config.BIT_RATE * 1e6
-                            interval = [insertion_time, insertion_time + transmitting_time]
-
-                            for interval2 in time_span:
-                                if has_intersection(interval, interval2):
-                                    transmitting_node_list.append(transmitter)
-
-                    transmitting_node_list = list(set(transmitting_node_list))  # remove duplicates
-
-                    sinr_list = sinr_calculator(self, all_drones_send_to_me, transmitting_node_list)
-
-                    # receive the packet of the transmitting node corresponding to the maximum SINR
-                    max_sinr = max(sinr_list)
-                    if max_sinr >= config.SNR_THRESHOLD:
+                    if self.enable_sic:
+                        yield self.env.process(self.sic_reception(all_drones_send_to_me, time_span, potential_packet,
+                                                                  channels))
+                    else:
+                        sinr_list = [0] * len(all_drones_send_to_me)
+
+                        # only the packets on the same channel interfere with each other
+                        for channel in set(channels):
+                            indices = [i for i in range(len(channels)) if channels[i] == channel]
+                            transmitting_node_list = self.get_transmitting_nodes(channel,
+                                                                                 [time_span[i] for i in indices])
+
+                            channel_sinr_list = sinr_calculator(self, [all_drones_send_to_me[i] for i in indices],
+                                                                transmitting_node_list)
+                            for i, sinr in zip(indices, channel_sinr_list):
+                                sinr_list[i] = sinr
+
+                        # receive the packet of the transmitting node corresponding to the maximum SINR
+                        max_sinr = max(sinr_list)
                         which_one = sinr_list.index(max_sinr)
 
                         pkd = potential_packet[which_one]
 
-                        if pkd.get_current_ttl() < config.MAX_TTL:
-                            sender = all_drones_send_to_me[which_one]
+                        # the SINR threshold depends on the bit rate of the packet
+                        if max_sinr >= config.SNR_THRESHOLD_OF_BIT_RATE.get(pkd.bit_rate, config.SNR_THRESHOLD):
+                            yield self.env.process(self.frame_reception(pkd, all_drones_send_to_me[which_one],
+                                                                        max_sinr))
+                        else:  # sinr is lower than threshold
+                            self.simulator.metrics.collision_num += self.count_collided(all_drones_send_to_me,
+                                                                                        potential_packet)
+                            pass
+
+                # sleep until the next packet in the inbox is transmitted completely, or a new packet arrives
+                arrival = self.simulator.channel.arrival_events[self.identifier]
+                end_times = [item[1] + item[0].get_transmission_time() for item in self.inbox if not item[3]]
+
+                if end_times:
+                    yield arrival | self.env.timeout(max(0, min(end_times) - self.env.now))
+                else:
+                    yield arrival
+            else:
+                break
 
-                            logging.info('Packet %s from UAV: %s is received by UAV: %s at time: %s, sinr is: %s',
-                                         pkd.packet_id, sender, self.identifier, self.simulator.env.now, max_sinr)
+    def get_transmitting_nodes(self, channel, channel_time_span):
+        """
+        Find the transmitters of all packets currently transmitted on the channel
+        :param channel: the channel on which the received packets are transmitted
+        :param channel_time_span: a list, the time intervals in which the received packets are transmitted
+        :return: a list, identifiers of the transmitters whose packets overlap with the received packets
+        """
 
-                            yield self.env.process(self.routing_protocol.packet_reception(pkd, sender))
-                        else:
-                            logging.info('Packet %s is dropped due to exceeding max TTL', pkd.packet_id)
-                    else:  # sinr is lower than threshold
-                        self.simulator.metrics.collision_num += len(sinr_list)
-                        pass
+        return list(set(key[0] for key in self.get_transmitting_frames(channel, channel_time_span)))
+
+    def get_transmitting_frames(self, channel, channel_time_span):
+        """
+        Find all packets currently transmitted on the channel
+        :param channel: the channel on which the received packets are transmitted
+        :param channel_time_span: a list, the time intervals in which the received packets are transmitted
+        :return: a list, the keys (transmitter, packet id, start time) of the packets that overlap with the received
+                 packets
+        """
+
+        transmitting_frame_list = []
+        for drone in self.simulator.drones:
+            for item in drone.inbox:
+                if item[4] != channel:
+                    continue
 
-                yield self.env.timeout(5)
+                packet = item[0]
+                insertion_time = item[1]
+                transmitter = item[2]
+                transmitting_time = packet.get_transmission_time()
+                interval = [insertion_time, insertion_time + transmitting_time]
+
+                for interval2 in channel_time_span:
+                    if has_intersection(interval, interval2):
+                        transmitting_frame_list.append((transmitter, packet.packet_id, insertion_time))
+
+        return list(set(transmitting_frame_list))  # remove duplicates
+
+    def sic_reception(self, all_drones_send_to_me, time_span, potential_packet, channels):
+        """
+        Receive the overlapping packets with successive interference cancellation, on each channel at most "sic_depth"
+        packets are decoded, starting from the strongest one, see "sic_decoder". The receiver keeps the recently decoded
+        packets and the packets it failed to decode for a while: the former are cancelled from the packets overlapping
+        with them that complete later, and the latter are decoded again together with the overlapping packets that
+        complete later, since a weaker packet may complete before the stronger one that hides it. A packet is counted
+        as a collision once the receiver gives up decoding it
+        :param all_drones_send_to_me: a list, the sender of each received complete packet
+        :param time_span: a list, the time interval in which each received complete packet is transmitted
+        :param potential_packet: a list, the received complete packets
+        :param channels: a list, the channel on which each received complete packet is transmitted
+        :return: none
+        """
+
+        # forget the packets that can no longer overlap with an incoming packet, as in "update_inbox"
+        max_transmission_time = self.simulator.channel.max_transmission_time
+        self.sic_decoded_frames = [frame for frame in self.sic_decoded_frames
+                                   if frame[1][1] + max_transmission_time >= self.env.now]
+        expired_frames = [frame for frame in self.sic_failed_frames
+                          if frame[1][1] + max_transmission_time < self.env.now]
+        self.simulator.metrics.collision_num += self.count_collided([frame[0] for frame in expired_frames],
+                                                                    [frame[3] for frame in expired_frames])
+        self.sic_failed_frames = [frame for frame in self.sic_failed_frames if frame not in expired_frames]
+
+        # each frame is described by [sender, time span, channel, packet]
+        incoming_frames = [[all_drones_send_to_me[i], time_span[i], channels[i], potential_packet[i]]
+                           for i in range(len(potential_packet))]
+
+        decoded_list = []
+        for channel in set(channels):
+            channel_frames = [frame for frame in incoming_frames if frame[2] == channel]
+            channel_time_span = [frame[1] for frame in channel_frames]
+
+            def overlapping(frame):
+                return frame[2] == channel and any(has_intersection(frame[1], interval)
+                                                   for interval in channel_time_span)
+
+            failed_frames = [frame for frame in self.sic_failed_frames if overlapping(frame)]
+            candidate_frames = channel_frames + failed_frames
+
+            # the power of a transmitter is cancelled only if all of its packets overlapping with the candidate packets
+            # have been decoded, e.g., not if it sends an undecoded packet right after a decoded one
+            transmitting_frame_list = self.get_transmitting_frames(channel, [frame[1] for frame in candidate_frames])
+            transmitting_node_list = list(set(key[0] for key in transmitting_frame_list))
+            decoded_keys = set(self.get_frame_key(frame) for frame in self.sic_decoded_frames)
+            cancelled_drones_list = [node for node in transmitting_node_list
+                                     if all(key in decoded_keys for key in transmitting_frame_list if key[0] == node)]
+            sinr_threshold_list = [config.SNR_THRESHOLD_OF_BIT_RATE.get(frame[3].bit_rate, config.SNR_THRESHOLD)
+                                   for frame in candidate_frames]
+
+            channel_decoded_list, sinr_without_cancellation = sic_decoder(
+                self, [frame[0] for frame in candidate_frames], transmitting_node_list, sinr_threshold_list,
+                self.sic_depth, self.sic_residual_error, cancelled_drones_list)
+
+            decoded_index_list = [j for j, _ in channel_decoded_list]
+            for j, sinr in channel_decoded_list:
+                frame = candidate_frames[j]
+                decoded_list.append((frame, sinr))
+                self.sic_decoded_frames.append(frame)
+
+                if frame in failed_frames:
+                    self.sic_failed_frames.remove(frame)
+
+                if sinr_without_cancellation[j] < sinr_threshold_list[j]:
+                    self.simulator.metrics.sic_decoded_num += 1  # only decodable thanks to the cancellation
+
+            self.sic_failed_frames += [frame for j, frame in enumerate(channel_frames) if j not in decoded_index_list]
+
+        for frame, sinr in decoded_list:
+            yield self.env.process(self.frame_reception(frame[3], frame[0], sinr))
+
+    @staticmethod
+    def get_frame_key(frame):
+        # the key of a frame [sender, time span, channel, packet], the same as in "get_transmitting_frames"
+        return frame[0], frame[3].packet_id, frame[1][0]
+
+    def frame_reception(self, pkd, sender, sinr):
+        """
+        Hand a successfully decoded packet to the mac or routing protocol
+        :param pkd: the decoded packet
+        :param sender: the drone that sent the packet
+        :param sinr: the SINR of the packet
+        :return: none
+        """
+
+        if self.mac_protocol.enable_rate_adaptation:
+            self.mac_protocol.rate_controller.update_snr(sender, sinr)
+
+        if pkd.get_current_ttl() < config.MAX_TTL:
+            logging.info('Packet %s from UAV: %s is received by UAV: %s at time: %s, sinr is: %s',
+                         pkd.packet_id, sender, self.identifier, self.simulator.env.now, sinr)
+
+            if pkd.beacon is not None and pkd.beacon.src_drone.identifier == sender:
+                # the beacon piggybacked by the sender, the frame is put into the inboxes of all drones for it
+                self.routing_protocol.overhear_beacon(pkd.beacon, sender)
+
+                if self.is_overheard(pkd, sender):
+                    return  # the frame itself is not sent to me
+
+            if isinstance(pkd, (RtsPacket, CtsPacket, BlockAckPacket)):
+                # control frames of the mac layer are not handed to the routing protocol
+                yield self.env.process(self.mac_protocol.control_frame_reception(pkd, sender))
+            elif isinstance(pkd, AggregatedPacket):
+                yield self.env.process(self.mac_protocol.aggregate_reception(pkd, sender))
+            elif pkd.candidate_list is not None:
+                # in opportunistic forwarding, a candidate keeps receiving while it defers its ACK, so that it can
+                # receive the ACK of a higher-priority candidate in time
+                self.env.process(self.routing_protocol.packet_reception(pkd, sender))
             else:
-                break
+                yield self.env.process(self.routing_protocol.packet_reception(pkd, sender))
+        else:
+            logging.info('Packet %s is dropped due to exceeding max TTL', pkd.packet_id)
+
+    def is_addressee(self, pkd):
+        """
+        Check whether a unicast frame is sent to me, or only overheard
+        :param pkd: the decoded data or ACK frame
+        :return: "True" if I am the next hop (or one of the candidate forwarders) of the frame
+        """
+
+        if pkd.candidate_list is not None and self.identifier in pkd.candidate_list:
+            return True  # the ACKs of the candidates are also sent to the other candidates
+        elif isinstance(pkd, (DataPacket, AggregatedPacket)):
+            return pkd.next_hop_id == self.identifier
+        else:
+            return pkd.dst_drone.identifier == self.identifier  # ACK frames are sent back to the sender of the data
+
+    # whether a frame is only in my inbox for the beacon piggybacked by its sender
+    def is_overheard(self, pkd, sender):
+        return pkd.beacon is not None and pkd.beacon.src_drone.identifier == sender and not self.is_addressee(pkd)
+
+    # number of the collided frames, excluding the frames that are only overheard
+    def count_collided(self, senders, packets):
+        return sum(1 for sender, pkd in zip(senders, packets) if not self.is_overheard(pkd, sender))
 
     def update_inbox(self):
         """
@@ -398,14 +638,18 @@ class Drone:
                        |==========|←- (packet p2 that has been processed, but also can affect p1, so reserve it)
         |==========|←- (packet p3 that has been processed, no impact on p1, can be deleted)
         --------------------------------------------------------> time
+        A packet is kept until the longest packet that may still be incoming (e.g., an A-MPDU, or a data packet sent
+        at a low bit rate) can no longer overlap with it
         :return:
         """
 
-        max_transmission_time = (config.DATA_PACKET_LENGTH / config.BIT_RATE) * 1e6  # for a single data packet
+        # the incoming packets have already been put into the channel, none of them is longer than this
+        max_transmission_time = self.simulator.channel.max_transmission_time
         for item in self.inbox:
             insertion_time = item[1]  # the moment that this packet begins to be sent to the channel
             received = item[3]  # used to indicate if this packet has been processed (1: processed, 0: unprocessed)
-            if insertion_time + 2 * max_transmission_time < self.env.now:  # no impact on the current packet
+            end_time = insertion_time + item[0].get_transmission_time()
+            if end_time + max_transmission_time < self.env.now:  # no impact on the current packet
                 if received:
                     self.inbox.remove(item)
 
@@ -418,30 +662,37 @@ class Drone:
         3. time_span, a list, the element inside is the time interval in which the received complete data packet is
            transmitted in the channel
         4. potential_packet, a list, including all the instances of the received complete data packet
+        5. channels, a list, the channel on which each of the received complete data packet is transmitted
         """
 
         flag = 0  # used to indicate if I receive a complete packet
         all_drones_send_to_me = []
         time_span = []
         potential_packet = []
+        channels = []
+
+        listening_channels = self.mac_protocol.phy.get_listening_channels()
 
         for item in self.inbox:
             packet = item[0]  # not sure yet whether it has been completely transmitted
             insertion_time = item[1]  # transmission start time
             transmitter = item[2]
             processed = item[3]  # indicate if this packet has been processed
-            transmitting_time = packet.packet_length / config.BIT_RATE * 1e6  # expected transmission time
+            transmitting_time = packet.get_transmission_time()  # expected transmission time
 
             if not processed:  # this packet has not been processed yet
                 if self.env.now >= insertion_time + transmitting_time:  # it has been transmitted completely
-                    flag = 1
-                    all_drones_send_to_me.append(transmitter)
-                    time_span.append([insertion_time, insertion_time + transmitting_time])
-                    potential_packet.append(packet)
                     item[3] = 1
+
+                    if item[4] in listening_channels:  # otherwise, my radios are tuned to other channels
+                        flag = 1
+                        all_drones_send_to_me.append(transmitter)
+                        time_span.append([insertion_time, insertion_time + transmitting_time])
+                        potential_packet.append(packet)
+                        channels.append(item[4])
                 else:
                     pass
             else:
                 pass
 
-        return flag, all_drones_send_to_me, time_span, potential_packet
+        return flag, all_drones_send_to_me, time_span, potential_packet, channels
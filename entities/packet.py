@@ -19,10 +19,15 @@ class Packet:
         time_delivery: the time at which the packet arrives at its destination
         time_transmitted_at_last_hop: the transmitting time at last drone
         transmission_mode: unicast or multicast or broadcast?
+        beacon: neighbor beacon (a hello packet of the sender) piggybacked on this frame, "None" if there is no beacon
+        beacon_length: length of the piggybacked beacon, which is included in "packet_length"
+        candidate_list: ordered candidate forwarders in opportunistic forwarding, which all receive the data frame and
+                        the ACKs of each other, "None" for an ordinary unicast frame
+        bit_rate: bit rate at which the frame (except for its PHY header) is transmitted
 
     Author: Zihao Zhou, eezihaozhou@gmail.com
     Created at: 2024/1/11
-    Updated at: 2024/8/29
+    Updated at: 2026/10/19
     """
 
     def __init__(self,
@@ -54,6 +59,68 @@ class Packet:
 
         self.intermediate_drones = []
 
+        self.beacon = None
+        self.beacon_length = 0
+
+        self.candidate_list = None
+
+        self.bit_rate = config.BIT_RATE
+
+    def attach_beacon(self, beacon):
+        """
+        Piggyback a neighbor beacon on this frame, only the payload of the beacon is added to the frame since the
+        headers are shared. A beacon attached at the previous hop is replaced
+        :param beacon: the hello packet of the sender
+        :return: none
+        """
+
+        beacon_length = beacon.get_payload_length()
+        self.packet_length += beacon_length - self.beacon_length
+        self.beacon = beacon
+        self.beacon_length = beacon_length
+
+    # remove the piggybacked beacon from this frame
+    def detach_beacon(self):
+        self.packet_length -= self.beacon_length
+        self.beacon = None
+        self.beacon_length = 0
+
+    def get_transmission_time(self):
+        """
+        The PLCP preamble and header are always transmitted at the default bit rate, and the rest of the frame at the
+        bit rate selected for it
+        :return: transmission time of the frame, unit: us
+        """
+
+        if self.bit_rate == config.BIT_RATE:
+            return self.packet_length / config.BIT_RATE * 1e6
+        else:
+            phy_header_length = min(self.packet_length, config.PHY_HEADER_LENGTH)
+            return (phy_header_length / config.BIT_RATE +
+                    (self.packet_length - phy_header_length) / self.bit_rate) * 1e6
+
+    # length of the packet excluding the headers of network, mac and physical layer
+    def get_payload_length(self):
+        return self.packet_length - (config.IP_HEADER_LENGTH + config.MAC_HEADER_LENGTH + config.PHY_HEADER_LENGTH)
+
+    def get_ack_deferral(self, rank):
+        """
+        In opportunistic forwarding, the candidates reply their ACKs one after another in the order of priority, each
+        ACK slot lasts for an ACK (with a beacon of at most the length of mine) and a SIFS
+        :param rank: the priority of the candidate, starting from 0
+        :return: time by which the candidate defers its ACK, unit: us
+        """
+
+        ack_slot = (config.ACK_PACKET_LENGTH + self.beacon_length) / config.BIT_RATE * 1e6 + config.SIFS_DURATION
+        return rank * ack_slot
+
+    # the sender waits for the ACK of the last candidate
+    def get_max_ack_deferral(self):
+        if self.candidate_list is None:
+            return 0
+        else:
+            return self.get_ack_deferral(len(self.candidate_list) - 1)
+
     def increase_ttl(self):
         self.__ttl += 1
 
@@ -70,10 +137,11 @@ class DataPacket(Packet):
         dst_drone: destination drone of this data packet
         routing_path: record to whole routing path in centralized routing protocol
         next_hop_id: identifier of the next hop drone
+        perimeter_state: state of perimeter (face) routing in geographic routing protocols, "None" in greedy mode
 
     Author: Zihao Zhou, eezihaozhou@gmail.com
     Created at: 2024/1/11
-    Updated at: 2024/5/4
+    Updated at: 2026/10/18
     """
 
     def __init__(self,
@@ -90,6 +158,7 @@ class DataPacket(Packet):
 
         self.routing_path = None  # for centralized routing protocols
         self.next_hop_id = None  # next hop for this data packet
+        self.perimeter_state = None  # for the recovery mode of geographic routing
 
 
 class AckPacket(Packet):
@@ -107,3 +176,121 @@ class AckPacket(Packet):
         self.dst_drone = dst_drone
 
         self.ack_packet = ack_packet
+
+
+class RtsPacket(Packet):
+    """
+    Request-to-send frame of the RTS/CTS handshake
+
+    Attributes:
+        src_drone: the drone that wants to send a data packet
+        dst_drone: the next hop of the data packet
+        duration: time for which the channel is reserved after this frame, i.e., the rest of the handshake, the data
+                  packet and its ACK, used to set the NAV of the drones that overhear this frame, unit: us
+
+    Author: Zihao Zhou, eezihaozhou@gmail.com
+    Created at: 2026/10/18
+    Updated at: 2026/10/18
+    """
+
+    def __init__(self,
+                 src_drone,
+                 dst_drone,
+                 rts_packet_id,
+                 rts_packet_length,
+                 duration,
+                 simulator,
+                 creation_time=None):
+        super().__init__(rts_packet_id, rts_packet_length, creation_time, simulator)
+
+        self.src_drone = src_drone
+        self.dst_drone = dst_drone
+        self.duration = duration
+
+
+class CtsPacket(Packet):
+    """
+    Clear-to-send frame of the RTS/CTS handshake, the "duration" is taken over from the RTS and reduced by the time
+    that has already passed
+
+    Author: Zihao Zhou, eezihaozhou@gmail.com
+    Created at: 2026/10/18
+    Updated at: 2026/10/18
+    """
+
+    def __init__(self,
+                 src_drone,
+                 dst_drone,
+                 cts_packet_id,
+                 cts_packet_length,
+                 duration,
+                 simulator,
+                 creation_time=None):
+        super().__init__(cts_packet_id, cts_packet_length, creation_time, simulator)
+
+        self.src_drone = src_drone
+        self.dst_drone = dst_drone
+        self.duration = duration
+
+
+class AggregatedPacket(Packet):
+    """
+    A-MPDU (aggregated MAC protocol data unit), i.e., several data packets towards the same next hop that are sent in
+    one transmission. The subframes share a single PHY header, while each of them keeps its own MAC header and is
+    preceded by a delimiter, so that they can be acknowledged and re-transmitted separately. Only the first subframe
+    carries a piggybacked beacon, which is the beacon of the whole A-MPDU
+
+    Attributes:
+        subframes: a list, the data packets in this A-MPDU
+        next_hop_id: identifier of the common next hop of the subframes
+
+    Author: Zihao Zhou, eezihaozhou@gmail.com
+    Created at: 2026/10/18
+    Updated at: 2026/10/18
+    """
+
+    def __init__(self,
+                 subframes,
+                 aggregated_packet_id,
+                 simulator,
+                 creation_time=None):
+        aggregated_packet_length = config.PHY_HEADER_LENGTH + sum(
+            subframe.packet_length - config.PHY_HEADER_LENGTH + config.AMPDU_DELIMITER_LENGTH for subframe in subframes)
+        super().__init__(aggregated_packet_id, aggregated_packet_length, creation_time, simulator)
+
+        self.subframes = subframes
+        self.next_hop_id = subframes[0].next_hop_id
+        self.transmission_mode = 0
+
+        # already included in the length of the first subframe
+        self.beacon = subframes[0].beacon
+        self.beacon_length = subframes[0].beacon_length
+
+
+class BlockAckPacket(Packet):
+    """
+    Block ACK of an A-MPDU
+
+    Attributes:
+        src_drone: the drone that receives the A-MPDU
+        dst_drone: the drone that sends the A-MPDU
+        ack_packets: a list, the ACKs replied by the routing protocol to the accepted subframes
+
+    Author: Zihao Zhou, eezihaozhou@gmail.com
+    Created at: 2026/10/18
+    Updated at: 2026/10/18
+    """
+
+    def __init__(self,
+                 src_drone,
+                 dst_drone,
+                 block_ack_packet_id,
+                 block_ack_packet_length,
+                 ack_packets,
+                 simulator,
+                 creation_time=None):
+        super().__init__(block_ack_packet_id, block_ack_packet_length, creation_time, simulator)
+
+        self.src_drone = src_drone
+        self.dst_drone = dst_drone
+        self.ack_packets = ack_packets
@@ -0,0 +1,238 @@
+import logging
+import math
+import random
+from mac.retransmission import ArqMac
+from phy.abstract_phy import AbstractPhy
+from phy.large_scale_fading import general_path_loss
+from utils import config
+from utils.util_function import euclidean_distance
+
+# config logging
+logging.basicConfig(filename='running_log.log',
+                    filemode='w',  # there are two modes: 'a' and 'w'
+                    format='%(asctime)s - %(levelname)s - %(message)s',
+                    level=config.LOGGING_LEVEL
+                    )
+
+
+class AnalyticalCsmaCa(ArqMac):
+    """
+    Abstract CSMA/CA based on the Bianchi model of the DCF, for large-scale simulations that focus on routing
+
+    Instead of sensing the channel and counting down the backoff slot by slot, the drone waits for the time that the
+    backoff takes on average in the current contention neighbourhood, and then decides at random whether the frame
+    collides. Neither the listening processes nor the wireless channel are simulated, the frames are delivered by
+    "AbstractPhy", so the drones do not need to poll their inboxes.
+
+    The contention neighbourhood of a drone consists of itself and the drones within the sensing range. For n drones,
+    the transmission probability "tau" of a drone with a frame to send in a slot and the conditional collision
+    probability "p" are given by the fixed point of:
+        tau = sum_{k=1}^{M} p^(k-1) / sum_{k=1}^{M} p^(k-1) * ((W_k - 1) / 2 + 1)
+        p = 1 - (1 - rho * tau)^(n - 1)
+    where M is "MAX_RETRANSMISSION_ATTEMPT" and W_k = (CW_MIN + 1) * 2^(k-1) - 1 is the contention window of the k-th
+    attempt, as in "CsmaCa". Since the drones are not saturated in general, the transmission probability of the other
+    drones is scaled by their average activity "rho", i.e., the fraction of time they have had a frame in the mac
+    layer, which gives the original (saturated) model for rho = 1. While the drone counts down its backoff, a slot is
+    idle with probability (1 - rho * tau)^(n-1), otherwise, it lasts for a whole exchange of a data packet and its ACK
+    (in "CsmaCa", the sender holds the channel during the exchange even if the frame collides). The service time of
+    each attempt is DIFS plus the drawn number of backoff slots times the average slot length, and a unicast frame
+    succeeds with probability (1 - p) * q, where q is the success probability of the link without collision (see
+    "get_link_success_probability"). Broadcast frames only suffer from collisions. The channel errors are not fed
+    back into the fixed point.
+
+    Validity of the abstraction:
+        1) q is not a probability in practice, it is 1 if the SNR of the link (path loss and noise only, neither fading
+           nor interference) exceeds "SNR_THRESHOLD" and 0 otherwise, so a frame is only lost by a drawn collision or
+           because the next hop is out of range
+        2) "rho" is the fraction of time the other drones have a frame in the mac layer, including its transmission
+           and the wait for its ACK, so "rho * tau" overestimates their attempts per backoff slot, and so does the
+           average slot length. This hardly matters for a first attempt, but the average slot length is multiplied by
+           the exponentially growing contention window of each re-transmission. Hence, the mac delay (and the
+           end-to-end delay caused by the frames queued behind) is overestimated when many frames are re-transmitted,
+           e.g., towards the stale next hops of a proactive routing protocol like DSDV
+        3) there are no hidden terminals and no spatial reuse, all the drones within the sensing range contend as one
+           collision domain, and every busy slot lasts for a data packet and its ACK even if it carries a short
+           broadcast frame. The number of collisions is not comparable with that of "CsmaCa", which counts every
+           corrupted reception
+        4) in multi-channel operation, the data radio is tuned as in the other mac protocols (see "ArqMac"), which only
+           costs the switching time, the contention neighbourhood still includes the drones on the other channels
+
+    The ACK handling, the sliding window and the re-transmissions are inherited from "ArqMac".
+
+    Main attributes:
+        my_drone: the drone that installed the protocol
+        simulator: the simulation platform that contains everything
+        env: simulation environment created by simpy
+        phy: the abstract physical layer
+        rng_mac: random number generator of the drone for the backoff and the collisions
+        busy_time: total time the drone has spent in sending frames, used to calculate its activity
+        operating_points: a dictionary, the key is the size and the activity (rounded) of the contention neighbourhood
+                          and the value is the solution of the model (tau, p, average slot length)
+
+    References:
+        [1] G. Bianchi, "Performance Analysis of the IEEE 802.11 Distributed Coordination Function," IEEE Journal on
+            Selected Areas in Communications, vol. 18, no. 3, pp. 535-547, 2000.
+        [2] H. Wu, Y. Peng, K. Long, S. Cheng and J. Ma, "Performance of Reliable Transport Protocol over IEEE 802.11
+            Wireless LAN: Analysis and Enhancement," in IEEE INFOCOM, 2002, pp. 599-607.
+
+    Author: Zihao Zhou, eezihaozhou@gmail.com
+    Created at: 2026/10/18
+    Updated at: 2026/10/19
+    """
+
+    def __init__(self, drone):
+        super().__init__(drone)
+
+        self.phy = AbstractPhy(self)
+        self.channel_states = self.simulator.channel_states
+
+        self.enable_aggregation = 0
+        self.enable_rate_adaptation = 0
+
+        self.rng_mac = random.Random(self.my_drone.identifier + self.simulator.seed + 7)
+        self.busy_time = 0
+        self.operating_points = dict()
+
+    @staticmethod
+    def get_contention_window(transmission_attempt):
+        return (config.CW_MIN + 1) * (2 ** (transmission_attempt - 1)) - 1
+
+    def get_activity(self):
+        if self.env.now == 0:
+            return 0
+        else:
+            return min(1, self.busy_time / self.env.now)
+
+    def get_contention_neighbourhood(self):
+        """
+        Find the other drones that contend for the channel with me
+        :return: size of the contention neighbourhood (including me) and the average activity of the other drones
+        """
+
+        contenders = [drone for drone in self.simulator.drones if drone is not self.my_drone and not drone.sleep and
+                      euclidean_distance(drone.coords, self.my_drone.coords) < config.SENSING_RANGE]
+
+        if contenders:
+            activity = sum(drone.mac_protocol.get_activity() for drone in contenders) / len(contenders)
+        else:
+            activity = 0
+
+        return len(contenders) + 1, activity
+
+    def get_link_success_probability(self, next_hop_id):
+        """
+        Probability that a frame which does not collide is received by the next hop. It is a deterministic threshold
+        on the SNR of the link due to the path loss and the noise, i.e., the fading and the interference are ignored
+        :param next_hop_id: identifier of the next hop
+        :return: 1 if the SNR reaches "SNR_THRESHOLD", otherwise 0
+        """
+
+        next_hop = self.simulator.drones[next_hop_id]
+        snr = config.TRANSMITTING_POWER * general_path_loss(next_hop, self.my_drone) / config.NOISE_POWER
+
+        if 10 * math.log10(snr) >= config.SNR_THRESHOLD:
+            return 1
+        else:
+            return 0
+
+    def get_transmission_probability(self, collision_probability):
+        numerator = 0
+        denominator = 0
+        for k in range(1, config.MAX_RETRANSMISSION_ATTEMPT + 1):
+            numerator += collision_probability ** (k - 1)
+            denominator += collision_probability ** (k - 1) * ((self.get_contention_window(k) - 1) / 2 + 1)
+
+        return numerator / denominator
+
+    def get_operating_point(self, station_num, activity):
+        """
+        Solve the fixed point of the Bianchi model by bisection, the solution is cached
+        :param station_num: size of the contention neighbourhood, including the drone itself
+        :param activity: average activity of the other drones in the contention neighbourhood
+        :return: transmission probability in a slot, conditional collision probability and average slot length (us)
+        """
+
+        activity = round(activity, 2)
+
+        if (station_num, activity) not in self.operating_points:
+            low, high = 0.0, 1.0
+            for _ in range(60):
+                tau = (low + high) / 2
+                if tau > self.get_transmission_probability(1 - (1 - activity * tau) ** (station_num - 1)):
+                    high = tau
+                else:
+                    low = tau
+
+            tau = (low + high) / 2
+            collision_probability = 1 - (1 - activity * tau) ** (station_num - 1)
+
+            busy_duration = (config.DIFS_DURATION + config.DATA_PACKET_LENGTH / config.BIT_RATE * 1e6 +
+                             config.SIFS_DURATION + config.ACK_PACKET_LENGTH / config.BIT_RATE * 1e6)
+            average_slot = ((1 - collision_probability) * config.SLOT_DURATION +
+                            collision_probability * busy_duration)
+
+            self.operating_points[(station_num, activity)] = (tau, collision_probability, average_slot)
+
+        return self.operating_points[(station_num, activity)]
+
+    def mac_send(self, pkd):
+        """
+        Wait for the average service time of an attempt, and decide whether the frame collides
+        :param pkd: the packet that needs to send
+        :return: none
+        """
+
+        start_time = self.env.now
+
+        # tune the data radio to the channel of the next hop
+        yield self.env.process(self.tune_to_next_hop(pkd))
+
+        transmission_attempt = pkd.number_retransmission_attempt[self.my_drone.identifier]
+        backoff_slots = self.rng_mac.randint(0, self.get_contention_window(transmission_attempt) - 1)
+        tau, collision_probability, average_slot = self.get_operating_point(*self.get_contention_neighbourhood())
+
+        if transmission_attempt == 1:
+            pkd.backoff_start_time = self.env.now
+
+        yield self.env.timeout(config.DIFS_DURATION + backoff_slots * average_slot)
+
+        key = 'mac_send' + str(self.my_drone.identifier) + '_' + str(pkd.packet_id)
+        self.my_drone.mac_process_finish[key] = 1  # mark the process as "finished"
+
+        logging.info('UAV: %s can send packet (pkd id: %s) at: %s ',
+                     self.my_drone.identifier, pkd.packet_id, self.env.now)
+
+        pkd.transmitting_start_time = self.env.now
+        transmission_mode = pkd.transmission_mode
+
+        collided = self.rng_mac.random() < collision_probability
+        if collided:
+            self.simulator.metrics.collision_num += 1
+
+        if transmission_mode == 0:  # for unicast
+            next_hop_id = pkd.next_hop_id
+
+            pkd.increase_ttl()
+            if not collided and self.rng_mac.random() < self.get_link_success_probability(next_hop_id):
+                self.phy.unicast(pkd, next_hop_id)
+            yield self.env.timeout(pkd.get_transmission_time())  # transmission delay
+
+            if self.enable_ack:
+                ack_deadline = self.env.now + self.get_ack_timeout(pkd)
+                wait_ack_process = self.start_wait_ack(pkd)
+
+                yield self.env.timeout(config.SIFS_DURATION + config.ACK_PACKET_LENGTH / config.BIT_RATE * 1e6 +
+                                       pkd.get_max_ack_deferral())
+
+                # the data radio stays on the channel of the next hop until the ACK arrives
+                yield self.env.process(self.stay_for_ack([wait_ack_process], ack_deadline))
+
+        elif transmission_mode == 1:
+            pkd.increase_ttl()
+            if not collided:
+                self.phy.broadcast(pkd)
+            yield self.env.timeout(pkd.get_transmission_time())
+
+        yield self.env.process(self.return_to_data_channel())
+
+        self.busy_time += self.env.now - start_time
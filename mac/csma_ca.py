@@ -1,6 +1,9 @@
 import simpy
 import logging
 import random
+from entities.packet import DataPacket, RtsPacket, CtsPacket, AggregatedPacket, BlockAckPacket
+from mac.rate_controller import RateController
+from mac.retransmission import ArqMac
 from phy.phy import Phy
 from utils import config
 from utils.util_function import check_channel_availability
@@ -13,9 +16,10 @@ logging.basicConfig(filename='running_log.log',
                     )
 
 
-class CsmaCa:
+class CsmaCa(ArqMac):
     """
-    Medium access control protocol: CSMA/CA (Carrier Sense Multiple Access With Collision Avoidance) without RTS/CTS
+    Medium access control protocol: CSMA/CA (Carrier Sense Multiple Access With Collision Avoidance), RTS/CTS is
+    optional
 
     The basic flow of the basic CSMA/CA (without RTS/CTS) is as follows:
         1) when a node has a packet to send, it first needs to wait until the channel is idle
@@ -26,13 +30,46 @@ class CsmaCa:
         4) if the countdown is interrupted, it means that the node loses the game. The node should freeze the timer and
            wait for channel idle again before re-starting its timer
 
+    RTS/CTS (if "enable_rts_cts" is 1): after the backoff, a unicast frame not shorter than "RTS_THRESHOLD" is preceded
+    by an RTS, and is only sent if the next hop replies a CTS. Both frames carry the remaining time of the exchange, and
+    the drones that overhear them set their NAV (Network Allocation Vector) accordingly. The NAV is a timer which
+    expires by itself, until then, the channel is considered busy (virtual carrier sensing). If no CTS is received,
+    the frame is re-transmitted like an unacknowledged frame. In this way, a collision caused by hidden terminals only
+    destroys a short RTS instead of a whole data packet
+
+    Frame aggregation (if "enable_aggregation" is 1): when a data packet is about to be sent, the data packets in the
+    queue towards the same next hop are bundled with it into an A-MPDU, within the limits of the number of subframes
+    and the transmission time. The receiver replies a single block ACK for the subframes it accepts, and each subframe
+    that is not acknowledged is re-transmitted on its own. In this way, the PHY header, DIFS, backoff and ACK are shared
+    by several data packets
+
+    Rate adaptation (if "enable_rate_adaptation" is 1): the bit rate of each unicast data frame is selected per next
+    hop by "RateController", the other frames are sent at the default bit rate
+
+    Re-transmissions are handed over to the "RetransmissionScheduler" of the drone once the ACK (or CTS) times out. If
+    "enable_adaptive_ack_timeout" is 1, the ACK timeout of each next hop is estimated from the measured ACK turnaround
+    time by "AckTimeoutEstimator" instead of the fixed "ACK_TIMEOUT". The ACK handling and the sliding window are
+    inherited from "ArqMac"
+
+    Multi-channel operation (see "ChannelAssignment"): before sending a unicast frame, the data radio is tuned to the
+    data channel of the next hop, and the carrier sensing only concerns the drones transmitting on that channel. The
+    radio stays there until the ACK is received or the waiting time expires, and then goes back to its own channel, as
+    in the other mac protocols (see "ArqMac")
+
     Main attributes:
         my_drone: the drone that installed the CSMA/CA protocol
         simulator: the simulation platform that contains everything
         env: simulation environment created by simpy
         phy: the installed physical layer
         channel_states: used to determine if the channel is idle
-        enable_ack: use ack or not
+        enable_rts_cts: use RTS/CTS or not
+        nav_end: the time at which the NAV expires
+        nav_expired: an event triggered when the NAV expires
+        enable_aggregation: use frame aggregation or not
+        max_aggregation_num: maximum number of subframes in an A-MPDU
+        max_aggregation_duration: maximum transmission time of an A-MPDU, unit: us
+        enable_rate_adaptation: use rate adaptation or not
+        rate_controller: selects the bit rate of the unicast data frames
 
     References:
         [1] J. Li, et al., "Packet Delay in UAV Wireless Networks Under Non-saturated Traffic and Channel Fading
@@ -47,21 +84,28 @@ class CsmaCa:
 
     Author: Zihao Zhou, eezihaozhou@gmail.com
     Created at: 2024/1/11
-    Updated at: 2024/9/22
+    Updated at: 2026/10/19
     """
 
     def __init__(self, drone):
-        self.my_drone = drone
-        self.simulator = drone.simulator
-        self.env = drone.env
+        super().__init__(drone)
+
         self.phy = Phy(self)
         self.channel_states = self.simulator.channel_states
-        self.enable_ack = True
 
-        self.wait_ack_process_dict = dict()
-        self.wait_ack_process_finish = dict()
-        self.wait_ack_process_count = 0
-        self.wait_ack_process = None
+        self.enable_rts_cts = 0
+        self.nav_end = 0
+        self.nav_expired = self.env.event()
+        self.nav_timer = None
+        self.pending_rts = None  # the RTS waiting for a CTS
+        self.cts_received = self.env.event()
+
+        self.enable_aggregation = 0
+        self.max_aggregation_num = 8
+        self.max_aggregation_duration = 20 * 1e3
+
+        self.enable_rate_adaptation = 0
+        self.rate_controller = RateController(drone)
 
     def mac_send(self, pkd):
         """
@@ -76,9 +120,13 @@ class CsmaCa:
         backoff = random.randint(0, contention_window - 1) * config.SLOT_DURATION  # random backoff, in us
         to_wait = config.DIFS_DURATION + backoff
 
+        # tune the data radio to the channel of the next hop before sensing it
+        yield self.env.process(self.tune_to_next_hop(pkd))
+
         while to_wait:
             # wait until the channel becomes idle
-            yield self.env.process(self.wait_idle_channel(self.my_drone, self.simulator.drones))
+            yield self.env.process(self.wait_idle_channel(self.my_drone, self.simulator.drones,
+                                                          self.phy.get_transmitting_channel(pkd)))
 
             if pkd.number_retransmission_attempt[self.my_drone.identifier] == 1:
                 """
@@ -88,6 +136,11 @@ class CsmaCa:
                 """
                 pkd.backoff_start_time = self.env.now
 
+                if isinstance(pkd, AggregatedPacket):
+                    for subframe in pkd.subframes:
+                        if subframe.number_retransmission_attempt[self.my_drone.identifier] == 1:
+                            subframe.backoff_start_time = self.env.now
+
             # start listen the channel at backoff stage
             self.env.process(self.listen(self.channel_states, self.simulator.drones, pkd))
 
@@ -103,6 +156,7 @@ class CsmaCa:
                 self.my_drone.mac_process_finish[key] = 1  # mark the process as "finished"
 
                 # occupy the channel to send packet
+                self.phy.transmitting_channel = self.phy.get_transmitting_channel(pkd)
                 with self.channel_states[self.my_drone.identifier].request() as req:
                     yield req
 
@@ -112,6 +166,13 @@ class CsmaCa:
                     pkd.transmitting_start_time = self.env.now
                     transmission_mode = pkd.transmission_mode
 
+                    if isinstance(pkd, AggregatedPacket):
+                        for subframe in pkd.subframes:
+                            subframe.transmitting_start_time = self.env.now
+
+                    if self.enable_rate_adaptation:
+                        pkd.bit_rate = self.select_bit_rate(pkd)
+
                     if transmission_mode == 0:  # for unicast
                         # only unicast data packets need to wait for ACK
                         logging.info('UAV: %s start to wait ACK for packet: %s at time: %s',
@@ -119,24 +180,46 @@ class CsmaCa:
 
                         next_hop_id = pkd.next_hop_id
 
-                        pkd.increase_ttl()
-                        self.phy.unicast(pkd, next_hop_id)  # note: unicast function should be executed first!
-                        yield self.env.timeout(pkd.packet_length / config.BIT_RATE * 1e6)  # transmission delay
+                        cts_received = True
+                        if self.enable_rts_cts and pkd.packet_length >= config.RTS_THRESHOLD:
+                            cts_received = yield self.env.process(self.rts_cts_handshake(pkd))
+
+                        if not cts_received:
+                            self.handshake_failure(pkd)
+                        else:
+                            if isinstance(pkd, AggregatedPacket):
+                                # the subframes are acknowledged by a block ACK, which is replied after their ACKs are
+                                # collected
+                                acked_packets = pkd.subframes
+                                block_ack_time = config.BLOCK_ACK_PACKET_LENGTH / config.BIT_RATE * 1e6
+                            else:
+                                acked_packets = [pkd]
+                                block_ack_time = 0
+
+                            for acked_packet in acked_packets:
+                                acked_packet.increase_ttl()
+
+                            self.phy.unicast(pkd, next_hop_id)  # note: unicast function should be executed first!
+                            yield self.env.timeout(pkd.get_transmission_time())  # transmission delay
 
-                        if self.enable_ack:
-                            # used to identify the process of waiting ack
-                            key2 = 'wait_ack' + str(self.my_drone.identifier) + '_' + str(pkd.packet_id)
-                            self.wait_ack_process = self.env.process(self.wait_ack(pkd))
-                            self.wait_ack_process_dict[key2] = self.wait_ack_process
-                            self.wait_ack_process_finish[key2] = 0  # indicate that this process hasn't finished
+                            if self.enable_ack:
+                                ack_deadline = self.env.now + self.get_ack_timeout(pkd, block_ack_time)
+                                wait_ack_processes = []
 
-                            # continue to occupy the channel to prevent the ACK from being interfered
-                            yield self.env.timeout(config.SIFS_DURATION + config.ACK_PACKET_LENGTH / config.BIT_RATE * 1e6)
+                                for acked_packet in acked_packets:
+                                    wait_ack_processes.append(self.start_wait_ack(acked_packet, block_ack_time))
+
+                                # continue to occupy the channel to prevent the ACK from being interfered
+                                yield self.env.timeout(config.SIFS_DURATION +
+                                                       config.ACK_PACKET_LENGTH / config.BIT_RATE * 1e6 +
+                                                       pkd.get_max_ack_deferral() + block_ack_time)
+
+                                yield self.env.process(self.stay_for_ack(wait_ack_processes, ack_deadline))
 
                     elif transmission_mode == 1:
                         pkd.increase_ttl()
                         self.phy.broadcast(pkd)
-                        yield self.env.timeout(pkd.packet_length / config.BIT_RATE * 1e6)
+                        yield self.env.timeout(pkd.get_transmission_time())
 
             except simpy.Interrupt:
                 already_wait = self.env.now - start_time
@@ -153,44 +236,308 @@ class CsmaCa:
                     backoff = to_wait  # remaining backoff time
                     to_wait = config.DIFS_DURATION + backoff
 
-    def wait_ack(self, pkd):
+        yield self.env.process(self.return_to_data_channel())
+
+    def select_bit_rate(self, pkd):
+        if pkd.transmission_mode == 0 and pkd.candidate_list is None and \
+                isinstance(pkd, (DataPacket, AggregatedPacket)):
+            bit_rate = self.rate_controller.select_bit_rate(pkd.next_hop_id)
+            self.simulator.metrics.bit_rate_dict[bit_rate] += 1
+            return bit_rate
+        else:
+            return config.BIT_RATE  # broadcast frames and frames to several candidates
+
+    def rts_cts_handshake(self, pkd):
+        """
+        Reserve the channel for a unicast frame by RTS/CTS, the channel is already occupied by the drone
+        :param pkd: the data packet to be sent
+        :return: whether the CTS is received in time
+        """
+
+        rts_transmission_time = config.RTS_PACKET_LENGTH / config.BIT_RATE * 1e6
+        cts_transmission_time = config.CTS_PACKET_LENGTH / config.BIT_RATE * 1e6
+        data_transmission_time = pkd.get_transmission_time()
+        ack_transmission_time = (config.ACK_PACKET_LENGTH + pkd.beacon_length) / config.BIT_RATE * 1e6
+
+        duration = (3 * config.SIFS_DURATION + cts_transmission_time + data_transmission_time +
+                    ack_transmission_time + pkd.get_max_ack_deferral())
+
+        config.GL_ID_RTS_PACKET += 1
+        rts_packet = RtsPacket(src_drone=self.my_drone,
+                               dst_drone=self.simulator.drones[pkd.next_hop_id],
+                               rts_packet_id=config.GL_ID_RTS_PACKET,
+                               rts_packet_length=config.RTS_PACKET_LENGTH,
+                               duration=duration,
+                               simulator=self.simulator,
+                               creation_time=self.env.now)
+
+        logging.info('UAV: %s sends RTS to UAV: %s for packet: %s at: %s',
+                     self.my_drone.identifier, pkd.next_hop_id, pkd.packet_id, self.env.now)
+
+        self.pending_rts = rts_packet
+        self.cts_received = self.env.event()
+
+        # RTS is broadcast so that all drones around can set their NAV
+        rts_packet.increase_ttl()
+        self.phy.broadcast(rts_packet)
+        yield self.env.timeout(rts_transmission_time)
+
+        yield self.cts_received | self.env.timeout(config.CTS_TIMEOUT)
+        self.pending_rts = None
+
+        if self.cts_received.triggered:
+            yield self.env.timeout(config.SIFS_DURATION)  # switch from receiving to transmitting
+            return True
+        else:
+            logging.info('CTS timeout of packet: %s at: %s', pkd.packet_id, self.env.now)
+            return False
+
+    def handshake_failure(self, pkd):
         """
-        If ACK is received within the specified time, the transmission is successful, otherwise,
-        a re-transmission will be originated
-        :param pkd: the data packet that waits for ACK
+        The RTS is not answered, release the channel and start a re-transmission
+        :param pkd: the data packet that fails to reserve the channel
         :return: none
         """
 
-        try:
-            yield self.env.timeout(config.ACK_TIMEOUT)
+        if pkd.number_retransmission_attempt[self.my_drone.identifier] < config.MAX_RETRANSMISSION_ATTEMPT:
+            self.retransmission_scheduler.schedule(pkd)
+        elif isinstance(pkd, AggregatedPacket):
+            for subframe in pkd.subframes:
+                self.drop_frame(subframe)
+        else:
+            self.drop_frame(pkd)
+
+    def control_frame_reception(self, packet, src_drone_id):
+        """
+        Handle a received RTS, CTS or block ACK. Reply a CTS if the RTS is addressed to me, otherwise set the NAV
+        :param packet: the received control frame
+        :param src_drone_id: the identifier of the sender
+        :return: none
+        """
+
+        if packet.src_drone is self.my_drone:
+            return
+
+        if isinstance(packet, RtsPacket):
+            if packet.dst_drone is self.my_drone:
+                if not self.nav_busy():  # the channel around me is not reserved by others
+                    cts_transmission_time = config.CTS_PACKET_LENGTH / config.BIT_RATE * 1e6
+
+                    config.GL_ID_CTS_PACKET += 1
+                    cts_packet = CtsPacket(src_drone=self.my_drone,
+                                           dst_drone=packet.src_drone,
+                                           cts_packet_id=config.GL_ID_CTS_PACKET,
+                                           cts_packet_length=config.CTS_PACKET_LENGTH,
+                                           duration=packet.duration - config.SIFS_DURATION - cts_transmission_time,
+                                           simulator=self.simulator,
+                                           creation_time=self.env.now)
+
+                    yield self.env.timeout(config.SIFS_DURATION)  # switch from receiving to transmitting
 
-            logging.info('ACK timeout of packet: %s at: %s', pkd.packet_id, self.env.now)
+                    if not self.my_drone.sleep:
+                        logging.info('UAV: %s replies CTS to UAV: %s at: %s',
+                                     self.my_drone.identifier, src_drone_id, self.env.now)
 
-            if pkd.number_retransmission_attempt[self.my_drone.identifier] < config.MAX_RETRANSMISSION_ATTEMPT:
-                yield self.env.process(self.my_drone.packet_coming(pkd))
+                        cts_packet.increase_ttl()
+                        self.phy.broadcast(cts_packet)
+                        yield self.env.timeout(cts_transmission_time)
             else:
-                self.simulator.metrics.mac_delay.append((self.simulator.env.now - pkd.backoff_start_time) / 1e3)
+                self.set_nav(packet.duration)
+
+        elif isinstance(packet, CtsPacket):
+            if packet.dst_drone is self.my_drone:
+                if self.pending_rts is not None and self.pending_rts.dst_drone is packet.src_drone:
+                    if not self.cts_received.triggered:
+                        self.cts_received.succeed()
+            else:
+                self.set_nav(packet.duration)
+
+        elif isinstance(packet, BlockAckPacket):
+            if packet.dst_drone is self.my_drone:
+                # the ACKs of the subframes are handled by the routing protocol one by one
+                for ack_packet in packet.ack_packets:
+                    yield self.env.process(self.my_drone.routing_protocol.packet_reception(ack_packet, src_drone_id))
+
+    def aggregate(self, packet):
+        """
+        Bundle the queued data packets that go to the same next hop as "packet" into an A-MPDU. The queue is scanned for
+        data packets of the same destination, whose next hop is looked up without side effects by the routing protocol
+        ("peek_next_hop"). The next hop selection, which may change the state of the packet (e.g., the routing path of
+        OPAR), is only executed once for the packets that join the A-MPDU. The data packets that cannot be aggregated
+        keep their places in the queue
+        :param packet: the data packet taken from the head of the queue, whose next hop has been determined
+        :return: the A-MPDU, or the data packet itself if there is nothing to aggregate
+        """
+
+        if packet.transmission_mode != 0 or packet.candidate_list is not None:
+            return packet  # only a unicast frame to a single next hop can be aggregated
+
+        subframes = [packet]
+        aggregation_duration = packet.packet_length / config.BIT_RATE * 1e6
+        remaining_packets = []
+
+        routing_protocol = self.my_drone.routing_protocol
+        transmitting_queue = self.my_drone.transmitting_queue
+        while not transmitting_queue.empty():
+            item = transmitting_queue.get()
+
+            if self.can_aggregate(item, packet, subframes, aggregation_duration) and \
+                    routing_protocol.peek_next_hop(item) == packet.next_hop_id:
+                has_route, _, _ = routing_protocol.next_hop_selection(item)
 
-                key2 = 'wait_ack' + str(self.my_drone.identifier) + '_' + str(pkd.packet_id)
-                self.my_drone.mac_protocol.wait_ack_process_finish[key2] = 1
+                if has_route and item.transmission_mode == 0 and item.candidate_list is None and \
+                        item.next_hop_id == packet.next_hop_id:
+                    item.detach_beacon()  # the beacon on the first subframe is enough
+                    subframes.append(item)
+                    aggregation_duration += self.get_subframe_duration(item)
+                    continue
 
-                logging.info('Packet: %s is dropped!', pkd.packet_id)
+            remaining_packets.append(item)
+
+        for item in remaining_packets:
+            transmitting_queue.put(item)
+
+        if len(subframes) == 1:
+            return packet
+
+        config.GL_ID_AGGREGATED_PACKET += 1
+        aggregated_packet = AggregatedPacket(subframes=subframes,
+                                             aggregated_packet_id=config.GL_ID_AGGREGATED_PACKET,
+                                             simulator=self.simulator,
+                                             creation_time=self.env.now)
+
+        logging.info('UAV: %s aggregates %s data packets to UAV: %s at: %s',
+                     self.my_drone.identifier, len(subframes), packet.next_hop_id, self.env.now)
+
+        self.simulator.metrics.aggregated_frame_num += 1
+        self.simulator.metrics.aggregated_subframe_num += len(subframes)
+
+        return aggregated_packet
+
+    def can_aggregate(self, item, packet, subframes, aggregation_duration):
+        """
+        Check a queued packet before looking up its next hop
+        :param item: the packet in the queue
+        :param packet: the first subframe of the A-MPDU
+        :param subframes: the subframes collected so far
+        :param aggregation_duration: the transmission time of the subframes collected so far
+        :return: whether the packet may join the A-MPDU
+        """
+
+        if len(subframes) >= self.max_aggregation_num:
+            return False
+
+        if not isinstance(item, DataPacket) or item.dst_drone is not packet.dst_drone:
+            return False
+
+        if self.env.now >= item.creation_time + item.deadline or \
+                item.number_retransmission_attempt[self.my_drone.identifier] >= config.MAX_RETRANSMISSION_ATTEMPT:
+            return False  # left to "feed_packet"
+
+        if aggregation_duration + self.get_subframe_duration(item) > self.max_aggregation_duration:
+            return False
+
+        if not self.my_drone.enable_blocking:
+            # every subframe occupies a place in the window
+            if self.get_outstanding_num(packet.next_hop_id) + len(subframes) >= self.window_size:
+                return False
+
+        return True
+
+    @staticmethod
+    def get_subframe_duration(pkd):
+        return (pkd.packet_length - config.PHY_HEADER_LENGTH + config.AMPDU_DELIMITER_LENGTH) / config.BIT_RATE * 1e6
+
+    def aggregate_reception(self, packet, src_drone_id):
+        """
+        Hand the subframes of an A-MPDU to the routing protocol at the same time, and reply the ACKs of the accepted
+        subframes in one block ACK
+        :param packet: the received A-MPDU
+        :param src_drone_id: the identifier of the sender
+        :return: none
+        """
+
+        ack_packets = []
+        self.phy.block_ack_sessions[src_drone_id] = ack_packets
+
+        receptions = [self.env.process(self.my_drone.routing_protocol.packet_reception(subframe, src_drone_id))
+                      for subframe in packet.subframes]
+        yield self.env.all_of(receptions)
+
+        del self.phy.block_ack_sessions[src_drone_id]
+
+        if ack_packets and not self.my_drone.sleep:
+            config.GL_ID_ACK_PACKET += 1
+            block_ack_packet = BlockAckPacket(src_drone=self.my_drone,
+                                              dst_drone=self.simulator.drones[src_drone_id],
+                                              block_ack_packet_id=config.GL_ID_ACK_PACKET,
+                                              block_ack_packet_length=config.BLOCK_ACK_PACKET_LENGTH,
+                                              ack_packets=ack_packets,
+                                              simulator=self.simulator,
+                                              creation_time=self.env.now)
+
+            for ack_packet in ack_packets:
+                if ack_packet.beacon is not None:
+                    block_ack_packet.attach_beacon(ack_packet.beacon)
+                    break
+
+            logging.info('UAV: %s replies block ACK of %s subframes to UAV: %s at: %s',
+                         self.my_drone.identifier, len(ack_packets), src_drone_id, self.env.now)
+
+            block_ack_packet.increase_ttl()
+            self.phy.unicast(block_ack_packet, src_drone_id)
+            yield self.env.timeout(block_ack_packet.packet_length / config.BIT_RATE * 1e6)
+
+    def nav_busy(self):
+        return self.env.now < self.nav_end
+
+    def set_nav(self, duration):
+        """
+        Update the NAV with the duration carried by an overheard RTS/CTS, the NAV is only extended, never shortened
+        :param duration: the time for which the channel is reserved from now on
+        :return: none
+        """
+
+        nav_end = self.env.now + duration
+
+        if nav_end > self.nav_end:
+            self.nav_end = nav_end
+
+            if self.nav_timer is not None and self.nav_timer.is_alive:
+                self.nav_timer.interrupt()  # restart the timer
+
+            self.nav_timer = self.env.process(self.nav_countdown())
+
+    def nav_countdown(self):
+        try:
+            yield self.env.timeout(self.nav_end - self.env.now)
+
+            self.nav_expired.succeed()
+            self.nav_expired = self.env.event()
 
         except simpy.Interrupt:
-            # receive ACK in time
-            logging.info('UAV: %s receives the ACK for data packet: %s, at: %s',
-                         self.my_drone.identifier, pkd.packet_id, self.env.now)
+            pass  # the NAV is extended
 
-    def wait_idle_channel(self, sender_drone, drones):
+    def report_ack_result(self, pkd, success):
+        if self.enable_rate_adaptation:
+            self.rate_controller.report(pkd.next_hop_id, success=success)
+
+    def wait_idle_channel(self, sender_drone, drones, channel=None):
         """
         Wait until the channel becomes idle
         :param sender_drone: the drone that is about to send packet
         :param drones: a list, which contains all the drones in the simulation
+        :param channel: the channel to be sensed
         :return: none
         """
 
-        while not check_channel_availability(self.channel_states, sender_drone, drones):
-            yield self.env.timeout(config.SLOT_DURATION)
+        while True:
+            if self.nav_busy():
+                yield self.nav_expired  # virtual carrier sensing
+            elif not check_channel_availability(self.channel_states, sender_drone, drones, channel):
+                yield self.env.timeout(config.SLOT_DURATION)
+            else:
+                break
 
     def listen(self, channel_states, drones, pkd):
         """
@@ -207,10 +554,11 @@ class CsmaCa:
                      self.env.now, self.my_drone.identifier)
 
         key = 'mac_send' + str(self.my_drone.identifier) + '_' + str(pkd.packet_id)
+        channel = self.phy.get_transmitting_channel(pkd)
 
         while self.my_drone.mac_process_finish[key] == 0:  # interrupt only if the process is not complete
-            if check_channel_availability(channel_states, self.my_drone, drones) is False:
-                # found channel be occupied, start interrupt
+            if check_channel_availability(channel_states, self.my_drone, drones, channel) is False or self.nav_busy():
+                # found channel be occupied (or reserved by others), start interrupt
 
                 key = 'mac_send' + str(self.my_drone.identifier) + '_' + str(pkd.packet_id)
                 if not self.my_drone.mac_process_dict[key].triggered:
@@ -0,0 +1,158 @@
+import logging
+import math
+import random
+from mac.retransmission import ArqMac
+from phy.phy import Phy
+from utils import config
+from utils.util_function import check_channel_availability
+
+# config logging
+logging.basicConfig(filename='running_log.log',
+                    filemode='w',  # there are two modes: 'a' and 'w'
+                    format='%(asctime)s - %(levelname)s - %(message)s',
+                    level=config.LOGGING_LEVEL
+                    )
+
+
+class PPersistentCsma(ArqMac):
+    """
+    Medium access control protocol: slotted p-persistent CSMA
+
+    The time is divided into slots of "SLOT_DURATION", which are common to all drones. The basic flow of the
+    p-persistent CSMA is as follows:
+        1) when a node has a packet to send, it senses the channel at the beginning of the next slot
+        2) if the channel is idle, the node sends the packet in this slot with probability p, and defers to the next
+           slot with probability 1 - p
+        3) if the channel is busy, the node senses the channel again at the beginning of the next slot
+        4) after sending the packet, the node starts to wait for the ACK, if it is not received in time, the packet is
+           handed over to the "RetransmissionScheduler" and contends for the channel in the same way again
+
+    The channel is sensed at the beginning of a slot before any transmission of this slot starts, therefore, the nodes
+    that decide to send in the same slot collide. Since all the events happen at the slot boundaries, the transmissions
+    of many drones are processed at the same time steps, and there is no listening process during the backoff as in
+    CSMA/CA.
+
+    The ACK handling, the sliding window and the re-transmissions are inherited from "ArqMac".
+
+    Main attributes:
+        my_drone: the drone that installed the p-persistent CSMA protocol
+        simulator: the simulation platform that contains everything
+        env: simulation environment created by simpy
+        phy: the installed physical layer
+        channel_states: used to determine if the channel is idle
+        persistence_probability: probability of sending in an idle slot
+        rng_mac: random number generator of the drone for the persistence
+
+    References:
+        [1] L. Kleinrock and F. Tobagi, "Packet Switching in Radio Channels: Part I - Carrier Sense Multiple-Access
+            Modes and Their Throughput-Delay Characteristics," IEEE Transactions on Communications, vol. 23, no. 12,
+            pp. 1400-1416, 1975.
+
+    Author: Zihao Zhou, eezihaozhou@gmail.com
+    Created at: 2026/10/18
+    Updated at: 2026/10/19
+    """
+
+    def __init__(self, drone):
+        super().__init__(drone)
+
+        self.phy = Phy(self)
+        self.channel_states = self.simulator.channel_states
+
+        self.enable_aggregation = 0
+        self.enable_rate_adaptation = 0
+
+        self.persistence_probability = 0.1
+        self.rng_mac = random.Random(self.my_drone.identifier + self.simulator.seed + 5)
+
+    def mac_send(self, pkd):
+        """
+        Control when drone can send packet
+        :param pkd: the packet that needs to send
+        :return: none
+        """
+
+        if pkd.number_retransmission_attempt[self.my_drone.identifier] == 1:
+            pkd.backoff_start_time = self.env.now
+
+        # tune the data radio to the channel of the next hop before sensing it
+        yield self.env.process(self.tune_to_next_hop(pkd))
+
+        channel = self.phy.get_transmitting_channel(pkd)
+
+        # wait for the beginning of the next slot
+        yield self.env.timeout(math.ceil(self.env.now / config.SLOT_DURATION) * config.SLOT_DURATION - self.env.now)
+
+        while True:
+            if check_channel_availability(self.channel_states, self.my_drone, self.simulator.drones, channel):
+                if self.rng_mac.random() < self.persistence_probability:
+                    break
+
+            yield self.env.timeout(config.SLOT_DURATION)
+
+        # let the other drones sense the channel at the beginning of this slot first
+        yield self.env.timeout(0)
+
+        key = 'mac_send' + str(self.my_drone.identifier) + '_' + str(pkd.packet_id)
+        self.my_drone.mac_process_finish[key] = 1  # mark the process as "finished"
+
+        # occupy the channel to send packet
+        self.phy.transmitting_channel = channel
+        with self.channel_states[self.my_drone.identifier].request() as req:
+            yield req
+
+            logging.info('UAV: %s can send packet (pkd id: %s) at: %s ',
+                         self.my_drone.identifier, pkd.packet_id, self.env.now)
+
+            pkd.transmitting_start_time = self.env.now
+            transmission_mode = pkd.transmission_mode
+
+            if transmission_mode == 0:  # for unicast
+                # only unicast data packets need to wait for ACK
+                logging.info('UAV: %s start to wait ACK for packet: %s at time: %s',
+                             self.my_drone.identifier, pkd.packet_id, self.env.now)
+
+                next_hop_id = pkd.next_hop_id
+
+                pkd.increase_ttl()
+                self.phy.unicast(pkd, next_hop_id)  # note: unicast function should be executed first!
+                yield self.env.timeout(pkd.get_transmission_time())  # transmission delay
+
+                if self.enable_ack:
+                    ack_deadline = self.env.now + self.get_ack_timeout(pkd)
+                    wait_ack_process = self.start_wait_ack(pkd)
+
+                    # continue to occupy the channel to prevent the ACK from being interfered
+                    yield self.env.timeout(config.SIFS_DURATION + config.ACK_PACKET_LENGTH / config.BIT_RATE * 1e6 +
+                                           pkd.get_max_ack_deferral())
+
+                    # the data radio stays on the channel of the next hop until the ACK arrives
+                    yield self.env.process(self.stay_for_ack([wait_ack_process], ack_deadline))
+
+            elif transmission_mode == 1:
+                pkd.increase_ttl()
+                self.phy.broadcast(pkd)
+                yield self.env.timeout(pkd.get_transmission_time())
+
+        yield self.env.process(self.return_to_data_channel())
+
+    @staticmethod
+    def analytic_throughput(drone_num, persistence_probability, transmission_duration,
+                            slot_duration=config.SLOT_DURATION):
+        """
+        Saturation throughput of slotted p-persistent CSMA when all drones can sense each other and always have packets
+        to send. In each idle slot, every drone sends with probability p, a transmission succeeds if no other drone
+        sends in the same slot, and the channel is busy for "transmission_duration" after any transmission
+        :param drone_num: number of drones
+        :param persistence_probability: probability of sending in an idle slot
+        :param transmission_duration: time for which the channel is busy after a transmission, unit: us
+        :param slot_duration: duration of a slot, unit: us
+        :return: fraction of time occupied by successful transmissions
+        """
+
+        p = persistence_probability
+        idle_probability = (1 - p) ** drone_num
+        success_probability = drone_num * p * (1 - p) ** (drone_num - 1)
+
+        return (success_probability * transmission_duration /
+                (idle_probability * slot_duration + (1 - idle_probability) * transmission_duration))
@@ -1,6 +1,7 @@
-import simpy
 import logging
 import random
+import math
+from mac.retransmission import ArqMac
 from phy.phy import Phy
 from utils import config
 
@@ -12,7 +13,7 @@ logging.basicConfig(filename='running_log.log',
                     )
 
 
-class PureAloha:
+class PureAloha(ArqMac):
     """
     Pure ALOHA protocol
 
@@ -24,33 +25,57 @@ class PureAloha:
         1) when a node has a packet to send, it just sends it, without listening to the channel and random backoff
         2) after sending the packet, the node starts to wait for the ACK
         3) if it receives ACK, the mac_send process will finish
-        4) if not, the node will wait a random amount of time, according to the number of re-transmissions attempts
+        4) if not, the packet is handed over to the "RetransmissionScheduler" of the drone, and the node waits a random
+           amount of time, according to the number of re-transmissions attempts, before sending it again
+
+    Broadcast frames are not acknowledged, thus they are delayed by a random time within "broadcast_window". Otherwise,
+    the periodic broadcasts generated at the same time by different drones (e.g., hello packets) would collide again
+    and again
+
+    The ACK handling, the sliding window and the re-transmissions are inherited from "ArqMac". As in the other mac
+    protocols, the ACK timeout starts when the transmission of the frame ends
 
     Author: Zihao Zhou, eezihaozhou@gmail.com
     Created at: 2024/4/22
-    Updated at: 2024/5/1
+    Updated at: 2026/10/19
     """
 
     def __init__(self, drone):
-        self.my_drone = drone
-        self.simulator = drone.simulator
-        self.env = drone.env
+        super().__init__(drone)
+
         self.phy = Phy(self)
         self.channel_states = self.simulator.channel_states
-        self.enable_ack = True
 
-        self.wait_ack_process_dict = dict()
-        self.wait_ack_process_finish = dict()
-        self.wait_ack_process_count = 0
-        self.wait_ack_process = None
+        self.rng_mac = random.Random(self.my_drone.identifier + self.simulator.seed + 6)
+        self.broadcast_window = 8 * config.DATA_PACKET_LENGTH / config.BIT_RATE * 1e6
+
+        self.enable_aggregation = 0
+        self.enable_rate_adaptation = 0
 
     def mac_send(self, pkd):
-        yield self.env.timeout(0.01)
-        key = str(self.my_drone.identifier) + '_' + str(self.my_drone.mac_process_count)  # label of the process
+        transmission_attempt = pkd.number_retransmission_attempt[self.my_drone.identifier]
+
+        # tune the data radio to the channel of the next hop
+        yield self.env.process(self.tune_to_next_hop(pkd))
+
+        if pkd.transmission_mode == 1:
+            yield self.env.timeout(self.rng_mac.uniform(0, self.broadcast_window))
+        else:
+            if transmission_attempt > 1:
+                # a re-transmission is deferred by a random time, according to the number of attempts so far
+                yield self.env.timeout(self.rng_mac.randint(0, 2 ** (transmission_attempt - 1)) * 100)
+
+            yield self.env.timeout(0.01)
+
+        key = 'mac_send' + str(self.my_drone.identifier) + '_' + str(pkd.packet_id)  # label of the process
         self.my_drone.mac_process_finish[key] = 1  # mark the process as "finished"
 
         logging.info('UAV: %s can send packet at: %s', self.my_drone.identifier, self.env.now)
 
+        if transmission_attempt == 1:
+            pkd.backoff_start_time = self.env.now  # there is no backoff, the service time starts at once
+        pkd.transmitting_start_time = self.env.now
+
         transmission_mode = pkd.transmission_mode
 
         if transmission_mode == 0:  # for unicast
@@ -60,50 +85,32 @@ class PureAloha:
 
             next_hop_id = pkd.next_hop_id
 
-            if self.enable_ack:
-                self.wait_ack_process_count += 1
-                key2 = str(self.my_drone.identifier) + '_' + str(self.wait_ack_process_count)
-                self.wait_ack_process = self.env.process(self.wait_ack(pkd))
-                self.wait_ack_process_dict[key2] = self.wait_ack_process
-                self.wait_ack_process_finish[key2] = 0
-
             pkd.increase_ttl()
             self.phy.unicast(pkd, next_hop_id)
-            yield self.env.timeout(pkd.packet_length / config.BIT_RATE * 1e6)
+            yield self.env.timeout(pkd.get_transmission_time())
+
+            if self.enable_ack:
+                ack_deadline = self.env.now + self.get_ack_timeout(pkd)
+                wait_ack_process = self.start_wait_ack(pkd)
+
+                # the data radio stays on the channel of the next hop until the ACK arrives
+                yield self.env.process(self.stay_for_ack([wait_ack_process], ack_deadline))
 
         elif transmission_mode == 1:
             pkd.increase_ttl()
             self.phy.broadcast(pkd)
-            yield self.env.timeout(pkd.packet_length / config.BIT_RATE * 1e6)
+            yield self.env.timeout(pkd.get_transmission_time())
+
+        yield self.env.process(self.return_to_data_channel())
 
-    def wait_ack(self, pkd):
+    @staticmethod
+    def analytic_throughput(offered_load):
         """
-        If ACK is received within the specified time, the transmission is successful, otherwise,
-        a re-transmission will be originated
-        :param pkd: the data packet that waits for ACK
-        :return: none
+        Throughput of pure ALOHA with Poisson offered load, a packet succeeds only if no other packet starts within one
+        packet time before or after it
+        :param offered_load: average number of transmissions (including re-transmissions) per packet time
+        :return: average number of successful transmissions per packet time, the maximum is 1/(2e) at an offered load
+                 of 0.5
         """
 
-        try:
-            yield self.env.timeout(config.ACK_TIMEOUT)
-
-            key2 = str(self.my_drone.identifier) + '_' + str(self.wait_ack_process_count)
-            self.wait_ack_process_finish[key2] = 1
-
-            logging.info('ACK timeout of packet: %s', pkd.packet_id)
-            # timeout expired
-            if pkd.number_retransmission_attempt[self.my_drone.identifier] < config.MAX_RETRANSMISSION_ATTEMPT:
-                # random wait
-                transmission_attempt = pkd.number_retransmission_attempt[self.my_drone.identifier]
-                r = random.randint(0, 2 ** transmission_attempt)
-                waiting_time = r * 100
-
-                yield self.env.timeout(waiting_time)
-                yield self.env.process(self.my_drone.packet_coming(pkd))  # resend
-            else:
-                logging.info('Packet: %s is dropped!', pkd.packet_id)
-
-        except simpy.Interrupt:
-            # receive ACK in time
-            logging.info('UAV: %s receives the ACK for data packet: %s, at: %s',
-                         self.my_drone.identifier, pkd.packet_id, self.env.now)
+        return offered_load * math.exp(-2 * offered_load)
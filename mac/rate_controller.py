@@ -0,0 +1,82 @@
+from collections import defaultdict
+from utils import config
+
+
+class RateController:
+    """
+    SINR-based rate adaptation for IEEE 802.11b (1, 2, 5.5 and 11 Mbps)
+
+    The path loss of a link is symmetric, so the SINR of the frames received from a neighbor indicates the quality of
+    the link towards it. For each neighbor, the SINR of its frames is smoothed by an exponentially weighted moving
+    average, and the highest bit rate whose SINR threshold (plus a margin) is met is selected for the unicast frames
+    sent to it. Since the measurement may be outdated or disturbed by interference, each consecutive ACK timeout on the
+    link steps the rate down by one level (as in ARF), and a received ACK resets the count. A neighbor that has never
+    been heard is served at the default bit rate.
+
+    Attributes:
+        my_drone: the drone that installed the controller
+        bit_rates: supported bit rates in ascending order
+        smoothing_factor: weight of the latest SINR sample
+        snr_margin: margin added to the SINR thresholds, in dB
+        link_snr: {neighbor: smoothed SINR of its frames, in dB}
+        failure_count: {neighbor: number of consecutive ACK timeouts}
+
+    References:
+        [1] G. Holland, N. Vaidya and P. Bahl, "A Rate-Adaptive MAC Protocol for Multi-Hop Wireless Networks," in
+            Proceedings of the 7th Annual International Conference on Mobile Computing and Networking (MobiCom),
+            pp. 236-251, 2001.
+        [2] A. Kamerman and L. Monteban, "WaveLAN-II: A High-Performance Wireless LAN for the Unlicensed Band," Bell
+            Labs Technical Journal, vol. 2, no. 3, pp. 118-133, 1997.
+
+    Author: Zihao Zhou, eezihaozhou@gmail.com
+    Created at: 2026/10/18
+    Updated at: 2026/10/18
+    """
+
+    def __init__(self, my_drone):
+        self.my_drone = my_drone
+        self.bit_rates = sorted(config.SNR_THRESHOLD_OF_BIT_RATE.keys())
+        self.smoothing_factor = 0.3
+        self.snr_margin = 0  # dB, a positive margin makes the selection more conservative
+
+        self.link_snr = dict()
+        self.failure_count = defaultdict(int)
+
+    def update_snr(self, neighbor_id, sinr):
+        if neighbor_id not in self.link_snr:
+            self.link_snr[neighbor_id] = sinr
+        else:
+            self.link_snr[neighbor_id] = ((1 - self.smoothing_factor) * self.link_snr[neighbor_id] +
+                                          self.smoothing_factor * sinr)
+
+    def select_bit_rate(self, neighbor_id):
+        """
+        Select the bit rate of the unicast frames to a neighbor
+        :param neighbor_id: identifier of the neighbor
+        :return: the selected bit rate, in bps
+        """
+
+        if neighbor_id not in self.link_snr:
+            return config.BIT_RATE
+
+        level = 0
+        for i, bit_rate in enumerate(self.bit_rates):
+            if self.link_snr[neighbor_id] >= config.SNR_THRESHOLD_OF_BIT_RATE[bit_rate] + self.snr_margin:
+                level = i
+
+        level = max(0, level - self.failure_count[neighbor_id])
+
+        return self.bit_rates[level]
+
+    def report(self, neighbor_id, success):
+        """
+        Report the outcome of a unicast frame
+        :param neighbor_id: identifier of the next hop
+        :param success: whether the frame is acknowledged
+        :return: none
+        """
+
+        if success:
+            self.failure_count[neighbor_id] = 0
+        else:
+            self.failure_count[neighbor_id] += 1
@@ -0,0 +1,310 @@
+import simpy
+import logging
+from utils import config
+
+# config logging
+logging.basicConfig(filename='running_log.log',
+                    filemode='w',  # there are two modes: 'a' and 'w'
+                    format='%(asctime)s - %(levelname)s - %(message)s',
+                    level=config.LOGGING_LEVEL
+                    )
+
+
+class RetransmissionScheduler:
+    """
+    Per-drone scheduler of re-transmissions
+
+    When the ACK of a frame times out (or its RTS is not answered), the process waiting for it hands the frame over to
+    the scheduler and finishes, then the scheduler puts the frames into the buffer of the drone again one after another.
+    In this way, a re-transmission is not yielded inside the waiting process of the previous attempt, so the processes
+    of the earlier attempts of a frame do not stay alive until the frame is finally acknowledged or dropped.
+
+    Attributes:
+        my_drone: the drone that installed the scheduler
+        env: simulation environment created by simpy
+        retransmission_queue: a "Store" in simpy, the frames waiting for re-transmission
+
+    Author: Zihao Zhou, eezihaozhou@gmail.com
+    Created at: 2026/10/18
+    Updated at: 2026/10/18
+    """
+
+    def __init__(self, my_drone):
+        self.my_drone = my_drone
+        self.env = my_drone.env
+        self.retransmission_queue = simpy.Store(self.env)
+
+        self.env.process(self.run())
+
+    def schedule(self, pkd):
+        logging.info('Packet: %s is scheduled for re-transmission at UAV: %s at: %s',
+                     pkd.packet_id, self.my_drone.identifier, self.env.now)
+
+        self.retransmission_queue.put(pkd)
+
+    def run(self):
+        while True:
+            pkd = yield self.retransmission_queue.get()
+            yield self.env.process(self.my_drone.packet_coming(pkd))
+
+
+class AckTimeoutEstimator:
+    """
+    Adaptive ACK timeout
+
+    The ACK turnaround time, i.e., the time from the end of a transmission to the reception of its ACK, is measured for
+    each next hop, and the ACK timeout is estimated in the same way as the retransmission timeout of TCP:
+        SRTT <- (1 - alpha) * SRTT + alpha * R
+        RTTVAR <- (1 - beta) * RTTVAR + beta * |SRTT - R|
+        timeout = SRTT + max(G, K * RTTVAR)
+    where R is the latest sample. Until the first sample of a next hop is obtained, "ACK_TIMEOUT" is used. The
+    turnaround of a re-transmitted frame is not measured since the ACK may belong to an earlier attempt (Karn's
+    algorithm). The samples exclude the waiting time which depends on the frame (e.g., for a longer ACK carrying a
+    piggybacked beacon), which is added to the estimated timeout by the mac protocol.
+
+    Attributes:
+        alpha: weight of the latest sample in SRTT
+        beta: weight of the latest deviation in RTTVAR
+        k: weight of RTTVAR in the timeout
+        granularity: lower bound of the margin above SRTT, it absorbs the jitter of the ACK turnaround time
+        max_timeout: upper bound of the estimated timeout, unit: us
+        srtt: {next hop: smoothed turnaround time, in us}
+        rttvar: {next hop: turnaround time variation, in us}
+
+    References:
+        [1] V. Paxson, M. Allman, J. Chu and M. Sargent, "Computing TCP's Retransmission Timer," RFC 6298, 2011.
+        [2] P. Karn and C. Partridge, "Improving Round-Trip Time Estimates in Reliable Transport Protocols," ACM
+            SIGCOMM Computer Communication Review, vol. 17, no. 5, pp. 2-7, 1987.
+
+    Author: Zihao Zhou, eezihaozhou@gmail.com
+    Created at: 2026/10/18
+    Updated at: 2026/10/19
+    """
+
+    def __init__(self):
+        self.alpha = 1 / 8
+        self.beta = 1 / 4
+        self.k = 4
+        self.granularity = config.SLOT_DURATION
+        self.max_timeout = 4 * config.ACK_TIMEOUT
+
+        self.srtt = dict()
+        self.rttvar = dict()
+
+    def update(self, next_hop_id, turnaround):
+        if next_hop_id not in self.srtt:
+            self.srtt[next_hop_id] = turnaround
+            self.rttvar[next_hop_id] = turnaround / 2
+        else:
+            self.rttvar[next_hop_id] = ((1 - self.beta) * self.rttvar[next_hop_id] +
+                                        self.beta * abs(self.srtt[next_hop_id] - turnaround))
+            self.srtt[next_hop_id] = (1 - self.alpha) * self.srtt[next_hop_id] + self.alpha * turnaround
+
+    def get_timeout(self, next_hop_id):
+        if next_hop_id not in self.srtt:
+            return config.ACK_TIMEOUT
+        else:
+            timeout = self.srtt[next_hop_id] + max(self.granularity, self.k * self.rttvar[next_hop_id])
+            return min(timeout, self.max_timeout)
+
+
+class ArqMac:
+    """
+    Common ARQ (Automatic Repeat reQuest) part of the mac protocols that acknowledge their unicast data frames
+
+    Once a unicast data frame has been sent, a "wait_ack" process waits for its ACK. If the ACK times out, the frame is
+    handed over to the "RetransmissionScheduler" until it reaches "MAX_RETRANSMISSION_ATTEMPT". In sliding window mode,
+    i.e., when "enable_blocking" of the drone is 0, the unacknowledged frames are recorded as outstanding, and at most
+    "window_size" of them towards one next hop (and "max_outstanding_num" in total) can wait for their ACKs at the same
+    time. The mac protocols inherit from this class and implement the channel access in "mac_send"
+
+    In multi-channel operation (see "ChannelAssignment"), every mac protocol tunes the data radio to the data channel of
+    the next hop before sending a unicast frame ("tune_to_next_hop"), keeps it there until the ACK is received or the
+    waiting time expires ("stay_for_ack"), and then goes back to its own channel ("return_to_data_channel")
+
+    Attributes:
+        my_drone: the drone that installed the mac protocol
+        simulator: the simulation platform that contains everything
+        env: simulation environment created by simpy
+        enable_ack: use ack or not
+        window_size: maximum number of unacknowledged frames towards one next hop in sliding window mode
+        max_outstanding_num: maximum number of unacknowledged frames of the drone in sliding window mode
+        outstanding_frames: a dictionary, the key is the label of the "wait_ack" process of an unacknowledged frame and
+                            the value is the next hop of the frame
+        retransmission_scheduler: puts the frames whose ACK times out into the buffer again
+        enable_adaptive_ack_timeout: use the ACK timeout estimated from the measured ACK turnaround time or not
+        ack_timeout_estimator: estimates the ACK timeout of each next hop
+
+    Author: Zihao Zhou, eezihaozhou@gmail.com
+    Created at: 2026/10/19
+    Updated at: 2026/10/19
+    """
+
+    def __init__(self, drone):
+        self.my_drone = drone
+        self.simulator = drone.simulator
+        self.env = drone.env
+        self.enable_ack = True
+
+        self.wait_ack_process_dict = dict()
+        self.wait_ack_process_finish = dict()
+        self.wait_ack_process_count = 0
+        self.wait_ack_process = None
+
+        self.window_size = 4
+        self.max_outstanding_num = 16
+        self.outstanding_frames = dict()
+
+        self.retransmission_scheduler = RetransmissionScheduler(drone)
+        self.enable_adaptive_ack_timeout = 0
+        self.ack_timeout_estimator = AckTimeoutEstimator()
+
+    def get_outstanding_num(self, next_hop_id=None):
+        """
+        Count the unacknowledged frames of the drone
+        :param next_hop_id: only count the frames towards this next hop if it is given
+        :return: number of unacknowledged frames
+        """
+
+        if next_hop_id is None:
+            return len(self.outstanding_frames)
+        else:
+            return sum(1 for hop in self.outstanding_frames.values() if hop == next_hop_id)
+
+    def window_available(self, next_hop_id):
+        return self.get_outstanding_num(next_hop_id) < self.window_size
+
+    def release_frame(self, key2):
+        """
+        Remove an acknowledged (or dropped) frame from the window, the packets set aside for the window (see
+        "Drone.get_deferred_packet") can then be sent
+        :param key2: label of the "wait_ack" process of the frame
+        :return: none
+        """
+
+        if key2 in self.outstanding_frames:
+            del self.outstanding_frames[key2]
+
+    def start_wait_ack(self, pkd, extra_wait=0):
+        """
+        Start waiting for the ACK of a unicast data frame that has just been sent
+        :param pkd: the data packet that waits for ACK
+        :param extra_wait: additional waiting time, e.g., for the block ACK of an A-MPDU, unit: us
+        :return: the "wait_ack" process
+        """
+
+        key2 = 'wait_ack' + str(self.my_drone.identifier) + '_' + str(pkd.packet_id)
+        self.wait_ack_process = self.env.process(self.wait_ack(pkd, extra_wait))
+        self.wait_ack_process_dict[key2] = self.wait_ack_process
+        self.wait_ack_process_finish[key2] = 0  # indicate that this process hasn't finished
+
+        if not self.my_drone.enable_blocking:
+            # a retransmitted frame stays in the window under the same label
+            self.outstanding_frames[key2] = pkd.next_hop_id
+
+        return self.wait_ack_process
+
+    def drop_frame(self, pkd):
+        """
+        Give up a frame that has used up its transmission attempts. The "wait_ack" entry left by its earlier attempts
+        is finished and the frame leaves the window, otherwise, the drone would be blocked forever in stop-and-wait
+        mode, or the window would never slide in sliding window mode
+        :param pkd: the data packet that is dropped
+        :return: none
+        """
+
+        key2 = 'wait_ack' + str(self.my_drone.identifier) + '_' + str(pkd.packet_id)
+
+        self.simulator.metrics.mac_delay.append((self.simulator.env.now - pkd.backoff_start_time) / 1e3)
+
+        self.wait_ack_process_finish[key2] = 1
+        self.release_frame(key2)
+
+        logging.info('Packet: %s is dropped!', pkd.packet_id)
+
+    @staticmethod
+    def get_ack_extra_wait(pkd):
+        # the ACK of a frame carrying a piggybacked beacon may also carry a beacon of the same length, and the
+        # candidates of opportunistic forwarding reply one after another
+        return pkd.beacon_length / config.BIT_RATE * 1e6 + pkd.get_max_ack_deferral()
+
+    def get_ack_timeout(self, pkd, extra_wait=0):
+        if self.enable_adaptive_ack_timeout:
+            ack_timeout = self.ack_timeout_estimator.get_timeout(pkd.next_hop_id)
+        else:
+            ack_timeout = config.ACK_TIMEOUT
+
+        return ack_timeout + self.get_ack_extra_wait(pkd) + extra_wait
+
+    def tune_to_next_hop(self, pkd):
+        """
+        Tune the data radio to the data channel of the next hop before sending a unicast frame, the next hop only
+        listens to its own data channel
+        :param pkd: the packet that needs to send
+        :return: none
+        """
+
+        if pkd.transmission_mode == 0:
+            next_hop_channel = self.simulator.drones[pkd.next_hop_id].mac_protocol.phy.data_channel
+            if next_hop_channel != self.phy.tuned_channel:
+                yield self.env.process(self.phy.switch_channel(next_hop_channel))
+
+    def stay_for_ack(self, wait_ack_processes, ack_deadline):
+        """
+        Keep the data radio on the channel of the next hop until the ACKs of the frame are received, since the next hop
+        replies on its own data channel
+        :param wait_ack_processes: a list, the "wait_ack" processes of the frame (one per subframe of an A-MPDU)
+        :param ack_deadline: the time at which the ACK times out
+        :return: none
+        """
+
+        if self.phy.tuned_channel != self.phy.data_channel:
+            yield self.env.all_of(wait_ack_processes) | self.env.timeout(max(0, ack_deadline - self.env.now))
+
+    def return_to_data_channel(self):
+        # tune the data radio back to my own data channel to receive the frames sent to me
+        if self.phy.tuned_channel != self.phy.data_channel:
+            yield self.env.process(self.phy.switch_channel(self.phy.data_channel))
+
+    def report_ack_result(self, pkd, success):
+        # called once the ACK of a frame is received or times out, nothing to do by default
+        pass
+
+    def wait_ack(self, pkd, extra_wait=0):
+        """
+        If ACK is received within the specified time, the transmission is successful, otherwise,
+        a re-transmission will be originated
+        :param pkd: the data packet that waits for ACK
+        :param extra_wait: additional waiting time, e.g., for the block ACK of an A-MPDU, unit: us
+        :return: none
+        """
+
+        key2 = 'wait_ack' + str(self.my_drone.identifier) + '_' + str(pkd.packet_id)
+        start_time = self.env.now
+
+        try:
+            yield self.env.timeout(self.get_ack_timeout(pkd, extra_wait))
+
+            logging.info('ACK timeout of packet: %s at: %s', pkd.packet_id, self.env.now)
+
+            self.report_ack_result(pkd, success=False)
+
+            if pkd.number_retransmission_attempt[self.my_drone.identifier] < config.MAX_RETRANSMISSION_ATTEMPT:
+                # in sliding window mode, only this frame is retransmitted while the other outstanding frames keep
+                # their own timers
+                self.retransmission_scheduler.schedule(pkd)
+            else:
+                self.drop_frame(pkd)
+
+        except simpy.Interrupt:
+            # receive ACK in time
+            logging.info('UAV: %s receives the ACK for data packet: %s, at: %s',
+                         self.my_drone.identifier, pkd.packet_id, self.env.now)
+
+            self.report_ack_result(pkd, success=True)
+
+            if pkd.number_retransmission_attempt[self.my_drone.identifier] == 1 and pkd.candidate_list is None:
+                turnaround = self.env.now - start_time - self.get_ack_extra_wait(pkd) - extra_wait
+                self.ack_timeout_estimator.update(pkd.next_hop_id, turnaround)
+
+            self.release_frame(key2)
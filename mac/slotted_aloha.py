@@ -0,0 +1,144 @@
+import logging
+import math
+import random
+from mac.retransmission import ArqMac
+from phy.phy import Phy
+from utils import config
+
+# config logging
+logging.basicConfig(filename='running_log.log',
+                    filemode='w',  # there are two modes: 'a' and 'w'
+                    format='%(asctime)s - %(levelname)s - %(message)s',
+                    level=config.LOGGING_LEVEL
+                    )
+
+
+class SlottedAloha(ArqMac):
+    """
+    Slotted ALOHA protocol
+
+    The time is divided into slots of "ALOHA_SLOT_DURATION", which are common to all drones, and a packet can only be
+    sent at the beginning of a slot. Compared with pure ALOHA, a packet can only collide with the packets sent in the
+    same slot, so the vulnerable period is halved. The basic flow of the slotted ALOHA is as follows:
+        1) when a node has a packet to send, it sends the packet at the beginning of the next slot, without listening
+           to the channel
+        2) after sending the packet, the node starts to wait for the ACK, which is replied within the same slot
+        3) if it receives ACK, the mac_send process will finish
+        4) if not, the packet is handed over to the "RetransmissionScheduler", and the node defers the re-transmission
+           by a random number of slots, which is drawn from [0, 2^k - 1] after the k-th failure
+
+    Broadcast frames are not acknowledged, thus they are sent in a random one of the next "broadcast_window" slots.
+    Otherwise, the periodic broadcasts generated at the same time by different drones (e.g., hello packets) would
+    collide again and again.
+
+    Since all the events happen at the slot boundaries, the transmissions of many drones are processed at the same
+    time steps.
+
+    The ACK handling, the sliding window and the re-transmissions are inherited from "ArqMac".
+
+    Main attributes:
+        my_drone: the drone that installed the slotted ALOHA protocol
+        simulator: the simulation platform that contains everything
+        env: simulation environment created by simpy
+        phy: the installed physical layer
+        channel_states: used to indicate that the drone is transmitting
+        slot_duration: duration of a slot, unit: us
+        broadcast_window: number of slots over which the broadcast frames are spread
+        rng_mac: random number generator of the drone for the backoff
+
+    References:
+        [1] L. G. Roberts, "ALOHA Packet System with and without Slots and Capture," ACM SIGCOMM Computer
+            Communication Review, vol. 5, no. 2, pp. 28-42, 1975.
+
+    Author: Zihao Zhou, eezihaozhou@gmail.com
+    Created at: 2026/10/18
+    Updated at: 2026/10/19
+    """
+
+    def __init__(self, drone):
+        super().__init__(drone)
+
+        self.phy = Phy(self)
+        self.channel_states = self.simulator.channel_states
+
+        self.enable_aggregation = 0
+        self.enable_rate_adaptation = 0
+
+        self.slot_duration = config.ALOHA_SLOT_DURATION
+        self.broadcast_window = 8
+        self.rng_mac = random.Random(self.my_drone.identifier + self.simulator.seed + 4)
+
+    def next_slot_start(self):
+        return math.ceil(self.env.now / self.slot_duration) * self.slot_duration
+
+    def mac_send(self, pkd):
+        """
+        Send the packet at the beginning of a slot
+        :param pkd: the packet that needs to send
+        :return: none
+        """
+
+        transmission_attempt = pkd.number_retransmission_attempt[self.my_drone.identifier]
+
+        if transmission_attempt == 1:
+            # the waiting time for the slot takes the place of the backoff in the service time of the packet
+            pkd.backoff_start_time = self.env.now
+
+        # tune the data radio to the channel of the next hop while waiting for the slot
+        yield self.env.process(self.tune_to_next_hop(pkd))
+
+        if pkd.transmission_mode == 1:
+            backoff_slots = self.rng_mac.randint(0, self.broadcast_window - 1)
+        else:
+            # a re-transmission is deferred by a random number of slots
+            backoff_slots = self.rng_mac.randint(0, 2 ** (transmission_attempt - 1) - 1)
+        yield self.env.timeout(self.next_slot_start() + backoff_slots * self.slot_duration - self.env.now)
+
+        key = 'mac_send' + str(self.my_drone.identifier) + '_' + str(pkd.packet_id)
+        self.my_drone.mac_process_finish[key] = 1  # mark the process as "finished"
+
+        self.phy.transmitting_channel = self.phy.get_transmitting_channel(pkd)
+        with self.channel_states[self.my_drone.identifier].request() as req:
+            yield req
+
+            logging.info('UAV: %s sends packet (pkd id: %s) at the beginning of slot: %s ',
+                         self.my_drone.identifier, pkd.packet_id, round(self.env.now / self.slot_duration))
+
+            pkd.transmitting_start_time = self.env.now
+            transmission_mode = pkd.transmission_mode
+
+            if transmission_mode == 0:  # for unicast
+                # only unicast data packets need to wait for ACK
+                logging.info('UAV: %s start to wait ACK for packet: %s at time: %s',
+                             self.my_drone.identifier, pkd.packet_id, self.env.now)
+
+                next_hop_id = pkd.next_hop_id
+
+                pkd.increase_ttl()
+                self.phy.unicast(pkd, next_hop_id)  # note: unicast function should be executed first!
+                yield self.env.timeout(pkd.get_transmission_time())  # transmission delay
+
+                if self.enable_ack:
+                    ack_deadline = self.env.now + self.get_ack_timeout(pkd)
+                    wait_ack_process = self.start_wait_ack(pkd)
+
+                    # the data radio stays on the channel of the next hop until the ACK arrives
+                    yield self.env.process(self.stay_for_ack([wait_ack_process], ack_deadline))
+
+            elif transmission_mode == 1:
+                pkd.increase_ttl()
+                self.phy.broadcast(pkd)
+                yield self.env.timeout(pkd.get_transmission_time())
+
+        yield self.env.process(self.return_to_data_channel())
+
+    @staticmethod
+    def analytic_throughput(offered_load):
+        """
+        Throughput of slotted ALOHA with Poisson offered load, i.e., the probability that a slot carries exactly one
+        transmission
+        :param offered_load: average number of transmissions (including re-transmissions) per slot
+        :return: average number of successful transmissions per slot, the maximum is 1/e at an offered load of 1
+        """
+
+        return offered_load * math.exp(-offered_load)
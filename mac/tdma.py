@@ -0,0 +1,270 @@
+import logging
+import math
+from mac.retransmission import ArqMac
+from phy.phy import Phy
+from phy.large_scale_fading import maximum_communication_range
+from utils import config
+from utils.util_function import euclidean_distance
+
+# config logging
+logging.basicConfig(filename='running_log.log',
+                    filemode='w',  # there are two modes: 'a' and 'w'
+                    format='%(asctime)s - %(levelname)s - %(message)s',
+                    level=config.LOGGING_LEVEL
+                    )
+
+
+class Tdma(ArqMac):
+    """
+    Medium access control protocol: TDMA (Time Division Multiple Access)
+
+    The time is divided into frames, and each frame into slots of "TDMA_SLOT_DURATION". Each drone owns one slot per
+    frame, which is given by "TdmaSchedule", and the schedule is conflict-free, i.e., no other drone within two hops
+    (or within the interference range) sends in the same slot. Therefore, there is no need for carrier sensing and
+    random backoff. The basic flow is as follows:
+        1) when a node has a packet to send, it waits until the beginning of its next slot
+        2) the node sends the packet, a unicast data packet is acknowledged by the next hop within the same slot
+        3) if the ACK is not received in time, the packet is re-transmitted in one of the following slots
+
+    The ACK handling, the sliding window and the re-transmissions are inherited from "ArqMac".
+
+    Main attributes:
+        my_drone: the drone that installed the TDMA protocol
+        simulator: the simulation platform that contains everything
+        env: simulation environment created by simpy
+        phy: the installed physical layer
+        channel_states: used to indicate that the drone is transmitting
+        enable_aggregation: frame aggregation is not supported by TDMA
+        enable_rate_adaptation: rate adaptation is not supported by TDMA
+
+    References:
+        [1] I. Rhee, A. Warrier, J. Min and L. Xu, "DRAND: Distributed Randomized TDMA Scheduling for Wireless Ad Hoc
+            Networks," IEEE Transactions on Mobile Computing, vol. 8, no. 10, pp. 1384-1396, 2009.
+
+    Author: Zihao Zhou, eezihaozhou@gmail.com
+    Created at: 2026/10/18
+    Updated at: 2026/10/19
+    """
+
+    def __init__(self, drone):
+        super().__init__(drone)
+
+        self.phy = Phy(self)
+        self.channel_states = self.simulator.channel_states
+
+        self.enable_aggregation = 0
+        self.enable_rate_adaptation = 0
+
+    def mac_send(self, pkd):
+        """
+        Send the packet at the beginning of the next slot of the drone
+        :param pkd: the packet that needs to send
+        :return: none
+        """
+
+        schedule = self.simulator.tdma_schedule
+
+        # tune the data radio to the channel of the next hop while waiting for the slot
+        yield self.env.process(self.tune_to_next_hop(pkd))
+
+        if pkd.number_retransmission_attempt[self.my_drone.identifier] == 1:
+            # the waiting time for the slot takes the place of the backoff in the service time of the packet
+            pkd.backoff_start_time = self.env.now
+
+        while True:
+            # the schedule may be updated while waiting, in which case the slot is looked up again
+            slot_start = schedule.next_slot_start(self.my_drone.identifier, self.env.now)
+
+            if slot_start - self.env.now <= schedule.time_tolerance:
+                break
+            else:
+                yield self.env.timeout(slot_start - self.env.now)
+
+        key = 'mac_send' + str(self.my_drone.identifier) + '_' + str(pkd.packet_id)
+        self.my_drone.mac_process_finish[key] = 1  # mark the process as "finished"
+
+        self.phy.transmitting_channel = self.phy.get_transmitting_channel(pkd)
+        with self.channel_states[self.my_drone.identifier].request() as req:
+            yield req
+
+            logging.info('UAV: %s can send packet (pkd id: %s) in its slot at: %s ',
+                         self.my_drone.identifier, pkd.packet_id, self.env.now)
+
+            pkd.transmitting_start_time = self.env.now
+            transmission_mode = pkd.transmission_mode
+
+            if transmission_mode == 0:  # for unicast
+                # only unicast data packets need to wait for ACK
+                logging.info('UAV: %s start to wait ACK for packet: %s at time: %s',
+                             self.my_drone.identifier, pkd.packet_id, self.env.now)
+
+                next_hop_id = pkd.next_hop_id
+
+                pkd.increase_ttl()
+                self.phy.unicast(pkd, next_hop_id)  # note: unicast function should be executed first!
+                yield self.env.timeout(pkd.get_transmission_time())  # transmission delay
+
+                if self.enable_ack:
+                    ack_deadline = self.env.now + self.get_ack_timeout(pkd)
+                    wait_ack_process = self.start_wait_ack(pkd)
+
+                    # the data radio stays on the channel of the next hop until the ACK arrives
+                    yield self.env.process(self.stay_for_ack([wait_ack_process], ack_deadline))
+
+            elif transmission_mode == 1:
+                pkd.increase_ttl()
+                self.phy.broadcast(pkd)
+                yield self.env.timeout(pkd.get_transmission_time())
+
+        yield self.env.process(self.return_to_data_channel())
+
+
+class TdmaSchedule:
+    """
+    Conflict-free slot schedule of the drones that use TDMA
+
+    The slots are assigned by a distance-2 coloring of the topology, in which two drones are adjacent if they are
+    within the communication range of each other. The drones that are neighbors or have a common neighbor never share a
+    slot, so that there are neither direct collisions nor collisions caused by hidden terminals. Besides, since a
+    concurrent transmission can still corrupt a reception beyond the communication range, the drones within the
+    interference range of each other do not share a slot either. The coloring is greedy, and the drones with the most
+    conflicts are colored first (Welsh-Powell order), the number of colors is the number of slots in a frame.
+
+    The topology is checked periodically. Once it has changed, the schedule is recomputed and takes effect at the end
+    of the current frame, so that the current frame is finished with the old schedule
+
+    Attributes:
+        simulator: the simulation platform that contains everything
+        topology_check_interval: interval of checking the topology, unit: us
+        interference_range: the drones within this distance cannot send in the same slot, unit: m
+        time_tolerance: used to compare the time of slots, unit: us
+        neighbors: a dictionary, the neighbors of each drone in the topology on which the schedule is based
+        interferers: a dictionary, the drones within the interference range of each drone in that topology
+        current_schedule: a tuple, the slot of each drone, the number of slots in a frame and the time at which the
+                          schedule takes effect
+        pending_schedule: the recomputed schedule which waits for the end of the current frame
+
+    Author: Zihao Zhou, eezihaozhou@gmail.com
+    Created at: 2026/10/18
+    Updated at: 2026/10/18
+    """
+
+    def __init__(self, simulator):
+        self.simulator = simulator
+        self.topology_check_interval = 0.1 * 1e6  # 0.1s
+        self.interference_range = config.SENSING_RANGE
+        self.time_tolerance = 1e-3
+
+        self.neighbors = None
+        self.interferers = None
+        self.current_schedule = None
+        self.pending_schedule = None
+
+        self.simulator.env.process(self.maintain_schedule())
+
+    def maintain_schedule(self):
+        yield self.simulator.env.timeout(0)  # the configuration is complete after the instantiation
+
+        if not any(isinstance(drone.mac_protocol, Tdma) for drone in self.simulator.drones):
+            return
+
+        self.neighbors = self.get_topology(maximum_communication_range())
+        self.interferers = self.get_topology(self.interference_range)
+        self.current_schedule = self.compute_schedule(self.neighbors, self.interferers, self.simulator.env.now)
+
+        while True:
+            yield self.simulator.env.timeout(self.topology_check_interval)
+
+            neighbors = self.get_topology(maximum_communication_range())
+            interferers = self.get_topology(self.interference_range)
+
+            if neighbors != self.neighbors or interferers != self.interferers:
+                self.update()
+
+                slot_assignment, slot_num, epoch = self.current_schedule
+                frame_duration = slot_num * config.TDMA_SLOT_DURATION
+                frame_end = epoch + (math.floor((self.simulator.env.now - epoch) / frame_duration) + 1) * frame_duration
+
+                logging.info('The topology changes, the TDMA schedule is updated at: %s', frame_end)
+
+                self.neighbors = neighbors
+                self.interferers = interferers
+                self.pending_schedule = self.compute_schedule(neighbors, interferers, frame_end)
+
+    def get_topology(self, max_range):
+        topology = dict()
+        for drone in self.simulator.drones:
+            topology[drone.identifier] = frozenset(
+                other.identifier for other in self.simulator.drones
+                if other is not drone and euclidean_distance(other.coords, drone.coords) <= max_range)
+
+        return topology
+
+    def compute_schedule(self, neighbors, interferers, epoch):
+        """
+        Distance-2 coloring of the topology
+        :param neighbors: a dictionary, the neighbors of each drone
+        :param interferers: a dictionary, the drones within the interference range of each drone
+        :param epoch: the time at which the schedule takes effect
+        :return: the slot of each drone, the number of slots in a frame and the time at which the schedule takes effect
+        """
+
+        # the drones within two hops (or within the interference range) cannot share a slot
+        conflicts = dict()
+        for identifier, neighbor_ids in neighbors.items():
+            two_hop_neighbors = set(neighbor_ids)
+            for neighbor_id in neighbor_ids:
+                two_hop_neighbors |= neighbors[neighbor_id]
+
+            two_hop_neighbors.discard(identifier)
+            conflicts[identifier] = two_hop_neighbors | interferers[identifier]
+
+        slot_assignment = dict()
+        for identifier in sorted(conflicts, key=lambda x: (-len(conflicts[x]), x)):
+            used_slots = {slot_assignment[other] for other in conflicts[identifier] if other in slot_assignment}
+
+            slot = 0
+            while slot in used_slots:
+                slot += 1
+
+            slot_assignment[identifier] = slot
+
+        slot_num = max(slot_assignment.values()) + 1
+        self.simulator.metrics.tdma_frame_length.append(slot_num)
+
+        return slot_assignment, slot_num, epoch
+
+    def update(self):
+        if self.pending_schedule is not None and self.simulator.env.now >= self.pending_schedule[2]:
+            self.current_schedule = self.pending_schedule
+            self.pending_schedule = None
+
+    def get_slot_start(self, schedule, identifier, time):
+        slot_assignment, slot_num, epoch = schedule
+        frame_duration = slot_num * config.TDMA_SLOT_DURATION
+        offset = epoch + slot_assignment[identifier] * config.TDMA_SLOT_DURATION
+
+        if time <= offset:
+            return offset
+        else:
+            return offset + math.ceil((time - offset - self.time_tolerance) / frame_duration) * frame_duration
+
+    def next_slot_start(self, identifier, time):
+        """
+        Find the beginning of the first slot of a drone which starts at or after the given time
+        :param identifier: identifier of the drone
+        :param time: the earliest time
+        :return: the start time of the slot
+        """
+
+        self.update()
+
+        if self.pending_schedule is not None:
+            slot_start = self.get_slot_start(self.current_schedule, identifier, time)
+
+            if slot_start < self.pending_schedule[2]:
+                return slot_start
+            else:
+                return self.get_slot_start(self.pending_schedule, identifier, max(time, self.pending_schedule[2]))
+        else:
+            return self.get_slot_start(self.current_schedule, identifier, time)
@@ -17,6 +17,15 @@ class GaussMarkov3D:
     changes its velocity, direction, and other information. The smaller the interval is, the drone will change its
     motion direction frequently. 3) The last parameter is to control the randomness of the mobility.
 
+    Trajectory prediction:
+    Since the speed, direction and pitch are first-order autoregressive processes, their expectations after "k" updates
+    are known in closed form, e.g., E[s_k] = mean + alpha^k * (s_0 - mean), and their variances are 1 - alpha^(2k).
+    "predict_position" integrates the expected velocity over the coming update intervals to get the expected position
+    at "t + delay", and accumulates the standard deviation of the displacement in each interval as the uncertainty
+    radius. The boundary rebound is not predicted, the expected position is only clipped to the map. The prediction
+    can also be made for the snapshot (position and velocity) of another drone, in which case its current motion is
+    taken as its mean motion, since its mean direction and pitch are not known.
+
     Attributes:
         model_identifier: model name
         my_drone: the drone that installed the mobility model
@@ -33,7 +42,7 @@ class GaussMarkov3D:
 
     Author: Zihao Zhou, eezihaozhou@gmail.com
     Created at: 2024/1/17
-    Updated at: 2025/1/7
+    Updated at: 2026/10/18
     """
 
     def __init__(self, drone):
@@ -163,6 +172,68 @@ class GaussMarkov3D:
             ax.set_zlabel('z')
             plt.show()
 
+    def predict_position(self, delay, position=None, velocity=None, start_time=None):
+        """
+        Predict the expected position after a certain time and the uncertainty of the prediction
+        :param delay: prediction horizon from "start_time", unit: us
+        :param position: position at "start_time", the current position of my drone by default
+        :param velocity: velocity at "start_time", the current velocity of my drone by default
+        :param start_time: the moment of the snapshot, the current time by default
+        :return: expected position and the radius (one standard deviation) of its uncertainty, unit: m
+        """
+
+        drone = self.my_drone
+
+        if start_time is None:
+            start_time = drone.simulator.env.now
+
+        if position is None:
+            position = drone.coords
+            velocity = drone.velocity
+            speed = np.linalg.norm(velocity)
+            direction, pitch = drone.direction, drone.pitch
+            velocity_mean, direction_mean, pitch_mean = drone.velocity_mean, drone.direction_mean, drone.pitch_mean
+        else:
+            speed = np.linalg.norm(velocity)
+            direction = math.atan2(velocity[1], velocity[0])
+            pitch = math.asin(max(-1.0, min(1.0, velocity[2] / speed))) if speed > 0 else 0
+            velocity_mean, direction_mean, pitch_mean = speed, direction, pitch
+
+        if config.STATIC_CASE == 1:
+            return list(position), 0
+
+        # the current velocity is kept until the next direction update
+        elapsed = min(delay, self.direction_update_interval - start_time % self.direction_update_interval)
+        expected_position = np.array(position, dtype=float) + np.array(velocity, dtype=float) * elapsed / 1e6
+        radius = 0
+
+        k = 0
+        while elapsed < delay:
+            k += 1
+            duration = min(self.direction_update_interval, delay - elapsed)
+            decay = self.alpha ** k
+
+            expected_speed = velocity_mean + decay * (speed - velocity_mean)
+            expected_direction = direction_mean + decay * (direction - direction_mean)
+            expected_pitch = pitch_mean + decay * (pitch - pitch_mean)
+
+            expected_velocity = expected_speed * np.array([math.cos(expected_direction) * math.cos(expected_pitch),
+                                                           math.sin(expected_direction) * math.cos(expected_pitch),
+                                                           math.sin(expected_pitch)])
+            expected_position += expected_velocity * duration / 1e6
+
+            # variance of the speed (in (m/s)^2), direction and pitch (in rad^2) after "k" updates
+            variance = 1 - self.alpha ** (2 * k)
+            radius += duration / 1e6 * math.sqrt(variance * (1 + 2 * expected_speed ** 2))
+
+            elapsed += duration
+
+        expected_position = np.clip(expected_position,
+                                    [self.min_x + self.b1, self.min_y + self.b2, self.min_z + self.b3],
+                                    [self.max_x - self.b1, self.max_y - self.b2, self.max_z - self.b3])
+
+        return expected_position.tolist(), radius
+
     # rebound scheme (refer to ns-3)
     def boundary_test(self, next_position, next_velocity, direction_mean, pitch_mean):
         if next_position[0] < self.min_x + self.b1 or next_position[0] > self.max_x - self.b1:
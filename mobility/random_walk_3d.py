@@ -14,6 +14,9 @@ class RandomWalk3D:
     fixed amount of time ("travel_duration"). In addition to this, it is also possible to specify the drone to move a
     fixed distance in this direction. In this code, we assume that the speed of drone is constant.
 
+    Trajectory prediction: the drone keeps its velocity until the next change of direction, after which the direction
+    is uniformly random, so the expected displacement is zero and the uncertainty radius grows with the speed.
+
     Attributes:
         my_drone: the drone which installs this mobility model
         move_counter
@@ -34,7 +37,7 @@ class RandomWalk3D:
 
     Author: Zihao Zhou, eezihaozhou@gmail.com
     Created at: 2024/1/20
-    Updated at: 2025/1/7
+    Updated at: 2026/10/18
     """
     def __init__(self, drone):
         self.my_drone = drone
@@ -150,6 +153,32 @@ class RandomWalk3D:
             ax.set_zlabel('z')
             plt.show()
 
+    def predict_position(self, delay, position=None, velocity=None, start_time=None):
+        """
+        Predict the expected position after a certain time and the uncertainty of the prediction
+        :param delay: prediction horizon from "start_time", unit: us
+        :param position: position at "start_time", the current position of my drone by default
+        :param velocity: velocity at "start_time", the current velocity of my drone by default
+        :param start_time: the moment of the snapshot, the current time by default
+        :return: expected position and the radius of its uncertainty, unit: m
+        """
+
+        if start_time is None:
+            start_time = self.my_drone.simulator.env.now
+
+        if position is None:
+            position = self.my_drone.coords
+            velocity = self.my_drone.velocity
+
+        if config.STATIC_CASE == 1:
+            return list(position), 0
+
+        elapsed = min(delay, self.travel_duration - start_time % self.travel_duration)
+        expected_position = [position[i] + velocity[i] * elapsed / 1e6 for i in range(3)]
+        radius = np.linalg.norm(velocity) * (delay - elapsed) / 1e6
+
+        return expected_position, radius
+
     # rebound scheme
     def boundary_test(self, next_position, next_velocity, next_direction, next_pitch):
         if next_position[0] < self.min_x + self.b1 or next_position[0] > self.max_x - self.b1:
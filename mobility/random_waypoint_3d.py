@@ -15,9 +15,12 @@ class RandomWaypoint3D:
     waypoint. Normally, we will set up multiple waypoints as many as possible to prevent the drone visiting all the
     waypoints before the simulation is finished.
 
+    Trajectory prediction: the drone heads straight to its target waypoint and pauses there, so the prediction has no
+    uncertainty except that the subsequent waypoints are not taken into account.
+
     Author: Zihao Zhou, eezihaozhou@gmail.com
     Created at: 2024/4/19
-    Updated at: 2025/1/7
+    Updated at: 2026/10/18
     """
 
     def __init__(self, drone):
@@ -164,6 +167,31 @@ class RandomWaypoint3D:
             ax.set_zlabel('z')
             plt.show()
 
+    def predict_position(self, delay, position=None, velocity=None, start_time=None):
+        """
+        Predict the expected position after a certain time and the uncertainty of the prediction
+        :param delay: prediction horizon from "start_time", unit: us
+        :param position: position at "start_time", the current position of my drone by default
+        :param velocity: velocity at "start_time", the current velocity of my drone by default
+        :param start_time: not used, since the motion does not depend on the time
+        :return: expected position and the radius of its uncertainty, unit: m
+        """
+
+        if position is None:
+            position = self.my_drone.coords
+            target_waypoint, _ = self.get_first_unvisited_waypoint()
+            travel_time = euclidean_distance(position, target_waypoint) / max(self.my_drone.speed, 1e-6) * 1e6
+
+            if travel_time <= delay:
+                return list(target_waypoint), 0
+
+            velocity = self.my_drone.velocity
+
+        if config.STATIC_CASE == 1:
+            return list(position), 0
+
+        return [position[i] + velocity[i] * delay / 1e6 for i in range(3)], 0
+
 
 def calculate_velocity(current_pos, target_pos, moving_speed):
     distance = euclidean_distance(current_pos, target_pos)
@@ -0,0 +1,104 @@
+import logging
+from phy.phy import Phy
+from phy.large_scale_fading import maximum_communication_range
+from utils import config
+from utils.util_function import euclidean_distance
+
+# config logging
+logging.basicConfig(filename='running_log.log',
+                    filemode='w',  # there are two modes: 'a' and 'w'
+                    format='%(asctime)s - %(levelname)s - %(message)s',
+                    level=config.LOGGING_LEVEL
+                    )
+
+
+class AbstractPhy(Phy):
+    """
+    Physical layer without the wireless channel, used together with an abstract mac protocol
+
+    The frames are not put into the inboxes of the drones, instead, once a frame has been transmitted completely, it is
+    handed to the routing protocol of each receiver within the maximum communication range of the sender. There is no
+    SINR calculation, the collisions are decided by the mac protocol before the frame is sent, so the receiving process
+    of the drones does not need to poll the inbox. A beacon piggybacked on a unicast frame is handed to every awake
+    drone within the maximum communication range of the sender in the same way
+
+    Author: Zihao Zhou, eezihaozhou@gmail.com
+    Created at: 2026/10/18
+    Updated at: 2026/10/19
+    """
+
+    def __init__(self, mac):
+        super().__init__(mac)
+
+    def unicast(self, packet, next_hop_id):
+        # energy consumption
+        energy_consumption = packet.get_transmission_time() / 1e6 * config.TRANSMITTING_POWER
+        self.my_drone.residual_energy -= energy_consumption
+
+        if packet.candidate_list is not None:
+            receivers = self.get_receivers(packet, next_hop_id)  # opportunistic forwarding
+        else:
+            receivers = [next_hop_id]
+
+        self.env.process(self.deliver(packet, receivers))
+
+        if packet.beacon is not None and packet.beacon.src_drone is self.my_drone:
+            self.my_drone.routing_protocol.beacon_sent(packet.beacon)
+            self.env.process(self.deliver_beacon(packet.beacon, packet.get_transmission_time()))
+
+    def deliver_beacon(self, beacon, transmission_time):
+        """
+        Deliver the beacon piggybacked on a unicast frame to the drones that overhear the frame
+        :param beacon: the piggybacked beacon
+        :param transmission_time: transmission time of the frame
+        :return: none
+        """
+
+        yield self.env.timeout(transmission_time)
+
+        max_comm_range = maximum_communication_range()
+        for drone in self.my_drone.simulator.drones:
+            if drone is not self.my_drone and not drone.sleep:
+                if euclidean_distance(drone.coords, self.my_drone.coords) <= max_comm_range:
+                    drone.routing_protocol.overhear_beacon(beacon, self.my_drone.identifier)
+
+    def broadcast(self, packet):
+        # energy consumption
+        energy_consumption = packet.get_transmission_time() / 1e6 * config.TRANSMITTING_POWER
+        self.my_drone.residual_energy -= energy_consumption
+
+        self.env.process(self.deliver(packet, [drone.identifier for drone in self.my_drone.simulator.drones]))
+
+    def multicast(self, packet, dst_id_list):
+        # a transmission delay should be considered
+        yield self.env.timeout(packet.packet_length / config.BIT_RATE * 1e6)
+
+        # energy consumption
+        energy_consumption = packet.get_transmission_time() / 1e6 * config.TRANSMITTING_POWER
+        self.my_drone.residual_energy -= energy_consumption
+
+        self.env.process(self.deliver(packet, dst_id_list))
+
+    def deliver(self, packet, receivers):
+        """
+        Hand the frame to the routing protocols of the receivers after it has been transmitted
+        :param packet: the transmitted frame
+        :param receivers: a list, identifiers of the drones the frame is sent to
+        :return: none
+        """
+
+        yield self.env.timeout(packet.get_transmission_time())
+
+        if packet.get_current_ttl() >= config.MAX_TTL:
+            logging.info('Packet %s is dropped due to exceeding max TTL', packet.packet_id)
+            return
+
+        max_comm_range = maximum_communication_range()
+        for receiver_id in receivers:
+            receiver = self.my_drone.simulator.drones[receiver_id]
+
+            if not receiver.sleep and euclidean_distance(receiver.coords, self.my_drone.coords) <= max_comm_range:
+                logging.info('Packet %s from UAV: %s is received by UAV: %s at time: %s',
+                             packet.packet_id, self.my_drone.identifier, receiver_id, self.env.now)
+
+                self.env.process(receiver.routing_protocol.packet_reception(packet, self.my_drone.identifier))
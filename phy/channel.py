@@ -1,6 +1,7 @@
 import logging
 import copy
 from collections import defaultdict
+from utils import config
 
 
 class Channel:
@@ -16,15 +17,31 @@ class Channel:
     Attributes:
         env: simulation environment created by simpy
         pipes: control the inboxes of all drones, format is shown above
+        max_transmission_time: the longest transmission time of the packets put into the channel so far, e.g., an
+                               A-MPDU or a data packet sent at a low bit rate, used to clear the inboxes
+        arrival_events: {UAV: an event triggered each time a message is put into its inbox}, so that the receiving
+                        process of the drone only wakes up when its inbox changes
 
     Author: Zihao Zhou, eezihaozhou@gmail.com
     Created at: 2024/1/11
-    Updated at: 2024/4/25
+    Updated at: 2026/10/19
     """
 
     def __init__(self, env):
         self.env = env
         self.pipes = defaultdict(list)
+        self.max_transmission_time = (config.DATA_PACKET_LENGTH / config.BIT_RATE) * 1e6
+        self.arrival_events = dict()
+
+    # record the transmission time of the packet in "value"
+    def update_max_transmission_time(self, value):
+        self.max_transmission_time = max(self.max_transmission_time, value[0].get_transmission_time())
+
+    # wake up the receiving process of the drone whose inbox has a new message
+    def notify(self, identifier):
+        if identifier in self.arrival_events:
+            self.arrival_events[identifier].succeed()
+            self.arrival_events[identifier] = self.env.event()
 
     def broadcast_put(self, value):
         """
@@ -36,10 +53,13 @@ class Channel:
         if not self.pipes:
             logging.error('No inboxes available!')
 
+        self.update_max_transmission_time(value)
+
         # the sender "puts" packets to all inboxes in pipes separately
         for key in self.pipes.keys():
             value_copy = copy.copy(value)  # must be a copy of "value"
             self.pipes[key].append(value_copy)
+            self.notify(key)
 
     def unicast_put(self, value, dst_id):
         """
@@ -52,7 +72,9 @@ class Channel:
         if dst_id not in self.pipes.keys():
             logging.error('There is no inbox for dst_id')
 
+        self.update_max_transmission_time(value)
         self.pipes[dst_id].append(value)
+        self.notify(dst_id)
 
     def multicast_put(self, value, dst_id_list):
         """
@@ -62,15 +84,19 @@ class Channel:
         :return: none
         """
 
+        self.update_max_transmission_time(value)
+
         for dst_id in dst_id_list:
             if dst_id not in self.pipes.keys():
                 logging.error('There is no inbox for dst_id')
             else:
                 value_copy = copy.copy(value)  # must be a copy of "value"
                 self.pipes[dst_id].append(value_copy)
+                self.notify(dst_id)
 
     def create_inbox_for_receiver(self, identifier):
         # each receiver needs a list as its inbox
         pipe = []
         self.pipes[identifier] = pipe
+        self.arrival_events[identifier] = self.env.event()
         return pipe
@@ -0,0 +1,123 @@
+import logging
+import random
+from phy.large_scale_fading import maximum_communication_range
+from utils import config
+from utils.util_function import euclidean_distance
+
+# config logging
+logging.basicConfig(filename='running_log.log',
+                    filemode='w',  # there are two modes: 'a' and 'w'
+                    format='%(asctime)s - %(levelname)s - %(message)s',
+                    level=config.LOGGING_LEVEL
+                    )
+
+
+class ChannelAssignment:
+    """
+    Assignment of the data channels of drones in multi-channel operation
+
+    Each drone receives unicast frames on its data channel, which is one of the non-overlapping channels in
+    "DATA_CHANNELS", while all broadcast frames are sent on the common control channel. The data channel of a drone is
+    assumed to be known by its neighbors (e.g., announced on the control channel). Three assignment modes are
+    supported:
+    1) "static": the channels are assigned to the drones in turn according to their identifiers
+    2) "hashed": the channel is given by a hash of the identifier, which does not depend on the numbering of drones
+    3) "adaptive": the drones start with the static assignment, and periodically move to the channel used by the
+       fewest drones within the communication range, so that the neighbors spread over different channels. A drone
+       retunes its data radio only when its buffer is free, i.e., it is not sending a packet. The drones re-evaluate
+       one after another in a random order, and each decision is taken into account by the drones that follow, even
+       if the retuning is still pending. Otherwise, all drones of a crowded neighborhood would see the same least used
+       channel, move to it together, and oscillate from one interval to the next
+
+    Attributes:
+        simulator: the simulation platform that contains everything
+        enable_multi_channel: use multi-channel operation or not, otherwise all drones use the control channel
+        assignment_mode: "static", "hashed" or "adaptive"
+        adaptation_interval: interval of the adaptive assignment
+        assigned_channel: {drone: the data channel it has decided to use, the retuning may still be pending}
+        rng_order: random generator of the order in which the drones re-evaluate their channels
+
+    Author: Zihao Zhou, eezihaozhou@gmail.com
+    Created at: 2026/10/18
+    Updated at: 2026/10/19
+    """
+
+    def __init__(self, simulator):
+        self.simulator = simulator
+        self.enable_multi_channel = 0
+        self.assignment_mode = 'static'
+        self.adaptation_interval = 1 * 1e6  # 1s
+        self.assigned_channel = dict()
+        self.rng_order = random.Random(self.simulator.seed + 8)
+
+        self.simulator.env.process(self.assign_channels())
+
+    def initial_channel(self, identifier):
+        channel_num = len(config.DATA_CHANNELS)
+
+        if self.assignment_mode == 'hashed':
+            index = (identifier * 2654435761) % (2 ** 32) % channel_num  # Knuth's multiplicative hash
+        else:
+            index = identifier % channel_num
+
+        return config.DATA_CHANNELS[index]
+
+    def assign_channels(self):
+        yield self.simulator.env.timeout(0)  # the configuration is complete after the instantiation
+
+        if not self.enable_multi_channel:
+            return
+
+        for drone in self.simulator.drones:
+            drone.mac_protocol.phy.data_channel = self.initial_channel(drone.identifier)
+            drone.mac_protocol.phy.tuned_channel = drone.mac_protocol.phy.data_channel
+            self.assigned_channel[drone.identifier] = drone.mac_protocol.phy.data_channel
+
+        if self.assignment_mode == 'adaptive':
+            while True:
+                yield self.simulator.env.timeout(self.adaptation_interval)
+
+                drones = list(self.simulator.drones)
+                self.rng_order.shuffle(drones)
+
+                for drone in drones:
+                    if not drone.sleep:
+                        channel = self.least_used_channel(drone)
+                        if channel != self.assigned_channel[drone.identifier]:
+                            self.assigned_channel[drone.identifier] = channel  # seen by the drones that follow
+                            self.simulator.env.process(self.retune(drone, channel))
+
+    def least_used_channel(self, drone):
+        """
+        Find the data channel used by the fewest drones within the communication range of the given drone
+        :param drone: the drone that selects its data channel
+        :return: the selected channel, the current one is kept in case of a tie
+        """
+
+        max_comm_range = maximum_communication_range()
+
+        usage = {channel: 0 for channel in config.DATA_CHANNELS}
+        for other in self.simulator.drones:
+            if other is not drone and euclidean_distance(other.coords, drone.coords) <= max_comm_range:
+                usage[self.assigned_channel[other.identifier]] += 1
+
+        current_channel = self.assigned_channel[drone.identifier]
+        best_channel = min(config.DATA_CHANNELS, key=lambda channel: usage[channel])
+
+        if usage[best_channel] < usage[current_channel]:
+            return best_channel
+        else:
+            return current_channel
+
+    def retune(self, drone, channel):
+        with drone.buffer.request() as request:
+            yield request  # wait until the drone finishes sending the current packet
+
+            logging.info('UAV: %s moves to data channel: %s at: %s', drone.identifier, channel,
+                         self.simulator.env.now)
+
+            phy = drone.mac_protocol.phy
+            phy.data_channel = channel
+
+            if phy.tuned_channel != channel:
+                yield self.simulator.env.process(phy.switch_channel(channel))
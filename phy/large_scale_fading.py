@@ -1,5 +1,6 @@
 import math
 import logging
+import numpy as np
 from utils import config
 from utils.util_function import euclidean_distance
 
@@ -63,6 +64,89 @@ def sinr_calculator(my_drone, main_drones_list, all_transmitting_drones_list):
     return sinr_list
 
 
+def sic_decoder(my_drone, main_drones_list, all_transmitting_drones_list, sinr_threshold_list, sic_depth,
+                residual_error, cancelled_drones_list=()):
+    """
+    successive interference cancellation (SIC): the receiver decodes the frame with the maximum SINR, subtracts its
+    power from the received signal, and then tries to decode the remaining frames in the same way, until "sic_depth"
+    frames have been decoded or no remaining frame can be decoded. The overlapping frames that the receiver has decoded
+    before are cancelled from the beginning. Since the cancellation is imperfect, a fraction "residual_error" of the
+    power of each cancelled frame remains as interference
+
+    References:
+        [1] J. G. Andrews, "Interference Cancellation for Cellular Systems: A Contemporary Overview," IEEE Wireless
+            Communications, vol. 12, no. 2, pp. 19-29, 2005.
+
+    :param my_drone: receiver drone
+    :param main_drones_list: list of drones that wants to transmit packet to receiver
+    :param all_transmitting_drones_list: list of all drones currently transmitting packet
+    :param sinr_threshold_list: the SINR threshold (in dB) of the frame of each main drone
+    :param sic_depth: maximum number of frames decoded, "1" is a conventional receiver
+    :param residual_error: fraction of the power of a decoded frame that cannot be cancelled
+    :param cancelled_drones_list: list of transmitters all of whose overlapping frames have already been decoded
+    :return: 1. list of (index of the frame in "main_drones_list", its SINR when it is decoded), in decoding order
+             2. list of the SINR of each main drone without any cancellation (in dB)
+    """
+
+    simulator = my_drone.simulator
+    receiver_coords = np.array(my_drone.coords, dtype=float)
+
+    main_coords = np.array([simulator.drones[drone_id].coords for drone_id in main_drones_list], dtype=float)
+    all_coords = np.array([simulator.drones[drone_id].coords for drone_id in all_transmitting_drones_list],
+                          dtype=float).reshape(-1, 3)
+    cancelled_coords = np.array([simulator.drones[drone_id].coords for drone_id in cancelled_drones_list],
+                                dtype=float).reshape(-1, 3)
+
+    receive_power = config.TRANSMITTING_POWER * vectorized_path_loss(receiver_coords, main_coords)
+    total_power = np.sum(config.TRANSMITTING_POWER * vectorized_path_loss(receiver_coords, all_coords))
+    sinr_threshold = np.array(sinr_threshold_list, dtype=float)
+
+    sinr_without_cancellation = 10 * np.log10(receive_power / (config.NOISE_POWER + total_power - receive_power))
+
+    decoded = np.zeros(len(main_drones_list), dtype=bool)
+    decoded_list = []
+    cancelled_power = np.sum(config.TRANSMITTING_POWER * vectorized_path_loss(receiver_coords, cancelled_coords))
+
+    while len(decoded_list) < sic_depth:
+        interference_power = np.maximum(total_power - receive_power - (1 - residual_error) * cancelled_power, 0)
+        sinr = 10 * np.log10(receive_power / (config.NOISE_POWER + interference_power))
+
+        sinr[decoded] = -np.inf
+        which_one = int(np.argmax(sinr))
+
+        if sinr[which_one] < sinr_threshold[which_one]:
+            break
+
+        logging.info('Main node: %s is decoded after %s cancellation(s), SINR is: %s',
+                     main_drones_list[which_one], len(cancelled_drones_list) + len(decoded_list), sinr[which_one])
+
+        decoded[which_one] = True
+        decoded_list.append((which_one, float(sinr[which_one])))
+        cancelled_power += receive_power[which_one]
+
+        if decoded.all():
+            break
+
+    return decoded_list, sinr_without_cancellation.tolist()
+
+
+def vectorized_path_loss(receiver_coords, transmitter_coords):
+    """
+    the same path loss model as "general_path_loss", calculated for several transmitters at once
+    :param receiver_coords: the position of the receiver
+    :param transmitter_coords: array of shape (n, 3), the positions of the transmitters
+    :return: array of the path loss of each transmitter
+    """
+
+    distance = np.linalg.norm(transmitter_coords - receiver_coords, axis=1)
+
+    path_loss = np.ones(len(distance))
+    nonzero = distance != 0
+    path_loss[nonzero] = (free_space_factor() / distance[nonzero]) ** config.PATH_LOSS_EXPONENT
+
+    return path_loss
+
+
 def general_path_loss(receiver, transmitter):
     """
     general path loss model of line-of-sight (LoS) channels without system loss
@@ -76,23 +160,22 @@ def general_path_loss(receiver, transmitter):
     :return: path loss
     """
 
-    c = config.LIGHT_SPEED
-    fc = config.CARRIER_FREQUENCY
-    alpha = 2  # path loss exponent
-
     distance = euclidean_distance(receiver.coords, transmitter.coords)
 
     if distance != 0:
-        path_loss = (c / (4 * math.pi * fc * distance)) ** alpha
+        path_loss = (free_space_factor() / distance) ** config.PATH_LOSS_EXPONENT
     else:
         path_loss = 1
 
     return path_loss
 
 
+def free_space_factor():
+    # c / (4 * pi * fc), the path loss is (c / (4 * pi * fc * distance)) ^ alpha
+    return config.LIGHT_SPEED / (4 * math.pi * config.CARRIER_FREQUENCY)
+
+
 def maximum_communication_range():
-    c = config.LIGHT_SPEED
-    fc = config.CARRIER_FREQUENCY
     alpha = config.PATH_LOSS_EXPONENT  # path loss exponent
     transmit_power_db = 10 * math.log10(config.TRANSMITTING_POWER)
     noise_power_db = 10 * math.log10(config.NOISE_POWER)
@@ -100,6 +183,6 @@ def maximum_communication_range():
 
     path_loss_db = transmit_power_db - noise_power_db - snr_threshold_db
 
-    max_comm_range = (c * (10 ** (path_loss_db / (alpha * 10)))) / (4 * math.pi * fc)
+    max_comm_range = free_space_factor() * (10 ** (path_loss_db / (alpha * 10)))
 
     return max_comm_range
@@ -1,4 +1,5 @@
 import logging
+from entities.packet import DataPacket, AggregatedPacket
 from utils import config
 
 # config logging
@@ -17,12 +18,40 @@ class Phy:
         mac: mac protocol that installed
         env: simulation environment created by simpy
         my_drone: the drone that installed the physical protocol
+        block_ack_sessions: a dictionary, the key is the sender of an A-MPDU that is being received, and the value is
+                            a list of the ACKs replied to its subframes, which are sent together in a block ACK
+        data_channel: the channel assigned to the drone, on which it receives unicast frames
+        tuned_channel: the channel to which the data radio is currently tuned, "None" while switching
+        transmitting_channel: the channel of the frame the drone is sending (or about to send), for carrier sensing
 
     Future work: take co-channel interference into account, calculate the SINR before receiving the packet
 
+    Piggybacked beacons:
+    a unicast frame may carry a neighbor beacon of its sender (see "Packet.attach_beacon"), which is overheard by all
+    drones that can decode the frame. Therefore, such a frame is put into the inboxes of all other drones instead of
+    only the inbox of its next hop, and goes through the normal reception (SINR, collisions and the channel to which
+    the radios are tuned). The drones that decode it hand the beacon to their routing protocol, and only the next hop
+    processes the frame itself (see "Drone.frame_reception"). The routing protocol of the sender is notified when the
+    frame leaves, since the beacon only counts as a hello packet once it is actually transmitted
+
+    Opportunistic forwarding:
+    a data frame carrying a list of candidate forwarders is delivered to all of them instead of only the next hop, and
+    so is the ACK of each candidate, besides the sender of the data frame
+
+    Multi-channel operation:
+    each drone has two radios, a control radio fixed on the common control channel, on which all broadcast frames are
+    sent, and a data radio. The data radio stays on the assigned data channel of the drone to receive unicast frames,
+    and the mac protocol tunes it to the data channel of the next hop before sending a unicast frame. While the data
+    radio is tuned away or switching, the unicast frames sent to the drone are lost. Each message in the channel is
+    tagged with the channel on which it is transmitted. Without channel assignment, all drones use the control channel
+
+    Frame aggregation:
+    the routing protocol replies an ACK to each subframe of an A-MPDU, these ACKs are not transmitted but collected in
+    the block ACK session of the sender
+
     Author: Zihao Zhou, eezihaozhou@gmail.com
     Created at: 2024/1/11
-    Updated at: 2024/4/25
+    Updated at: 2026/10/19
     """
 
     def __init__(self, mac):
@@ -30,6 +59,12 @@ class Phy:
         self.env = mac.env
         self.my_drone = mac.my_drone
 
+        self.block_ack_sessions = dict()
+
+        self.data_channel = config.CONTROL_CHANNEL
+        self.tuned_channel = self.data_channel
+        self.transmitting_channel = None
+
     def unicast(self, packet, next_hop_id):
         """
         Unicast packet through the wireless channel
@@ -38,14 +73,38 @@ class Phy:
         :return: none
         """
 
+        if not isinstance(packet, (DataPacket, AggregatedPacket)) and next_hop_id in self.block_ack_sessions:
+            self.block_ack_sessions[next_hop_id].append(packet)  # will be sent in the block ACK
+            return
+
         # energy consumption
-        energy_consumption = (packet.packet_length / config.BIT_RATE) * config.TRANSMITTING_POWER
+        energy_consumption = packet.get_transmission_time() / 1e6 * config.TRANSMITTING_POWER
         self.my_drone.residual_energy -= energy_consumption
 
         # transmit through the channel
-        message = [packet, self.env.now, self.my_drone.identifier, 0]
-
-        self.my_drone.simulator.channel.unicast_put(message, next_hop_id)
+        if isinstance(packet, (DataPacket, AggregatedPacket)):
+            channel = self.tuned_channel
+        else:
+            channel = self.data_channel  # ACKs reply to the frames received on my data channel
+
+        message = [packet, self.env.now, self.my_drone.identifier, 0, channel]
+
+        if packet.beacon is not None and packet.beacon.src_drone is self.my_drone:
+            # the piggybacked beacon can be overheard by all other drones
+            self.my_drone.routing_protocol.beacon_sent(packet.beacon)
+            self.my_drone.simulator.channel.multicast_put(message, [drone.identifier for drone in
+                                                                    self.my_drone.simulator.drones
+                                                                    if drone is not self.my_drone])
+        elif packet.candidate_list is not None:
+            # opportunistic forwarding, the frame is addressed to all (other) candidate forwarders
+            self.my_drone.simulator.channel.multicast_put(message, self.get_receivers(packet, next_hop_id))
+        else:
+            self.my_drone.simulator.channel.unicast_put(message, next_hop_id)
+
+    def get_receivers(self, packet, next_hop_id):
+        # the next hop and the candidate forwarders of a frame in opportunistic forwarding, excluding myself
+        return [receiver_id for receiver_id in dict.fromkeys([next_hop_id] + list(packet.candidate_list))
+                if receiver_id != self.my_drone.identifier]
 
     def broadcast(self, packet):
         """
@@ -55,11 +114,11 @@ class Phy:
         """
 
         # energy consumption
-        energy_consumption = (packet.packet_length / config.BIT_RATE) * config.TRANSMITTING_POWER
+        energy_consumption = packet.get_transmission_time() / 1e6 * config.TRANSMITTING_POWER
         self.my_drone.residual_energy -= energy_consumption
 
         # transmit through the channel
-        message = [packet, self.env.now, self.my_drone.identifier, 0]
+        message = [packet, self.env.now, self.my_drone.identifier, 0, config.CONTROL_CHANNEL]
 
         self.my_drone.simulator.channel.broadcast_put(message)
 
@@ -75,10 +134,32 @@ class Phy:
         yield self.env.timeout(packet.packet_length / config.BIT_RATE * 1e6)
 
         # energy consumption
-        energy_consumption = (packet.packet_length / config.BIT_RATE) * config.TRANSMITTING_POWER
+        energy_consumption = packet.get_transmission_time() / 1e6 * config.TRANSMITTING_POWER
         self.my_drone.residual_energy -= energy_consumption
 
         # transmit through the channel
-        message = [packet, self.env.now, self.my_drone.identifier]
+        message = [packet, self.env.now, self.my_drone.identifier, 0, self.tuned_channel]
 
         self.my_drone.simulator.channel.multicast_put(message, dst_id_list)
+
+    def get_transmitting_channel(self, packet):
+        if packet.transmission_mode == 1:
+            return config.CONTROL_CHANNEL
+        else:
+            return self.tuned_channel
+
+    def get_listening_channels(self):
+        return {config.CONTROL_CHANNEL, self.tuned_channel}
+
+    def switch_channel(self, channel):
+        """
+        Tune the data radio to another channel, nothing can be received by the data radio during switching
+        :param channel: the target channel
+        :return: none
+        """
+
+        self.tuned_channel = None
+        yield self.env.timeout(config.CHANNEL_SWITCHING_TIME)
+        self.tuned_channel = channel
+
+        self.my_drone.simulator.metrics.channel_switch_num += 1
@@ -0,0 +1,90 @@
+import logging
+from utils import config
+
+# config logging
+logging.basicConfig(filename='running_log.log',
+                    filemode='w',  # there are two modes: 'a' and 'w'
+                    format='%(asctime)s - %(levelname)s - %(message)s',
+                    level=config.LOGGING_LEVEL
+                    )
+
+
+class AdaptiveHelloController:
+    """
+    Adaptive beaconing controller shared by the routing protocols that maintain neighbors by periodic hello packets
+
+    The hello interval is adjusted each time a hello packet is broadcast, according to two local observations:
+        1) churn of the neighbor set: the fraction of neighbors that joined or left since the last hello packet. If the
+           churn exceeds "churn_threshold", the interval is multiplied by "decrease_factor"; if the neighbor set did not
+           change at all, the interval is increased by "increase_step" (additive increase, multiplicative decrease)
+        2) relative speed: the interval is further bounded so that a neighbor cannot move more than "distance_tolerance"
+           relative to me between two successive hello packets
+    The result is always kept within ["min_interval", "max_interval"]. Since neighbors cannot know how long the next
+    hello packet will take, each hello packet announces the current interval of its sender, and the receivers keep
+    the corresponding entries alive for at least twice the announced interval.
+
+    Attributes:
+        simulator: the simulation platform that contains everything
+        my_drone: the drone that installed the routing protocol
+        interval: current hello interval
+        min_interval: lower bound of the hello interval
+        max_interval: upper bound of the hello interval
+        churn_threshold: churn above which the interval is shortened
+        decrease_factor: multiplicative decrease of the interval
+        increase_step: additive increase of the interval
+        distance_tolerance: maximum relative displacement of a neighbor between two hello packets
+        last_neighbor_ids: neighbor set observed at the last hello packet
+
+    References:
+        [1] I. D. Chakeres and E. M. Belding-Royer, "The Utility of Hello Messages for Determining Link Connectivity,"
+            in Proceedings of the 5th International Symposium on Wireless Personal Multimedia Communications, 2002.
+
+    Author: Zihao Zhou, eezihaozhou@gmail.com
+    Created at: 2026/10/18
+    Updated at: 2026/10/18
+    """
+
+    def __init__(self, simulator, my_drone, interval, min_interval=0.1 * 1e6, max_interval=2 * 1e6):
+        self.simulator = simulator
+        self.my_drone = my_drone
+        self.interval = interval
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+
+        self.churn_threshold = 0.2
+        self.decrease_factor = 0.5
+        self.increase_step = 0.1 * 1e6  # unit: us
+        self.distance_tolerance = 20  # unit: m
+
+        self.last_neighbor_ids = set()
+
+    def next_interval(self, neighbor_ids, relative_speed):
+        """
+        Calculate the interval until the next hello packet
+        :param neighbor_ids: identifiers of my current neighbors
+        :param relative_speed: (estimated) maximum speed of my neighbors relative to me, unit: m/s
+        :return: the new hello interval, unit: us
+        """
+
+        neighbor_ids = set(neighbor_ids)
+        union = neighbor_ids | self.last_neighbor_ids
+        churn = len(neighbor_ids ^ self.last_neighbor_ids) / max(1, len(union))
+        self.last_neighbor_ids = neighbor_ids
+
+        if churn > self.churn_threshold:
+            self.interval *= self.decrease_factor
+        elif churn == 0:
+            self.interval += self.increase_step
+
+        if relative_speed > 0:
+            self.interval = min(self.interval, self.distance_tolerance / relative_speed * 1e6)
+
+        self.interval = min(max(self.interval, self.min_interval), self.max_interval)
+
+        logging.info('At time: %s, UAV: %s observes neighbor churn: %s, relative speed: %s, hello interval is: %s',
+                     self.simulator.env.now, self.my_drone.identifier, churn, relative_speed, self.interval)
+
+        self.simulator.metrics.hello_num_dict[self.my_drone.identifier] += 1
+        self.simulator.metrics.hello_interval_dict[self.my_drone.identifier].append(self.interval)
+
+        return self.interval
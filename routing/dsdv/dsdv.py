@@ -1,10 +1,14 @@
 import copy
+import math
 import random
 import logging
 from entities.packet import DataPacket, AckPacket
 from topology.virtual_force.vf_packet import VfPacket
 from routing.dsdv.dsdv_packet import DsdvHelloPacket
 from routing.dsdv.dsdv_routing_table import DsdvRoutingTable
+from routing.dsdv.dsdv_array_routing_table import DsdvArrayRoutingTable
+from routing.adaptive_hello.adaptive_hello_controller import AdaptiveHelloController
+from routing.link_quality.etx_estimator import EtxEstimator
 from utils import config
 
 # config logging
@@ -23,7 +27,37 @@ class Dsdv:
         simulator: the simulation platform that contains everything
         my_drone: the drone that installed the GPSR
         hello_interval: interval of sending hello packet
+        enable_array_table: 1: use the array-backed routing table (preferable for large swarms); 0: dictionary
         routing_table: routing table of DSDV
+        enable_adaptive_hello: whether to adjust the hello interval to the neighbor churn and relative speed
+        hello_controller: adaptive beaconing controller
+        enable_beacon_piggyback: whether to piggyback beacons on data and ACK frames, in which case a standalone hello
+                                 packet is only broadcast if no beacon was sent within the hello interval
+        last_beacon_time: the time at which the latest piggybacked beacon was sent
+        triggered_update_pending: whether a triggered update is scheduled but has not been sent yet
+        triggered_update_time: the time at which the pending triggered update was scheduled
+        enable_etx_metric: whether to use the sum of ETX of the links as the metric instead of hop count
+        link_estimator: ETX estimator fed by the periodic hello packets of neighbors
+        delivery_ratio_entry_length: length of each delivery ratio carried by the hello packet (in bit)
+
+    Triggered update damping:
+    When broken links are detected, the triggered update is delayed by the settling delay of the invalidated routes
+    (see "DsdvRoutingTable"). If a periodic hello packet (or a beacon built after the detection) is sent in the
+    meantime, it already carries the broken routes and the pending triggered update is cancelled. Further broken links
+    detected while a triggered update is pending are carried by the same update.
+
+    Piggybacked beacons:
+    A beacon is built when the data or ACK frame carrying it is prepared, but the frame may wait in the queue or be
+    re-routed before it is sent. Therefore, the beacon announces the next sequence number of myself without taking
+    it, and the bookkeeping of a hello packet (sequence number, pending triggered update, damped routes) is only done
+    when the frame carrying the beacon is transmitted (see "beacon_sent").
+
+    ETX metric:
+    When "enable_etx_metric" is set, the periodic hello packets serve as the probes of ETX (see "EtxEstimator"): each
+    of them carries the delivery ratios of the hello packets received from the neighbors, and the cost of the link to
+    the sender of a hello packet is its ETX instead of 1. Routes over marginal links at the edge of the communication
+    range are therefore avoided when better links are available. Triggered updates and piggybacked beacons are not
+    sent periodically, and are thus not counted as probes.
 
     References:
         [1] Perkins, C. E., and Bhagwat, P.,"Highly dynamic destination-sequenced distance-vector routing (DSDV) for
@@ -33,14 +67,31 @@ class Dsdv:
 
     Author: Zihao Zhou, eezihaozhou@gmail.com
     Created at: 2024/4/14
-    Updated at: 2024/5/21
+    Updated at: 2026/10/18
     """
 
     def __init__(self, simulator, my_drone):
         self.simulator = simulator
         self.my_drone = my_drone
         self.hello_interval = 0.5 * 1e6  # broadcast hello packet every 0.5s
-        self.routing_table = DsdvRoutingTable(self.simulator.env, my_drone)
+        self.enable_array_table = 0
+
+        if self.enable_array_table:
+            self.routing_table = DsdvArrayRoutingTable(self.simulator.env, my_drone)
+        else:
+            self.routing_table = DsdvRoutingTable(self.simulator.env, my_drone)
+
+        self.enable_adaptive_hello = 0
+        self.hello_controller = AdaptiveHelloController(self.simulator, my_drone, self.hello_interval)
+        self.enable_beacon_piggyback = 0
+        self.last_beacon_time = -float('inf')
+
+        self.enable_etx_metric = 0
+        self.link_estimator = EtxEstimator(self.simulator.env, my_drone, self.hello_interval)
+        self.delivery_ratio_entry_length = 24  # 16-bit identifier and 8-bit quantized ratio
+
+        self.triggered_update_pending = False
+        self.triggered_update_time = 0
         self.simulator.env.process(self.broadcast_hello_packet_periodically())
         self.simulator.env.process(self.detect_broken_link_periodically(my_drone))
 
@@ -57,32 +108,113 @@ class Dsdv:
             flag = self.routing_table.purge()
 
             if flag == 1:
-                config.GL_ID_HELLO_PACKET += 1
-                hello_pkd = DsdvHelloPacket(src_drone=my_drone,
-                                            creation_time=self.simulator.env.now,
-                                            id_hello_packet=config.GL_ID_HELLO_PACKET,
-                                            hello_packet_length=config.HELLO_PACKET_LENGTH,
-                                            routing_table=self.routing_table.routing_table,
-                                            simulator=self.simulator)
-                hello_pkd.transmission_mode = 1  # broadcast
+                if self.triggered_update_pending:
+                    # the pending triggered update will also carry these broken links
+                    self.simulator.metrics.suppressed_triggered_update_num += 1
+                else:
+                    delay = self.routing_table.get_triggered_update_delay()
+
+                    if delay == 0:
+                        self.broadcast_triggered_update(my_drone)
+                    else:
+                        self.triggered_update_pending = True
+                        self.triggered_update_time = self.simulator.env.now
+                        self.simulator.env.process(self.delayed_triggered_update(my_drone, delay))
+
+    def delayed_triggered_update(self, my_drone, delay):
+        """
+        Wait for the settling delay before announcing the broken links, the update is given up if a periodic hello
+        packet has been broadcast during the waiting
+        :param my_drone: the node that installs the protocol
+        :param delay: settling delay of the broken routes
+        :return: none
+        """
 
-                logging.info('At time: %s, UAV: %s broadcast a hello packet to announce broken links',
-                             self.simulator.env.now, self.my_drone.identifier)
+        yield self.simulator.env.timeout(min(delay, self.hello_interval))
 
-                self.simulator.metrics.control_packet_num += 1
-                self.my_drone.transmitting_queue.put(hello_pkd)
+        if self.triggered_update_pending:
+            self.triggered_update_pending = False
+            self.broadcast_triggered_update(my_drone)
 
-    def broadcast_hello_packet(self, my_drone):
+    def broadcast_triggered_update(self, my_drone):
         config.GL_ID_HELLO_PACKET += 1
 
-        self.routing_table.routing_table[self.my_drone.identifier][2] += 2  # important!
+        advertised_table, damped_num = self.routing_table.get_advertised_table()
         hello_pkd = DsdvHelloPacket(src_drone=my_drone,
                                     creation_time=self.simulator.env.now,
                                     id_hello_packet=config.GL_ID_HELLO_PACKET,
                                     hello_packet_length=config.HELLO_PACKET_LENGTH,
-                                    routing_table=self.routing_table.routing_table,
+                                    routing_table=advertised_table,
                                     simulator=self.simulator)
         hello_pkd.transmission_mode = 1  # broadcast
+        hello_pkd.hello_interval = self.hello_interval
+
+        logging.info('At time: %s, UAV: %s broadcast a hello packet to announce broken links',
+                     self.simulator.env.now, self.my_drone.identifier)
+
+        self.simulator.metrics.control_packet_num += 1
+        self.simulator.metrics.triggered_update_num += 1
+        self.simulator.metrics.damped_route_num += damped_num
+        self.my_drone.transmitting_queue.put(hello_pkd)
+
+    def build_hello_packet(self, my_drone):
+        """
+        Build a hello packet (a full dump of the routing table) that announces my next sequence number, without any
+        bookkeeping, see "commit_hello_packet"
+        :param my_drone: the node that installs the protocol
+        :return: the hello packet
+        """
+
+        config.GL_ID_HELLO_PACKET += 1
+
+        if self.enable_etx_metric:
+            delivery_ratios = self.link_estimator.get_delivery_ratios()
+            hello_packet_length = config.HELLO_PACKET_LENGTH + self.delivery_ratio_entry_length * len(delivery_ratios)
+        else:
+            delivery_ratios = None
+            hello_packet_length = config.HELLO_PACKET_LENGTH
+
+        my_seq_num = self.routing_table.get_next_seq_num()
+        advertised_table, damped_num = self.routing_table.get_advertised_table(my_seq_num)
+        hello_pkd = DsdvHelloPacket(src_drone=my_drone,
+                                    creation_time=self.simulator.env.now,
+                                    id_hello_packet=config.GL_ID_HELLO_PACKET,
+                                    hello_packet_length=hello_packet_length,
+                                    routing_table=advertised_table,
+                                    simulator=self.simulator)
+        hello_pkd.hello_interval = self.hello_interval
+        hello_pkd.delivery_ratios = delivery_ratios
+        hello_pkd.my_seq_num = my_seq_num
+        hello_pkd.damped_num = damped_num
+
+        return hello_pkd
+
+    def commit_hello_packet(self, hello_pkd):
+        """
+        Bookkeeping of a hello packet that is sent: take the sequence number it announces, cancel the pending
+        triggered update if the packet already carries the broken routes, and count the damped routes
+        :param hello_pkd: the hello packet (or beacon) that is sent
+        :return: none
+        """
+
+        self.routing_table.update_my_seq_num(hello_pkd.my_seq_num)  # important!
+
+        if self.triggered_update_pending and hello_pkd.creation_time >= self.triggered_update_time:
+            # the full dump also announces the broken links, no need for the triggered update
+            self.triggered_update_pending = False
+            self.simulator.metrics.suppressed_triggered_update_num += 1
+
+        self.simulator.metrics.damped_route_num += hello_pkd.damped_num
+
+    def generate_hello_packet(self, my_drone):
+        hello_pkd = self.build_hello_packet(my_drone)
+        self.commit_hello_packet(hello_pkd)
+
+        return hello_pkd
+
+    def broadcast_hello_packet(self, my_drone):
+        hello_pkd = self.generate_hello_packet(my_drone)
+        hello_pkd.transmission_mode = 1  # broadcast
 
         logging.info('At time: %s, UAV: %s has hello packet to broadcast',
                      self.simulator.env.now, self.my_drone.identifier)
@@ -90,9 +222,69 @@ class Dsdv:
         self.simulator.metrics.control_packet_num += 1
         self.my_drone.transmitting_queue.put(hello_pkd)
 
+    def piggyback_beacon(self, packet, max_beacon_length=None):
+        """
+        Piggyback my routing state (a full dump of the routing table) on an outgoing data or ACK frame
+        :param packet: the outgoing frame
+        :param max_beacon_length: for an ACK frame, the beacon must not be longer than the beacon of the data frame
+                                  being acknowledged, otherwise the ACK would arrive after the ACK timeout
+        :return: none
+        """
+
+        beacon = self.build_hello_packet(self.my_drone)
+
+        if max_beacon_length is not None and beacon.get_payload_length() > max_beacon_length:
+            return
+
+        packet.attach_beacon(beacon)
+
+    def beacon_sent(self, beacon):
+        """
+        The frame carrying my beacon is transmitted, which is equivalent to sending a hello packet
+        :param beacon: the piggybacked hello packet
+        :return: none
+        """
+
+        self.commit_hello_packet(beacon)
+        self.last_beacon_time = self.simulator.env.now
+        self.simulator.metrics.piggybacked_beacon_num += 1
+
+    def overhear_beacon(self, beacon, src_drone_id):
+        """
+        Update the routing table according to a beacon overheard on a data or ACK frame
+        :param beacon: the piggybacked hello packet
+        :param src_drone_id: the sender of the frame
+        :return: none
+        """
+
+        self.routing_table.update_item(beacon, self.simulator.env.now, self.get_link_cost(src_drone_id))
+
+    # get the cost of the link to certain neighbor
+    def get_link_cost(self, neighbor_id):
+        if self.enable_etx_metric:
+            return self.link_estimator.get_etx(neighbor_id)
+        else:
+            return 1
+
     def broadcast_hello_packet_periodically(self):
         while True:
-            self.broadcast_hello_packet(self.my_drone)
+            if self.enable_adaptive_hello:
+                # the velocities of neighbors are unknown in DSDV, assume they move as fast as me in the opposite way
+                if config.STATIC_CASE == 0:
+                    relative_speed = 2 * math.sqrt(sum(v ** 2 for v in self.my_drone.velocity))
+                else:
+                    relative_speed = 0
+
+                neighbor_ids = self.routing_table.get_neighbor_ids()
+                self.hello_interval = self.hello_controller.next_interval(neighbor_ids, relative_speed)
+
+            if self.enable_beacon_piggyback and \
+                    self.simulator.env.now - self.last_beacon_time < self.hello_interval:
+                # my neighbors have overheard a beacon recently, no need for a standalone hello packet
+                self.simulator.metrics.suppressed_hello_num += 1
+            else:
+                self.broadcast_hello_packet(self.my_drone)
+
             jitter = random.randint(1000, 2000)  # delay jitter
             yield self.simulator.env.timeout(self.hello_interval+jitter)
 
@@ -114,8 +306,26 @@ class Dsdv:
         else:
             packet.next_hop_id = best_next_hop_id  # it has an available next hop drone
 
+            if self.enable_beacon_piggyback and isinstance(packet, DataPacket):
+                self.piggyback_beacon(packet)
+
         return has_route, packet, enquire
 
+    def peek_next_hop(self, packet):
+        """
+        Look up the next hop of a data packet without any side effect, e.g., when the mac protocol scans its queue
+        for frame aggregation
+        :param packet: the data packet
+        :return: identifier of the next hop, or "None" if there is no route
+        """
+
+        next_hop_id = self.routing_table.has_entry(packet.dst_drone.identifier)
+
+        if next_hop_id == self.my_drone.identifier:
+            return None
+        else:
+            return next_hop_id
+
     def packet_reception(self, packet, src_drone_id):
         """
         Packet reception at network layer
@@ -129,7 +339,10 @@ class Dsdv:
 
         current_time = self.simulator.env.now
         if isinstance(packet, DsdvHelloPacket):
-            self.routing_table.update_item(packet, current_time)
+            if self.enable_etx_metric and packet.delivery_ratios is not None:
+                self.link_estimator.record_probe(packet, current_time)  # periodic hello packet
+
+            self.routing_table.update_item(packet, current_time, self.get_link_cost(src_drone_id))
             # self.routing_table.print_neighbor(self.my_drone)
 
         elif isinstance(packet, DataPacket):
@@ -156,6 +369,9 @@ class Dsdv:
 
                 # unicast the ack packet immediately without contention for the channel
                 if not self.my_drone.sleep:
+                    if self.enable_beacon_piggyback:
+                        self.piggyback_beacon(ack_packet, max_beacon_length=packet_copy.beacon_length)
+
                     ack_packet.increase_ttl()
                     self.my_drone.mac_protocol.phy.unicast(ack_packet, src_drone_id)
                     yield self.simulator.env.timeout(ack_packet.packet_length / config.BIT_RATE * 1e6)
@@ -179,6 +395,9 @@ class Dsdv:
 
                     # unicast the ack packet immediately without contention for the channel
                     if not self.my_drone.sleep:
+                        if self.enable_beacon_piggyback:
+                            self.piggyback_beacon(ack_packet, max_beacon_length=packet_copy.beacon_length)
+
                         ack_packet.increase_ttl()
                         self.my_drone.mac_protocol.phy.unicast(ack_packet, src_drone_id)
                         yield self.simulator.env.timeout(ack_packet.packet_length / config.BIT_RATE * 1e6)
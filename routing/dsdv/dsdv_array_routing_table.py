@@ -0,0 +1,233 @@
+import logging
+import numpy as np
+from utils import config
+
+
+# config logging
+logging.basicConfig(filename='running_log.log',
+                    filemode='w',  # there are two modes: 'a' and 'w'
+                    format='%(asctime)s - %(levelname)s - %(message)s',
+                    level=config.LOGGING_LEVEL
+                    )
+
+
+class DsdvArrayRoutingTable:
+    """
+    Array-backed routing table of DSDV (Destination-Sequenced Distance Vector)
+
+    This table has the same behavior and interface as "DsdvRoutingTable", but the routing information is stored in
+    NumPy arrays indexed by the identifier of the destination, so that merging the routing table carried by a hello
+    packet and purging the expired entries are done in a vectorized way. It is preferable in large swarms, where each
+    routing table has hundreds of entries and the merge is executed on every received hello packet.
+
+    the structure of the routing table is:
+    next_hop:     [next hop to dst 0,   next hop to dst 1,   ...]
+    metric:       [hop count (or ETX) to dst 0, hop count (or ETX) to dst 1, ...]
+    seq_num:      [seq_num of dst 0,    seq_num of dst 1,    ...]
+    updated_time: [updated time 0,      updated time 1,      ...]
+    a destination without entry has "seq_num" -1. The routing table carried by the hello packet is a tuple of
+    (metric, seq_num) arrays. As in "DsdvRoutingTable", a route is kept alive for at least "life_time_factor" times the
+    hello interval announced by its next hop
+
+    Attributes:
+        env: simulation environment
+        my_drone: the drone that installed the routing table
+        n_drones: number of the drones, i.e., the length of each array
+        next_hop, metric, seq_num, updated_time: core members, see above
+        entry_life_time: lifetime of each item in the neighbor table
+        life_time_factor: an item is valid for at least this many hello intervals announced by its next hop
+        announced_interval: hello interval announced by each neighbor in its latest hello packet
+        enable_settling_time: whether to delay the advertisement of fluctuating routes
+        settling_time_weight: weight of the history in the weighted average of settling time
+        settling_delay_factor: a new route is advertised after "settling_delay_factor" times average settling time
+        settling_time: average settling time of each destination
+        first_heard_seq_num, first_heard_time: the first route with the latest seq_num of each destination
+        best_heard_time: time at which the best route with the latest seq_num of each destination arrived
+        changed_time: time at which the route to each destination was changed last time
+        stable_metric, stable_seq_num: routes that have already been advertised
+        broken_dst_list: destinations invalidated in the latest purge
+
+    Author: Zihao Zhou, eezihaozhou@gmail.com
+    Created at: 2026/10/18
+    Updated at: 2026/10/19
+    """
+
+    def __init__(self, env, my_drone):
+        self.env = env
+        self.my_drone = my_drone
+        self.n_drones = my_drone.simulator.n_drones
+
+        self.next_hop = np.full(self.n_drones, -1, dtype=int)
+        self.metric = np.full(self.n_drones, np.inf)
+        self.seq_num = np.full(self.n_drones, -1, dtype=int)
+        self.updated_time = np.zeros(self.n_drones)
+
+        # initialize the routing table, sequence number if even number
+        my_id = self.my_drone.identifier
+        self.next_hop[my_id] = my_id
+        self.metric[my_id] = 0
+        self.seq_num[my_id] = my_id * 2
+        self.updated_time[my_id] = self.env.now
+        self.entry_life_time = 2 * 1e6  # unit: us (2s)
+        self.life_time_factor = 2
+        self.announced_interval = np.zeros(self.n_drones)
+
+        # settling time (damping fluctuations)
+        self.enable_settling_time = 0
+        self.settling_time_weight = 0.875
+        self.settling_delay_factor = 2
+        self.settling_time = np.zeros(self.n_drones)
+        self.first_heard_seq_num = np.full(self.n_drones, -1, dtype=int)
+        self.first_heard_time = np.zeros(self.n_drones)
+        self.best_heard_time = np.zeros(self.n_drones)
+        self.changed_time = np.zeros(self.n_drones)
+        self.stable_metric = np.full(self.n_drones, np.inf)
+        self.stable_seq_num = np.full(self.n_drones, -1, dtype=int)
+        self.broken_dst_list = []
+
+    # determine if the routing table is empty
+    def is_empty(self):
+        return not np.any(self.seq_num >= 0)
+
+    # get the updated time of certain item
+    def get_updated_time(self, drone_id):
+        if self.seq_num[drone_id] < 0:
+            raise RuntimeError('This item is not in the routing table')
+        else:
+            return self.updated_time[drone_id]
+
+    # get the identifiers of my one-hop neighbors
+    def get_neighbor_ids(self):
+        neighbor = (self.next_hop == np.arange(self.n_drones)) & (self.metric != np.inf)
+        neighbor[self.my_drone.identifier] = False
+        return list(np.flatnonzero(neighbor))
+
+    # increase the sequence number of myself before broadcasting hello packet
+    def increase_my_seq_num(self):
+        self.seq_num[self.my_drone.identifier] += 2
+
+    # get the sequence number of myself announced by the next hello packet
+    def get_next_seq_num(self):
+        return int(self.seq_num[self.my_drone.identifier]) + 2
+
+    # a beacon announcing "seq_num" has been sent, beacons built earlier may be sent later
+    def update_my_seq_num(self, seq_num):
+        my_id = self.my_drone.identifier
+        self.seq_num[my_id] = max(self.seq_num[my_id], seq_num)
+
+    # update item according to the receiving packet, "link_cost" is 1 for hop count, or the ETX of the link
+    def update_item(self, packet, cur_time, link_cost=1):
+        src_drone = packet.src_drone
+        if src_drone is not self.my_drone:  # the hello packet is not broadcast by myself
+            self.announced_interval[src_drone.identifier] = packet.hello_interval
+            adv_metric, adv_seq_num = packet.routing_table
+
+            valid = adv_seq_num >= 0
+            fresher = valid & (adv_seq_num > self.seq_num)  # including the destinations without entry
+            better = valid & (adv_seq_num == self.seq_num) & (adv_metric + link_cost <= self.metric)
+            updated = fresher | better
+
+            if not np.any(updated):
+                return
+
+            # the routes with the previous sequence number have settled, each of them is a new sample of the settling
+            # time, see "DsdvRoutingTable.update_settling_time"
+            sampled = fresher & (self.first_heard_seq_num >= 0)
+            self.settling_time[sampled] = self.settling_time_weight * self.settling_time[sampled] + \
+                (1 - self.settling_time_weight) * (self.best_heard_time[sampled] - self.first_heard_time[sampled])
+
+            self.best_heard_time[better & (self.first_heard_seq_num == adv_seq_num)] = cur_time
+
+            self.first_heard_seq_num[fresher] = adv_seq_num[fresher]
+            self.first_heard_time[fresher] = cur_time
+            self.best_heard_time[fresher] = cur_time
+
+            self.next_hop[updated] = src_drone.identifier
+            self.metric[updated] = adv_metric[updated] + link_cost
+            self.seq_num[updated] = adv_seq_num[updated]
+            self.updated_time[updated] = cur_time
+            self.changed_time[updated] = cur_time
+
+    # remove the expired item
+    def purge(self):
+        flag = 0
+        self.broken_dst_list = []
+
+        known = self.seq_num >= 0
+        life_time = np.maximum(self.entry_life_time,
+                               self.life_time_factor * self.announced_interval[np.where(known, self.next_hop, 0)])
+        expired = known & (self.updated_time + life_time < self.env.now)
+        expired[self.my_drone.identifier] = False
+
+        if np.any(expired):
+            # all entries through the expired next hops should be set to invalid
+            expired_next_hop = np.unique(self.next_hop[expired])
+            broken = known & np.isin(self.next_hop, expired_next_hop)
+
+            self.metric[broken] = np.inf
+            self.seq_num[broken] += 1
+            self.updated_time[broken] = self.env.now
+            self.changed_time[broken] = self.env.now
+            self.broken_dst_list = list(np.flatnonzero(broken))
+
+            flag = 1  # broken links have occurred
+
+        return flag
+
+    def get_advertised_table(self, my_seq_num=None):
+        """
+        Build the routing table carried by the hello packet. Routes that changed recently are replaced by the last
+        advertised (stable) routes until their settling delay expires. Broken routes (infinite metric) and the entry
+        of myself are always advertised immediately
+        :param my_seq_num: if given, the entry of myself announces this sequence number instead of the current one
+        :return: a snapshot of the routing table and the number of damped routes
+        """
+
+        known = self.seq_num >= 0
+
+        if self.enable_settling_time:
+            ready = (self.env.now >= self.changed_time + self.settling_delay_factor * self.settling_time) | \
+                    (self.metric == np.inf)
+            ready[self.my_drone.identifier] = True
+        else:
+            ready = np.ones(self.n_drones, dtype=bool)
+
+        advertised = known & ready
+        damped = known & ~ready
+
+        self.stable_metric[advertised] = self.metric[advertised]
+        self.stable_seq_num[advertised] = self.seq_num[advertised]
+
+        adv_metric = np.where(damped, self.stable_metric, self.metric)
+        adv_seq_num = np.where(damped, self.stable_seq_num, self.seq_num)
+        adv_seq_num[~known] = -1
+
+        if my_seq_num is not None:
+            adv_seq_num[self.my_drone.identifier] = my_seq_num
+
+        return (adv_metric, adv_seq_num), int(np.count_nonzero(damped))
+
+    # get the delay of triggered update caused by the latest broken links
+    def get_triggered_update_delay(self):
+        if not self.enable_settling_time or not self.broken_dst_list:
+            return 0
+
+        return float(np.max(self.settling_delay_factor * self.settling_time[self.broken_dst_list]))
+
+    # determine if it has the valid item to certain destination
+    def has_entry(self, dst_id):
+        if self.seq_num[dst_id] >= 0 and self.metric[dst_id] != np.inf:
+            # get the next hop to the destination
+            next_hop_id = int(self.next_hop[dst_id])
+        else:
+            next_hop_id = self.my_drone.identifier
+
+        return next_hop_id
+
+    # print routing table
+    def print_neighbor(self, my_drone):
+        logging.info('|----------Routing Table of: %s ----------|', my_drone.identifier)
+        for key in np.flatnonzero(self.seq_num >= 0):
+            logging.info('Dst_id: %s, next hop is: %s, metric is: %s, seq_num (dst_id) is: %s, updated time is: %s',
+                         key, self.next_hop[key], self.metric[key], self.seq_num[key], self.updated_time[key])
+        logging.info('|-----------------------------------------------------------------|')
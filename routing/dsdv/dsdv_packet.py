@@ -13,3 +13,7 @@ class DsdvHelloPacket(Packet):
 
         self.src_drone = src_drone
         self.routing_table = routing_table
+        self.hello_interval = 0  # announced hello interval of the sender
+        self.delivery_ratios = None  # {neighbor: delivery ratio of its hello packets}, only when ETX is enabled
+        self.my_seq_num = None  # sequence number of the sender announced by this packet
+        self.damped_num = 0  # number of routes damped by the settling time
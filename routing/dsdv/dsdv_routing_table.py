@@ -17,14 +17,36 @@ class DsdvRoutingTable:
 
     type of the routing table: dictionary
     the structure of the routing table is:
-    {dst1: [next hop, metric (hop count), seq_num of dst1, updated time1],
-     dst2: [next hop, metric (hop count), seq_num of dst2, updated time2],
+    {dst1: [next hop, metric (hop count or ETX), seq_num of dst1, updated time1],
+     dst2: [next hop, metric (hop count or ETX), seq_num of dst2, updated time2],
      ...}
 
+    In addition to the routing table itself, the settling time of each destination is maintained as described in
+    the original paper. The settling time is the interval between the arrival of the first route with a new sequence
+    number and the arrival of the best route with the same sequence number. The best route is only known once a newer
+    sequence number arrives, so each sequence number contributes one sample at that moment, which is zero if the first
+    route was never improved. Its weighted average is used to delay the advertisement of routes that may still
+    fluctuate, so that neighbors are not flooded with routes that will be replaced soon after.
+
+    Each hello packet also announces the hello interval of its sender. A route is kept alive for at least
+    "life_time_factor" times the interval announced by its next hop, so that routes through neighbors that beacon
+    slowly (adaptive hello interval) are not purged between two of their hello packets.
+
     Attributes:
         env: simulation environment
         routing_table: dictionary in python, core member
         entry_life_time: lifetime of each item in the neighbor table
+        life_time_factor: an item is valid for at least this many hello intervals announced by its next hop
+        announced_interval: {neighbor: hello interval announced in its latest hello packet}
+        enable_settling_time: whether to delay the advertisement of fluctuating routes
+        settling_time_weight: weight of the history in the weighted average of settling time
+        settling_delay_factor: a new route is advertised after "settling_delay_factor" times average settling time
+        settling_time: {dst: average settling time}
+        first_heard: {dst: [seq_num, time at which the first route with this seq_num arrived, time at which the best
+                     one arrived]}
+        changed_time: {dst: time at which the route to dst was changed last time}
+        stable_table: routes that have already been advertised, used in place of the fluctuating routes
+        broken_dst_list: destinations invalidated in the latest purge
 
     References:
         [1] Perkins, C. E., and Bhagwat, P.,"Highly dynamic destination-sequenced distance-vector routing (DSDV) for
@@ -34,7 +56,7 @@ class DsdvRoutingTable:
 
     Author: Zihao Zhou, eezihaozhou@gmail.com
     Created at: 2024/4/14
-    Updated at: 2024/4/17
+    Updated at: 2026/10/19
     """
 
     def __init__(self, env, my_drone):
@@ -45,6 +67,18 @@ class DsdvRoutingTable:
         # initialize the routing table, sequence number if even number
         self.routing_table[self.my_drone.identifier] = [self.my_drone.identifier, 0, self.my_drone.identifier*2, self.env.now]
         self.entry_life_time = 2 * 1e6  # unit: us (2s)
+        self.life_time_factor = 2
+        self.announced_interval = dict()
+
+        # settling time (damping fluctuations)
+        self.enable_settling_time = 0
+        self.settling_time_weight = 0.875
+        self.settling_delay_factor = 2
+        self.settling_time = defaultdict(float)
+        self.first_heard = dict()
+        self.changed_time = dict()
+        self.stable_table = dict()
+        self.broken_dst_list = []
 
     # determine if the routing table is empty
     def is_empty(self):
@@ -57,26 +91,121 @@ class DsdvRoutingTable:
         else:
             return self.routing_table[drone_id][-1]
 
+    # get the lifetime of the item whose next hop is "next_hop_id"
+    def get_entry_life_time(self, next_hop_id):
+        return max(self.entry_life_time, self.life_time_factor * self.announced_interval.get(next_hop_id, 0))
+
+    # get the identifiers of my one-hop neighbors
+    def get_neighbor_ids(self):
+        return [dst_id for dst_id, entry in self.routing_table.items()
+                if dst_id != self.my_drone.identifier and entry[0] == dst_id and entry[1] != float('inf')]
+
+    # increase the sequence number of myself before broadcasting hello packet
+    def increase_my_seq_num(self):
+        self.routing_table[self.my_drone.identifier][2] += 2
+
+    # get the sequence number of myself announced by the next hello packet
+    def get_next_seq_num(self):
+        return self.routing_table[self.my_drone.identifier][2] + 2
+
+    # a beacon announcing "seq_num" has been sent, beacons built earlier may be sent later
+    def update_my_seq_num(self, seq_num):
+        my_entry = self.routing_table[self.my_drone.identifier]
+        my_entry[2] = max(my_entry[2], seq_num)
+
     # update item according to the receiving packet
-    def update_item(self, packet, cur_time):
+    def update_item(self, packet, cur_time, link_cost=1):
+        """
+        Update the routing table according to the received hello packet
+        :param packet: the received hello packet
+        :param cur_time: the moment when the packet is received
+        :param link_cost: cost of the link to the sender, 1 for hop count, or the ETX of the link
+        :return: none
+        """
+
         src_drone = packet.src_drone
         if src_drone is not self.my_drone:  # the hello packet is not broadcast by myself
+            self.announced_interval[src_drone.identifier] = packet.hello_interval
+
             for dst_id in packet.routing_table.keys():
                 metric = packet.routing_table[dst_id][1]
                 seq_num = packet.routing_table[dst_id][2]
-                if dst_id not in self.routing_table.keys():
-                    self.routing_table[dst_id] = [src_drone.identifier, metric+1, seq_num, cur_time]
-                elif seq_num > self.routing_table[dst_id][2]:
-                    self.routing_table[dst_id] = [src_drone.identifier, metric+1, seq_num, cur_time]
+                if dst_id not in self.routing_table.keys() or seq_num > self.routing_table[dst_id][2]:
+                    self.routing_table[dst_id] = [src_drone.identifier, metric+link_cost, seq_num, cur_time]
+                    self.update_settling_time(dst_id, seq_num, cur_time)
+                    self.changed_time[dst_id] = cur_time
                 elif seq_num == self.routing_table[dst_id][2]:
-                    if metric < self.routing_table[dst_id][1]:
-                        self.routing_table[dst_id] = [src_drone.identifier, metric+1, seq_num, cur_time]
+                    # equivalent to "metric < current metric" for hop count, a worse ETX route never replaces it
+                    if metric + link_cost <= self.routing_table[dst_id][1]:
+                        self.routing_table[dst_id] = [src_drone.identifier, metric+link_cost, seq_num, cur_time]
+                        if dst_id in self.first_heard.keys() and self.first_heard[dst_id][0] == seq_num:
+                            self.first_heard[dst_id][2] = cur_time  # the best route with this seq_num so far
+                        self.changed_time[dst_id] = cur_time
                 else:
                     pass
 
+    def update_settling_time(self, dst_id, seq_num, cur_time):
+        """
+        A route with a new sequence number arrives, so the routes with the previous sequence number have settled. The
+        time elapsed from the first to the best route with the previous sequence number is a new sample of the
+        settling time, it is zero if no better route arrived
+        :param dst_id: the destination of the route
+        :param seq_num: the new sequence number
+        :param cur_time: the moment when the route with the new sequence number arrives
+        :return: none
+        """
+
+        if dst_id in self.first_heard.keys():
+            sample = self.first_heard[dst_id][2] - self.first_heard[dst_id][1]
+            self.settling_time[dst_id] = self.settling_time_weight * self.settling_time[dst_id] + \
+                (1 - self.settling_time_weight) * sample
+
+        self.first_heard[dst_id] = [seq_num, cur_time, cur_time]
+
+    # get the delay before advertising a newly changed route to certain destination
+    def get_settling_delay(self, dst_id):
+        return self.settling_delay_factor * self.settling_time[dst_id]
+
+    def get_advertised_table(self, my_seq_num=None):
+        """
+        Build the routing table carried by the hello packet. Routes that changed recently are replaced by the last
+        advertised (stable) routes until their settling delay expires. Broken routes (infinite metric) and the entry
+        of myself are always advertised immediately
+        :param my_seq_num: if given, the entry of myself announces this sequence number instead of the current one
+        :return: a snapshot of the routing table and the number of damped routes
+        """
+
+        advertised_table = dict()
+        damped_num = 0
+
+        for dst_id in self.routing_table.keys():
+            entry = self.routing_table[dst_id]
+
+            if (not self.enable_settling_time) or dst_id == self.my_drone.identifier or entry[1] == float('inf') \
+                    or self.env.now >= self.changed_time.get(dst_id, 0) + self.get_settling_delay(dst_id):
+                advertised_table[dst_id] = entry[:]
+                self.stable_table[dst_id] = entry[:]
+            else:
+                damped_num += 1
+                if dst_id in self.stable_table.keys():
+                    advertised_table[dst_id] = self.stable_table[dst_id][:]
+
+        if my_seq_num is not None:
+            advertised_table[self.my_drone.identifier][2] = my_seq_num
+
+        return advertised_table, damped_num
+
+    # get the delay of triggered update caused by the latest broken links
+    def get_triggered_update_delay(self):
+        if not self.enable_settling_time or not self.broken_dst_list:
+            return 0
+
+        return max([self.get_settling_delay(dst_id) for dst_id in self.broken_dst_list])
+
     # remove the expired item
     def purge(self):
         flag = 0
+        self.broken_dst_list = []
         if not bool(self.routing_table):
             # it means that the neighbor table is empty
             return flag
@@ -84,7 +213,7 @@ class DsdvRoutingTable:
         for key in list(self.routing_table):
             if key is not self.my_drone.identifier:
                 updated_time = self.get_updated_time(key)
-                if updated_time + self.entry_life_time < self.env.now:
+                if updated_time + self.get_entry_life_time(self.routing_table[key][0]) < self.env.now:
                     expired_next_hop = self.routing_table[key][0]  # expired next hop
 
                     # all entries through this next hop should be set to invalid
@@ -93,6 +222,8 @@ class DsdvRoutingTable:
                             self.routing_table[key2][1] = float('inf')
                             self.routing_table[key2][2] += 1
                             self.routing_table[key2][3] = self.env.now
+                            self.changed_time[key2] = self.env.now
+                            self.broken_dst_list.append(key2)
 
                     flag = 1  # broken links have occurred
 
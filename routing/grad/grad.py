@@ -1,9 +1,13 @@
 import copy
+import random
 import logging
 from routing.grad.grad_packet import GradMessage
 from topology.virtual_force.vf_packet import VfPacket
 from routing.grad.grad_cost_table import GradCostTable
+from routing.grad.grad_duplicate_cache import GradDuplicateCache
 from utils import config
+from utils.util_function import euclidean_distance
+from phy.large_scale_fading import maximum_communication_range
 
 # config logging
 logging.basicConfig(filename='running_log.log',
@@ -43,24 +47,62 @@ class Grad:
        the originator of REPLY message in "waiting_list" are taken out and put into the "transmitting_queue". For other
        drones, only those drones with a lower cost than the "remain_value" in the REPLY message can further forward
 
+    Broadcast storm mitigation:
+    Since every hop of GRAd is a broadcast, dense swarms suffer from redundant rebroadcasts, contention and collisions.
+    "suppression_scheme" selects how a relaying drone decides whether to rebroadcast a message (M_REQUEST, M_DATA or
+    M_REPLY) that it is eligible to relay:
+    1) "none": original behavior, always rebroadcast
+    2) "probabilistic": rebroadcast the first copy with probability "rebroadcast_probability"
+    3) "counter": wait a random assessment delay (RAD), and rebroadcast only if fewer than "counter_threshold" copies
+       of the message have been heard in the meantime
+    4) "distance": wait a random assessment delay, and rebroadcast only if all the senders of the copies heard are
+       farther than "distance_threshold", since a rebroadcast close to a previous sender covers little additional area
+    Except for "none", each drone makes one decision per message. The number of suppressed rebroadcasts is recorded in
+    the metrics as the saving of the scheme
+
+    Attributes:
+        simulator: the simulation platform that contains everything
+        my_drone: the drone that installed the GRAd
+        cost_table: cost table of GRAd
+        duplicate_cache: ids of the M_REQUEST messages already relayed
+        suppression_scheme: "none", "probabilistic", "counter" or "distance"
+        rebroadcast_probability: used in "probabilistic" scheme
+        counter_threshold: used in "counter" scheme
+        distance_threshold: in meter, used in "distance" scheme
+        max_assessment_delay: in us, upper bound of the random assessment delay
+        assessed_cache: ids of the messages on which a rebroadcast decision has been made
+        pending_rebroadcast: {message id: [number of copies heard, minimum distance to senders]} during assessment
+        rng_relay: random generator used by the suppression schemes
+
     References:
         [1] Poor R. Gradient routing in ad hoc networks[J]. 2000.
+        [2] S. Y. Ni, Y. C. Tseng, Y. S. Chen and J. P. Sheu, "The Broadcast Storm Problem in a Mobile Ad Hoc
+            Network," in Proceedings of the 5th annual ACM/IEEE international conference on Mobile computing and
+            networking, pp. 151-162, 1999.
 
     Author: Zihao Zhou, eezihaozhou@gmail.com
     Created at: 2024/4/20
-    Updated at: 2024/5/20
+    Updated at: 2026/10/18
     """
 
     def __init__(self, simulator, my_drone):
         self.simulator = simulator
         self.my_drone = my_drone
         self.cost_table = GradCostTable(self.simulator.env, my_drone)
-        self.flag = {}
+        self.duplicate_cache = GradDuplicateCache(self.simulator.env)  # ids of the messages already relayed
         self.my_drone.mac_protocol.enable_ack = False
 
-    def next_hop_selection(self, packet):
-        self.cost_table.purge()  # update cost table
+        # broadcast storm mitigation
+        self.suppression_scheme = 'none'
+        self.rebroadcast_probability = 0.65
+        self.counter_threshold = 3
+        self.distance_threshold = 0.3 * maximum_communication_range()
+        self.max_assessment_delay = 10000  # us
+        self.assessed_cache = GradDuplicateCache(self.simulator.env)
+        self.pending_rebroadcast = dict()
+        self.rng_relay = random.Random(self.my_drone.identifier + self.simulator.seed + 3)
 
+    def next_hop_selection(self, packet):
         dst_drone = packet.dst_drone  # the destination of the data packet
         has_route = self.cost_table.has_entry(dst_drone.identifier)
         enquire = True
@@ -103,6 +145,10 @@ class Grad:
 
             return has_route, grad_message, enquire
 
+    # the data packets are attached to broadcast M_DATA messages, there is no unicast next hop
+    def peek_next_hop(self, packet):
+        return None
+
     def packet_reception(self, packet, src_drone_id):
         current_time = self.simulator.env.now
 
@@ -116,6 +162,8 @@ class Grad:
             packet_copy.remaining_value -= 1  # debits the "remaining_value" field by one
             packet_copy.accrued_cost += 1  # increment "accrued_cost" field by one
 
+            self.overhear(packet_copy, src_drone_id)
+
             self.cost_table.update_entry(packet_copy, current_time)
             # self.cost_table.print_cost_table()
 
@@ -148,11 +196,8 @@ class Grad:
                                  self.simulator.env.now, self.my_drone.identifier, src_drone_id)
 
                     if packet_copy.remaining_value > 0:
-                        if packet_copy.packet_id not in self.flag.keys():  # it is the first time to receive this message
-                            self.flag[packet_copy.packet_id] = 1  # mark as "already broadcast"
-
-                            self.simulator.metrics.control_packet_num += 1
-                            self.my_drone.transmitting_queue.put(packet_copy)
+                        if self.duplicate_cache.add(packet_copy.packet_id):  # it is the first time to receive this message
+                            self.relay(packet_copy, src_drone_id, is_control=True)
 
             elif msg_type == "M_DATA":
                 data_packet = packet_copy.attached_data_packet
@@ -173,7 +218,7 @@ class Grad:
                                 logging.info('At time: %s, UAV: %s further forward the data packet',
                                              self.simulator.env.now, self.my_drone.identifier)
 
-                                self.my_drone.transmitting_queue.put(packet_copy)
+                                self.relay(packet_copy, src_drone_id, is_control=False)
                         else:
                             pass
                     else:
@@ -195,9 +240,7 @@ class Grad:
                         if self.cost_table.has_entry(target.identifier):
                             est_cost = self.cost_table.get_est_cost(target.identifier)
                             if est_cost <= packet_copy.remaining_value:
-                                self.simulator.metrics.control_packet_num += 1
-
-                                self.my_drone.transmitting_queue.put(packet_copy)
+                                self.relay(packet_copy, src_drone_id, is_control=True)
                         else:
                             pass
                     else:
@@ -227,3 +270,76 @@ class Grad:
             logging.warning('Unknown message type!')
 
         yield self.simulator.env.timeout(1)
+
+    def relay(self, packet_copy, src_drone_id, is_control):
+        """
+        Rebroadcast the message according to the suppression scheme
+        :param packet_copy: the message that is eligible to be relayed
+        :param src_drone_id: previous hop
+        :param is_control: whether the message is a control message (M_REQUEST or M_REPLY)
+        :return: none
+        """
+
+        if self.suppression_scheme == 'none':
+            self.rebroadcast(packet_copy, is_control)
+            return
+
+        if not self.assessed_cache.add(packet_copy.packet_id):
+            return  # the decision on this message has already been made
+
+        if self.suppression_scheme == 'probabilistic':
+            if self.rng_relay.random() < self.rebroadcast_probability:
+                self.rebroadcast(packet_copy, is_control)
+            else:
+                self.suppress(packet_copy, is_control)
+        else:
+            src_drone = self.simulator.drones[src_drone_id]
+            distance = euclidean_distance(self.my_drone.coords, src_drone.coords)
+            self.pending_rebroadcast[packet_copy.packet_id] = [1, distance]
+            self.simulator.env.process(self.assess_rebroadcast(packet_copy, is_control))
+
+    def overhear(self, packet_copy, src_drone_id):
+        """
+        Record the copy of a message under assessment
+        :param packet_copy: the received message
+        :param src_drone_id: previous hop
+        :return: none
+        """
+
+        if packet_copy.packet_id in self.pending_rebroadcast.keys():
+            src_drone = self.simulator.drones[src_drone_id]
+            distance = euclidean_distance(self.my_drone.coords, src_drone.coords)
+
+            record = self.pending_rebroadcast[packet_copy.packet_id]
+            record[0] += 1
+            record[1] = min(record[1], distance)
+
+    def assess_rebroadcast(self, packet_copy, is_control):
+        yield self.simulator.env.timeout(self.rng_relay.uniform(0, self.max_assessment_delay))  # RAD
+
+        copy_num, min_distance = self.pending_rebroadcast.pop(packet_copy.packet_id)
+
+        if self.suppression_scheme == 'counter':
+            suppressed = copy_num >= self.counter_threshold
+        else:
+            suppressed = min_distance < self.distance_threshold
+
+        if suppressed:
+            self.suppress(packet_copy, is_control)
+        else:
+            self.rebroadcast(packet_copy, is_control)
+
+    def rebroadcast(self, packet_copy, is_control):
+        if is_control:
+            self.simulator.metrics.control_packet_num += 1
+
+        self.my_drone.transmitting_queue.put(packet_copy)
+
+    def suppress(self, packet_copy, is_control):
+        logging.info('At time: %s, UAV: %s suppresses the rebroadcast of message: %s',
+                     self.simulator.env.now, self.my_drone.identifier, packet_copy.packet_id)
+
+        if is_control:
+            self.simulator.metrics.suppressed_control_rebroadcast_num += 1
+        else:
+            self.simulator.metrics.suppressed_data_rebroadcast_num += 1
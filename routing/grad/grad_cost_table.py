@@ -23,12 +23,15 @@ class GradCostTable:
     2) "What is the estimated cost of sending a message to a certain target drone?" In cost table, each "target_id" is
         associated with "est_cost"
 
+    Entries expire lazily: an entry older than "entry_life_time" is removed when it is looked up or updated, so that no
+    full scan of the cost table is needed before each next hop selection. "purge()" is still available for a full scan
+
     References:
         [1] Poor R. Gradient routing in ad hoc networks[J]. 2000.
 
     Author: Zihao Zhou, eezihaozhou@gmail.com
     Created at: 2024/4/20
-    Updated at: 2024/4/20
+    Updated at: 2026/10/18
     """
 
     def __init__(self, env, my_drone):
@@ -59,6 +62,17 @@ class GradCostTable:
     def remove_entry(self, drone_id):
         del self.cost_table[drone_id]
 
+    # remove the entry of "target_id" if it has expired, return "True" if a valid entry remains
+    def check_entry(self, target_id):
+        if target_id not in self.cost_table.keys():
+            return False
+
+        if self.get_updated_time(target_id) + self.entry_life_time < self.env.now:  # expired
+            self.remove_entry(target_id)
+            return False
+
+        return True
+
     # remove the expired item
     def purge(self):
         if self.is_empty():
@@ -77,7 +91,7 @@ class GradCostTable:
         accrued_cost = grad_message.accrued_cost
 
         if originator_id is not self.my_drone.identifier:
-            if originator_id not in self.cost_table.keys():  # no matching entry is found
+            if not self.check_entry(originator_id):  # no matching (valid) entry is found
                 self.cost_table[originator_id] = [seq_num, accrued_cost, cur_time]  # create a new entry
             elif self.cost_table[originator_id][0] < seq_num:  # incoming message is fresher
                 self.cost_table[originator_id] = [seq_num, accrued_cost, cur_time]  # entry is updated
@@ -89,11 +103,7 @@ class GradCostTable:
 
     # used to determine if it has a route for delivering a data packet
     def has_entry(self, target_id):
-        has_route = False
-        if target_id in self.cost_table.keys():
-            has_route = True
-
-        return has_route
+        return self.check_entry(target_id)
 
     def print_cost_table(self):
         print('|----------Neighbor Table of: ', self.my_drone.identifier, ' ----------|')
@@ -0,0 +1,53 @@
+from collections import OrderedDict
+from utils import config
+
+
+class GradDuplicateCache:
+    """
+    Duplicate-suppression cache of GRAd (Gradient Routing in ad hoc networks)
+
+    Each relaying drone should only forward the first copy of a flooded message. Instead of recording every message
+    id ever relayed, the ids are kept in an ordered dictionary (in the order of insertion) together with the time at
+    which they are recorded. An id older than "time_to_live" is forgotten, since the message itself has expired in
+    the network by then ("PACKET_LIFETIME"). Therefore, the cache only holds the messages flooded within the last
+    "PACKET_LIFETIME", i.e., its size follows the message rate instead of the length of the simulation.
+
+    Attributes:
+        env: simulation environment
+        cache: ordered dictionary in python, {message id: recorded time}, the oldest record is at the head
+        time_to_live: lifetime of each record
+
+    Author: Zihao Zhou, eezihaozhou@gmail.com
+    Created at: 2026/10/18
+    Updated at: 2026/10/18
+    """
+
+    def __init__(self, env, time_to_live=config.PACKET_LIFETIME):
+        self.env = env
+        self.cache = OrderedDict()
+        self.time_to_live = time_to_live
+
+    # remove the expired records at the head of the cache
+    def expire(self):
+        while self.cache:
+            message_id, recorded_time = next(iter(self.cache.items()))
+            if recorded_time + self.time_to_live < self.env.now:
+                self.cache.popitem(last=False)
+            else:
+                break
+
+    # determine if this message has been recorded
+    def contains(self, message_id):
+        self.expire()
+        return message_id in self.cache.keys()
+
+    # record the message, return "True" if it is the first time to see it
+    def add(self, message_id):
+        if self.contains(message_id):
+            return False
+
+        self.cache[message_id] = self.env.now
+        return True
+
+    def __len__(self):
+        return len(self.cache)
@@ -1,11 +1,15 @@
 import copy
+import math
 import random
 import logging
 from entities.packet import DataPacket, AckPacket
 from topology.virtual_force.vf_packet import VfPacket
 from routing.greedy.greedy_neighbor_table import GreedyNeighborTable
 from routing.greedy.greedy_packet import GreedyHelloPacket
+from routing.adaptive_hello.adaptive_hello_controller import AdaptiveHelloController
+from routing.opportunistic.opportunistic_forwarder import OpportunisticForwarder
 from utils import config
+from utils.util_function import euclidean_distance, segment_intersection
 
 # config logging
 logging.basicConfig(filename='running_log.log',
@@ -24,19 +28,45 @@ class Greedy:
     significantly limit its performance. Users can extend it by adding some recovery mechanism to improve the
     performance.
 
+    Perimeter mode:
+    As the recovery mechanism, the perimeter mode of GPSR [2] can be enabled by "enable_perimeter_mode". When a packet
+    reaches a local minimum, instead of waiting for a better neighbor, it is routed around the void along the faces
+    of the planarized (Gabriel graph) neighbor graph by the right-hand rule. The perimeter state carried by the packet
+    records the position where the packet entered perimeter mode (Lp), the point where it entered the current face
+    (Lf), the first edge traversed on the current face (e0), and the previous hop. The packet returns to greedy mode
+    as soon as it reaches a drone closer to the destination than Lp, and it is regarded as undeliverable if it is
+    about to traverse e0 again, in which case it is dropped as in GPSR instead of being routed around the face once
+    more. Since the drones fly in 3-D space, the planarization and face traversal are done on
+    the horizontal projection, which is an approximation.
+
+    Opportunistic forwarding:
+    When "enable_opportunistic_forwarding" is set, a data packet in greedy mode is sent to up to "max_candidate_num"
+    neighbors that are closer to the destination than me, ranked by their (predicted) distance to the destination. The
+    closest candidate that decodes the frame forwards it and the others give way (see "OpportunisticForwarder").
+
     Attributes:
         simulator: the simulation platform that contains everything
         my_drone: the drone that installed the greedy routing
         hello_interval: interval of sending hello packet
         neighbor_table: neighbor table of greedy routing
+        enable_adaptive_hello: whether to adjust the hello interval to the neighbor churn and relative speed
+        hello_controller: adaptive beaconing controller
+        enable_beacon_piggyback: whether to piggyback beacons on data and ACK frames, in which case a standalone hello
+                                 packet is only broadcast if no beacon was sent within the hello interval
+        last_beacon_time: the time at which the latest piggybacked beacon was sent
+        enable_perimeter_mode: whether to recover from the local minimum by perimeter (face) routing
+        enable_opportunistic_forwarding: whether to send data packets to a ranked list of candidate forwarders
+        forwarder: opportunistic forwarding module
 
     References:
         [1] N. K. Gupta, R. S. Yadav and R. K. Nagaria, "3D geographical routing protocols in wireless ad hoc and sensor
             networks: An overview," in Wireless Networks, vol. 26, pp. 2549-2566, 2020.
+        [2] B. Karp and H. T. Kung, "GPSR: Greedy perimeter stateless routing for wireless networks," in Proceedings of
+            the 6th Annual International Conference on Mobile Computing and Networking (MobiCom), pp. 243-254, 2000.
 
     Author: Zihao Zhou, eezihaozhou@gmail.com
     Created at: 2024/1/11
-    Updated at: 2024/11/20
+    Updated at: 2026/10/19
     """
 
     def __init__(self, simulator, my_drone):
@@ -44,16 +74,29 @@ class Greedy:
         self.my_drone = my_drone
         self.hello_interval = 0.5 * 1e6  # broadcast hello packet every 0.5s
         self.neighbor_table = GreedyNeighborTable(self.simulator.env, my_drone)
+        self.enable_perimeter_mode = 0
+        self.enable_adaptive_hello = 0
+        self.hello_controller = AdaptiveHelloController(self.simulator, my_drone, self.hello_interval)
+        self.enable_beacon_piggyback = 0
+        self.last_beacon_time = -float('inf')
+        self.enable_opportunistic_forwarding = 0
+        self.forwarder = OpportunisticForwarder(self.simulator, my_drone)
         self.simulator.env.process(self.broadcast_hello_packet_periodically())
         self.simulator.env.process(self.check_waiting_list())
 
-    def broadcast_hello_packet(self, my_drone):
+    def generate_hello_packet(self, my_drone):
         config.GL_ID_HELLO_PACKET += 1
         hello_pkd = GreedyHelloPacket(src_drone=my_drone,
                                       creation_time=self.simulator.env.now,
                                       id_hello_packet=config.GL_ID_HELLO_PACKET,
                                       hello_packet_length=config.HELLO_PACKET_LENGTH,
                                       simulator=self.simulator)
+        hello_pkd.hello_interval = self.hello_interval
+
+        return hello_pkd
+
+    def broadcast_hello_packet(self, my_drone):
+        hello_pkd = self.generate_hello_packet(my_drone)
         hello_pkd.transmission_mode = 1
 
         logging.info('At time: %s, UAV: %s has hello packet to broadcast',
@@ -64,10 +107,54 @@ class Greedy:
 
     def broadcast_hello_packet_periodically(self):
         while True:
-            self.broadcast_hello_packet(self.my_drone)
+            if self.enable_adaptive_hello:
+                self.neighbor_table.purge()
+                neighbor_ids = [key for key in self.neighbor_table.neighbor_table.keys()
+                                if key != self.my_drone.identifier]
+                relative_speed = self.neighbor_table.get_relative_speed(self.my_drone)
+                self.hello_interval = self.hello_controller.next_interval(neighbor_ids, relative_speed)
+
+            if self.enable_beacon_piggyback and \
+                    self.simulator.env.now - self.last_beacon_time < self.hello_interval:
+                # my neighbors have overheard a beacon recently, no need for a standalone hello packet
+                self.simulator.metrics.suppressed_hello_num += 1
+            else:
+                self.broadcast_hello_packet(self.my_drone)
+
             jitter = random.randint(1000, 2000)  # delay jitter
             yield self.simulator.env.timeout(self.hello_interval + jitter)
 
+    def piggyback_beacon(self, packet, max_beacon_length=None):
+        """
+        Piggyback my beacon (position and velocity) on an outgoing data or ACK frame
+        :param packet: the outgoing frame
+        :param max_beacon_length: for an ACK frame, the beacon must not be longer than the beacon of the data frame
+                                  being acknowledged, otherwise the ACK would arrive after the ACK timeout
+        :return: none
+        """
+
+        beacon = self.generate_hello_packet(self.my_drone)
+
+        if max_beacon_length is not None and beacon.get_payload_length() > max_beacon_length:
+            return
+
+        packet.attach_beacon(beacon)
+
+    # the frame carrying my beacon is transmitted
+    def beacon_sent(self, beacon):
+        self.last_beacon_time = self.simulator.env.now
+        self.simulator.metrics.piggybacked_beacon_num += 1
+
+    def overhear_beacon(self, beacon, src_drone_id):
+        """
+        Refresh the neighbor table according to a beacon overheard on a data or ACK frame
+        :param beacon: the piggybacked hello packet
+        :param src_drone_id: the sender of the frame
+        :return: none
+        """
+
+        self.neighbor_table.add_neighbor(beacon, self.simulator.env.now)
+
     def next_hop_selection(self, packet):
         """
         Select the next hop according to the routing protocol
@@ -83,16 +170,158 @@ class Greedy:
 
         dst_drone = packet.dst_drone
 
-        # choose best next hop according to the neighbor table
-        best_next_hop_id = self.neighbor_table.best_neighbor(self.my_drone, dst_drone)
+        if isinstance(packet, DataPacket):
+            packet.candidate_list = None  # the candidates are chosen again at each hop
 
-        if best_next_hop_id is self.my_drone.identifier:
+        if self.enable_perimeter_mode and isinstance(packet, DataPacket):
+            best_next_hop_id = self.greedy_perimeter_forwarding(packet)
+        else:
+            # choose best next hop according to the neighbor table
+            best_next_hop_id = self.neighbor_table.best_neighbor(self.my_drone, dst_drone)
+
+        if best_next_hop_id == self.my_drone.identifier:
             has_route = False  # no available next hop
         else:
             packet.next_hop_id = best_next_hop_id  # it has an available next hop drone
 
+            if self.enable_opportunistic_forwarding and isinstance(packet, DataPacket) and \
+                    packet.perimeter_state is None:
+                ranked_ids, positions = self.neighbor_table.candidate_neighbors(self.my_drone, dst_drone)
+                if len(ranked_ids) != 0:
+                    self.forwarder.set_candidates(packet, ranked_ids, positions)
+
+            if self.enable_beacon_piggyback and isinstance(packet, DataPacket):
+                self.piggyback_beacon(packet)
+
         return has_route, packet, enquire
 
+    def peek_next_hop(self, packet):
+        """
+        Look up the next hop of a data packet without any side effect on the packet, e.g., when the mac protocol scans
+        its queue for frame aggregation. The packets in perimeter mode (or that would enter it) and the packets sent
+        to candidate forwarders are not looked up
+        :param packet: the data packet
+        :return: identifier of the next hop, or "None" if it cannot be determined in this way
+        """
+
+        if self.enable_opportunistic_forwarding or packet.perimeter_state is not None:
+            return None
+
+        self.neighbor_table.purge()
+        best_next_hop_id = self.neighbor_table.best_neighbor(self.my_drone, packet.dst_drone)
+
+        if best_next_hop_id == self.my_drone.identifier:
+            return None
+        else:
+            return best_next_hop_id
+
+    def greedy_perimeter_forwarding(self, packet):
+        """
+        Select the next hop in greedy mode, and switch to perimeter mode at the local minimum
+        :param packet: the data packet that needs to be sent
+        :return: next hop drone id, or the identifier of myself if no next hop is available
+        """
+
+        my_id = self.my_drone.identifier
+        dst_coords = packet.dst_drone.coords
+        state = packet.perimeter_state
+
+        if state is not None:
+            if euclidean_distance(self.my_drone.coords, dst_coords) < euclidean_distance(state['lp'], dst_coords):
+                state = None  # closer than the entry point, return to greedy mode
+            else:
+                if state['cur'] == my_id:  # selected again by myself, e.g., retransmission
+                    prev_id = state['prev']
+                else:
+                    prev_id = state['cur']
+
+                next_hop_id, new_state = self.perimeter_next_hop(state, prev_id, dst_coords)
+                packet.perimeter_state = new_state
+                return next_hop_id
+
+        best_next_hop_id = self.neighbor_table.best_neighbor(self.my_drone, packet.dst_drone)
+
+        if best_next_hop_id != my_id:
+            packet.perimeter_state = None
+            return best_next_hop_id
+
+        # local minimum, enter perimeter mode
+        state = {'lp': list(self.my_drone.coords),
+                 'lf': list(self.my_drone.coords[:2]),
+                 'e0': None,
+                 'prev': my_id,
+                 'cur': my_id}
+
+        next_hop_id, new_state = self.perimeter_next_hop(state, my_id, dst_coords)
+        packet.perimeter_state = new_state
+
+        if next_hop_id != my_id:
+            self.simulator.metrics.perimeter_entry_num += 1
+            logging.info('At time: %s, packet: %s enters perimeter mode at UAV: %s',
+                         self.simulator.env.now, packet.packet_id, my_id)
+
+        return next_hop_id
+
+    def perimeter_next_hop(self, state, prev_id, dst_coords):
+        """
+        Select the next hop on the current face by the right-hand rule, and change face if the chosen edge crosses the
+        line between the face entry point and the destination
+        :param state: perimeter state carried by the packet
+        :param prev_id: previous hop, or the identifier of myself when entering perimeter mode
+        :param dst_coords: position of the destination
+        :return: next hop drone id and the new perimeter state (a new dictionary, since the packet is shallow-copied
+                 at each hop and the state must not be shared between the copies), the state is marked "unreachable"
+                 if the packet has travelled the whole face
+        """
+
+        my_id = self.my_drone.identifier
+        my_coords = self.my_drone.coords
+
+        if prev_id == my_id:
+            ref_position = dst_coords
+        else:
+            ref_position = self.neighbor_table.get_position(prev_id, self.simulator)
+
+        next_hop_id = self.neighbor_table.right_hand_neighbor(self.my_drone, ref_position)
+
+        if next_hop_id == my_id:  # no neighbor at all
+            return my_id, None
+
+        lf = state['lf']
+        e0 = state['e0']
+        face_changed = False
+
+        lf_distance = math.dist(lf, dst_coords[:2])
+        for _ in range(len(self.neighbor_table.neighbor_table)):
+            next_hop_position = self.neighbor_table.get_position(next_hop_id, self.simulator)
+            crossing = segment_intersection(my_coords, next_hop_position, lf, dst_coords)
+
+            if crossing is None or math.dist(crossing, dst_coords[:2]) >= lf_distance:
+                break
+
+            # the edge crosses the line "Lf-D" closer to the destination, change to the next face
+            lf = crossing
+            lf_distance = math.dist(lf, dst_coords[:2])
+            face_changed = True
+            next_hop_id = self.neighbor_table.right_hand_neighbor(self.my_drone, next_hop_position)
+
+        edge = (my_id, next_hop_id)
+
+        if e0 is None or face_changed:
+            e0 = edge
+        elif edge == e0:
+            # the packet has travelled the whole face without getting closer, the destination is unreachable for now
+            self.simulator.metrics.perimeter_loop_num += 1
+            return my_id, {'unreachable': True}
+
+        new_state = {'lp': state['lp'],
+                     'lf': lf,
+                     'e0': e0,
+                     'prev': prev_id,
+                     'cur': my_id}
+
+        return next_hop_id, new_state
+
     def packet_reception(self, packet, src_drone_id):
         """
         Packet reception at network layer
@@ -133,18 +362,35 @@ class Greedy:
                                        ack_packet=packet_copy,
                                        simulator=self.simulator)
 
-                yield self.simulator.env.timeout(config.SIFS_DURATION)  # switch from receiving to transmitting
+                if packet.candidate_list is not None:
+                    # give way to the candidates of higher priority, my turn includes the SIFS
+                    accepted = yield self.simulator.env.process(self.forwarder.wait_for_priority(packet,
+                                                                                                 src_drone_id))
+                    self.forwarder.address_ack(ack_packet, packet)
+                else:
+                    accepted = True
+                    yield self.simulator.env.timeout(config.SIFS_DURATION)  # switch from receiving to transmitting
 
                 # unicast the ack packet immediately without contention for the channel
-                if not self.my_drone.sleep:
+                if not self.my_drone.sleep and accepted:
+                    if self.enable_beacon_piggyback:
+                        self.piggyback_beacon(ack_packet, max_beacon_length=packet_copy.beacon_length)
+
                     ack_packet.increase_ttl()
                     self.my_drone.mac_protocol.phy.unicast(ack_packet, src_drone_id)
+
                     yield self.simulator.env.timeout(ack_packet.packet_length / config.BIT_RATE * 1e6)
                     self.simulator.drones[src_drone_id].receive()
                 else:
                     pass
             else:
-                if self.my_drone.transmitting_queue.qsize() < self.my_drone.max_queue_size:  # have enough capacity
+                accepted = True
+                if packet.candidate_list is not None:
+                    # give way to the candidates of higher priority, my turn includes the SIFS
+                    accepted = yield self.simulator.env.process(self.forwarder.wait_for_priority(packet,
+                                                                                                 src_drone_id))
+
+                if accepted and self.my_drone.transmitting_queue.qsize() < self.my_drone.max_queue_size:
                     self.my_drone.transmitting_queue.put(packet_copy)  # add this packet into my own queue
 
                     config.GL_ID_ACK_PACKET += 1
@@ -156,19 +402,30 @@ class Greedy:
                                            ack_packet=packet_copy,
                                            simulator=self.simulator)
 
-                    yield self.simulator.env.timeout(config.SIFS_DURATION)  # switch from receiving to transmitting
+                    if packet.candidate_list is not None:
+                        self.forwarder.address_ack(ack_packet, packet)
+                    else:
+                        yield self.simulator.env.timeout(config.SIFS_DURATION)  # switch from receiving to transmitting
 
                     # unicast the ack packet immediately without contention for the channel
                     if not self.my_drone.sleep:
+                        if self.enable_beacon_piggyback:
+                            self.piggyback_beacon(ack_packet, max_beacon_length=packet_copy.beacon_length)
+
                         ack_packet.increase_ttl()
                         self.my_drone.mac_protocol.phy.unicast(ack_packet, src_drone_id)
+
                         yield self.simulator.env.timeout(ack_packet.packet_length / config.BIT_RATE * 1e6)
                         self.simulator.drones[src_drone_id].receive()
                     else:
                         pass
-                else:  # the queue is full, discard this packet and no ACK reply
+                else:  # the queue is full or another candidate has taken over, discard this packet and no ACK reply
                     pass
 
+        elif isinstance(packet, AckPacket) and packet.dst_drone is not self.my_drone:
+            # the ACK of another candidate forwarder, which has taken over the packet
+            self.forwarder.overhear_ack(packet.ack_packet.packet_id, packet.dst_drone.identifier)
+
         elif isinstance(packet, AckPacket):
             data_packet_acked = packet.ack_packet
 
@@ -210,13 +467,21 @@ class Greedy:
         while True:
             if not self.my_drone.sleep:
                 yield self.simulator.env.timeout(0.6 * 1e6)
-                for waiting_pkd in self.my_drone.waiting_list:
+                for waiting_pkd in list(self.my_drone.waiting_list):
                     if self.simulator.env.now > waiting_pkd.creation_time + waiting_pkd.deadline:
                         self.my_drone.waiting_list.remove(waiting_pkd)
+                    elif waiting_pkd.perimeter_state is not None and waiting_pkd.perimeter_state.get('unreachable'):
+                        # the face routing has already found the destination unreachable
+                        logging.info('Packet: %s is dropped at UAV: %s, its destination is unreachable',
+                                     waiting_pkd.packet_id, self.my_drone.identifier)
+                        self.my_drone.waiting_list.remove(waiting_pkd)
                     else:
                         dst_drone = waiting_pkd.dst_drone
                         best_next_hop_id = self.neighbor_table.best_neighbor(self.my_drone, dst_drone)
-                        if best_next_hop_id != self.my_drone.identifier:
+
+                        # in perimeter mode, the packet can be routed around the void as long as there is a neighbor
+                        has_neighbor = len(self.neighbor_table.planar_neighbors(self.my_drone)[0]) > 0
+                        if best_next_hop_id != self.my_drone.identifier or (self.enable_perimeter_mode and has_neighbor):
                             self.my_drone.transmitting_queue.put(waiting_pkd)
                             self.my_drone.waiting_list.remove(waiting_pkd)
                         else:
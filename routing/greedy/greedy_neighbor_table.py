@@ -1,5 +1,8 @@
 import logging
 import math
+import numpy as np
+from phy.large_scale_fading import maximum_communication_range
+from utils import config
 from utils.util_function import euclidean_distance
 from collections import defaultdict
 
@@ -9,20 +12,49 @@ class GreedyNeighborTable:
     Neighbor table of Greedy Forwarding
 
     type of the neighbor table: dictionary
-    the structure of the neighbor table is: {drone1: [coords1, updated time1], drone2: [coords2, updated time2],...}
+    the structure of the neighbor table is:
+    {drone1: [coords1, updated time1, velocity1, sampled time1], drone2: [coords2, updated time2, ...], ...}
     each item in the neighbor table has its lifetime, if the hello packet from a drone has not been received for more
     than a certain time, it can be considered that this drone has flown out of my communication range. Therefore, the
     item associated with this drone is removed from my neighbor table
 
+    The hello packet carries a snapshot of the position and velocity of its sender and the time of the snapshot. When
+    "enable_position_prediction" is set, the positions of all neighbors are extrapolated to the current moment at once
+    (position + velocity * elapsed time) before selecting the next hop, and the neighbors that are predicted to have
+    left my communication range are not selected, instead of costing an ACK timeout and retransmission.
+
+    When "enable_trajectory_prediction" is set, the neighbors are further required to stay within my communication range
+    until a data packet and its ACK have been transmitted ("link_hold_time"). The expected positions of both ends and
+    their uncertainty radii are given by the trajectory prediction of the mobility model, and the link is only kept if
+    it holds even when both ends deviate from the expectation by their uncertainty radii.
+
+    The hello packet also announces the hello interval of its sender. If the sender beacons slowly, its entry is kept
+    alive for "life_time_factor" times the announced interval, so that it is not purged between two hello packets.
+
+    For the perimeter (face) routing used to escape from void areas, the neighbors are planarized by Gabriel graph on
+    the horizontal (x-y) plane: the edge between me and a neighbor "v" is kept only if no other neighbor lies in the
+    circle whose diameter is this edge. The planarized neighbor set is cached and only recomputed when the neighbor
+    table is modified or a new prediction epoch ("planar_cache_interval") begins, since the positions of the drones
+    (extrapolated or not) hardly change within an epoch. In this way, the right-hand rule costs O(degree) per hop.
+
     Attributes:
         env: simulation environment
         neighbor_table: dictionary in python, core member
         entry_life_time: lifetime of each item in the neighbor table
+        life_time_factor: an item is valid for at least this many hello intervals announced by the neighbor
+        announced_interval: {drone: hello interval announced in its latest hello packet}
+        enable_position_prediction: whether to extrapolate the positions of neighbors according to their velocities
+        max_comm_range: maximum communication range, neighbors predicted beyond this range are not selected
+        enable_trajectory_prediction: whether to check that the link holds until the data packet has been acknowledged
+        link_hold_time: time for which the link should hold, i.e., transmission of a data packet, a SIFS and an ACK
         have_void_area: used to indicate if encounters void area
+        version: increased whenever the neighbor table is modified, used to invalidate the cached planar graph
+        planar_cache_interval: length of a prediction epoch, within which the cached planar graph is reused
+        planar_cache: [key, identifiers of planar neighbors, their x-y positions]
 
     Author: Zihao Zhou, eezihaozhou@gmail.com
     Created at: 2024/1/11
-    Updated at: 2024/11/20
+    Updated at: 2026/10/19
     """
 
     def __init__(self, env, my_drone):
@@ -30,7 +62,17 @@ class GreedyNeighborTable:
         self.my_drone = my_drone
         self.neighbor_table = defaultdict(list)
         self.entry_life_time = 1 * 1e6  # unit: us (1s)
+        self.life_time_factor = 2
+        self.announced_interval = dict()
+        self.enable_position_prediction = 0
+        self.max_comm_range = maximum_communication_range()
+        self.enable_trajectory_prediction = 0
+        self.link_hold_time = (config.DATA_PACKET_LENGTH + config.ACK_PACKET_LENGTH) / config.BIT_RATE * 1e6 + \
+            config.SIFS_DURATION
         self.have_void_area = 1
+        self.version = 0
+        self.planar_cache_interval = 10 * 1e3  # 10ms, the drones move by a fraction of a meter
+        self.planar_cache = None
 
     # determine if the neighbor table is empty
     def is_empty(self):
@@ -53,11 +95,19 @@ class GreedyNeighborTable:
 
         drone_id = hello_packet.src_drone.identifier
         position = hello_packet.cur_position
-        self.neighbor_table[drone_id] = [position, cur_time]
+        velocity = hello_packet.cur_velocity
+        self.neighbor_table[drone_id] = [position, cur_time, velocity, hello_packet.creation_time]
+        self.announced_interval[drone_id] = hello_packet.hello_interval
+        self.version += 1
 
     # delete the specified item
     def remove_neighbor(self, drone_id):
         del self.neighbor_table[drone_id]
+        self.version += 1
+
+    # get the lifetime of certain item
+    def get_entry_life_time(self, drone_id):
+        return max(self.entry_life_time, self.life_time_factor * self.announced_interval.get(drone_id, 0))
 
     # determine whether a certain drone is one's neighbor
     def is_neighbor(self, certain_drone):
@@ -68,10 +118,93 @@ class GreedyNeighborTable:
     def get_neighbor_position(self, certain_drone):
         if self.is_neighbor(certain_drone):
             drone_id = certain_drone.identifier
-            return self.neighbor_table[drone_id][0]  # return the position list
+            return self.predict_position(drone_id)  # return the position list
         else:
             raise RuntimeError('This drone is not my neighbor!')
 
+    def get_relative_speed(self, my_drone):
+        """
+        Get the maximum speed of my neighbors relative to me, according to the velocities in their hello packets
+        :param my_drone: the drone that installed the greedy routing
+        :return: maximum relative speed, unit: m/s
+        """
+
+        velocities = [self.neighbor_table[drone_id][2] for drone_id in self.neighbor_table.keys()
+                      if drone_id != my_drone.identifier]
+
+        if not velocities:
+            return 0
+
+        my_velocity = [0, 0, 0] if config.STATIC_CASE else my_drone.velocity
+        return float(np.max(np.linalg.norm(np.array(velocities, dtype=float) - np.array(my_velocity), axis=1)))
+
+    # get the (predicted) position of a neighbor at the current moment
+    def predict_position(self, drone_id):
+        position, _, velocity, sampled_time = self.neighbor_table[drone_id]
+
+        if not self.enable_position_prediction:
+            return position
+
+        elapsed_time = (self.env.now - sampled_time) / 1e6  # unit: s
+        return [position[i] + velocity[i] * elapsed_time for i in range(3)]
+
+    def predict_neighbors(self, my_drone):
+        """
+        Extrapolate the positions of all neighbors (excluding myself) to the current moment in a vectorized way
+        :param my_drone: the drone that installed the greedy routing
+        :return: identifiers of the neighbors that are predicted within my communication range, and their positions
+        """
+
+        neighbor_ids = np.array([drone_id for drone_id in self.neighbor_table.keys()
+                                 if drone_id != my_drone.identifier], dtype=int)
+
+        if len(neighbor_ids) == 0:
+            return neighbor_ids, np.empty((0, 3))
+
+        entries = [self.neighbor_table[drone_id] for drone_id in neighbor_ids]
+        positions = np.array([entry[0] for entry in entries], dtype=float)
+
+        if self.enable_position_prediction:
+            velocities = np.array([entry[2] for entry in entries], dtype=float)
+            elapsed_time = (self.env.now - np.array([entry[3] for entry in entries], dtype=float)) / 1e6
+            positions = positions + velocities * elapsed_time[:, None]
+
+            in_range = np.linalg.norm(positions - np.array(my_drone.coords, dtype=float), axis=1) <= self.max_comm_range
+            neighbor_ids = neighbor_ids[in_range]
+            positions = positions[in_range]
+
+        if self.enable_trajectory_prediction and len(neighbor_ids) != 0:
+            link_hold = self.predict_link_holding(my_drone, neighbor_ids)
+            neighbor_ids = neighbor_ids[link_hold]
+            positions = positions[link_hold]
+
+        return neighbor_ids, positions
+
+    def predict_link_holding(self, my_drone, neighbor_ids):
+        """
+        Predict whether the links to the neighbors hold until a data packet and its ACK have been transmitted. The
+        neighbors are assumed to follow the same mobility model as me, and their trajectories are predicted from the
+        snapshots in their hello packets
+        :param my_drone: the drone that installed the greedy routing
+        :param neighbor_ids: identifiers of the neighbors
+        :return: a boolean array, "True" if the link is predicted to hold
+        """
+
+        mobility_model = my_drone.mobility_model
+        my_position, my_radius = mobility_model.predict_position(self.link_hold_time)
+
+        link_hold = np.zeros(len(neighbor_ids), dtype=bool)
+        for index, drone_id in enumerate(neighbor_ids):
+            position, _, velocity, sampled_time = self.neighbor_table[drone_id]
+            delay = self.env.now - sampled_time + self.link_hold_time
+            neighbor_position, neighbor_radius = mobility_model.predict_position(delay, position, velocity,
+                                                                                 sampled_time)
+
+            distance = euclidean_distance(my_position, neighbor_position)
+            link_hold[index] = distance + my_radius + neighbor_radius <= self.max_comm_range
+
+        return link_hold
+
     # remove the expired item
     def purge(self):
         if not bool(self.neighbor_table):
@@ -80,7 +213,7 @@ class GreedyNeighborTable:
 
         for key in list(self.neighbor_table):
             updated_time = self.get_updated_time(key)
-            if updated_time + self.entry_life_time < self.env.now:  # expired
+            if updated_time + self.get_entry_life_time(key) < self.env.now:  # expired
                 self.remove_neighbor(key)
 
     # print neighbor table
@@ -94,6 +227,7 @@ class GreedyNeighborTable:
     # clear neighbor table
     def clear(self):
         self.neighbor_table.clear()
+        self.version += 1
 
     def best_neighbor(self, my_drone, dst_drone):
         """
@@ -106,12 +240,96 @@ class GreedyNeighborTable:
         best_distance = euclidean_distance(my_drone.coords, dst_drone.coords)
         best_id = my_drone.identifier
 
-        for key in self.neighbor_table.keys():
-            next_hop_position = self.neighbor_table[key][0]
-            temp_distance = euclidean_distance(next_hop_position, dst_drone.coords)
-            if temp_distance < best_distance:
-                best_distance = temp_distance
-                best_id = key
+        neighbor_ids, positions = self.predict_neighbors(my_drone)
+
+        if len(neighbor_ids) != 0:
+            distances = np.linalg.norm(positions - np.array(dst_drone.coords, dtype=float), axis=1)
+            index = np.argmin(distances)  # the first one is chosen in a tie, same as the sequential scan
+            if distances[index] < best_distance:
+                best_id = int(neighbor_ids[index])
                 self.have_void_area = 0
 
         return best_id
+
+    def candidate_neighbors(self, my_drone, dst_drone):
+        """
+        Rank the neighbors as candidate forwarders for opportunistic forwarding
+        :param my_drone: the drone that installed the greedy routing
+        :param dst_drone: the destination of the data packet
+        :return: identifiers of the neighbors closer to the destination than me (the closest one first), and their
+                 (predicted) positions
+        """
+
+        my_distance = euclidean_distance(my_drone.coords, dst_drone.coords)
+
+        neighbor_ids, positions = self.predict_neighbors(my_drone)
+
+        if len(neighbor_ids) == 0:
+            return neighbor_ids, positions
+
+        distances = np.linalg.norm(positions - np.array(dst_drone.coords, dtype=float), axis=1)
+        order = np.argsort(distances, kind='stable')
+        order = order[distances[order] < my_distance]
+
+        return neighbor_ids[order], positions[order]
+
+    # get the position of a drone, from the neighbor table if possible
+    def get_position(self, drone_id, simulator):
+        if drone_id in self.neighbor_table.keys():
+            return self.predict_position(drone_id)
+        else:
+            return simulator.drones[drone_id].coords
+
+    def planar_neighbors(self, my_drone):
+        """
+        Planarize the neighbors by Gabriel graph on the x-y plane
+        :param my_drone: the drone that installed the greedy routing
+        :return: identifiers of the planar neighbors and their x-y positions
+        """
+
+        key = (self.version, int(self.env.now // self.planar_cache_interval))
+        if self.planar_cache is not None and self.planar_cache[0] == key:
+            return self.planar_cache[1], self.planar_cache[2]
+
+        neighbor_ids, positions = self.predict_neighbors(my_drone)
+        positions = positions[:, :2]
+
+        if len(neighbor_ids) > 1:
+            me = np.array(my_drone.coords[:2], dtype=float)
+            dist_uv = np.sum((positions - me) ** 2, axis=1)  # squared distance between me and each neighbor
+            diff = positions[:, None, :] - positions[None, :, :]
+            dist_vw = np.sum(diff ** 2, axis=2)  # squared distance between each pair of neighbors
+
+            # neighbor "w" is a witness against edge (me, v) if it lies in the circle with diameter (me, v)
+            witness = dist_uv[None, :] + dist_vw < dist_uv[:, None]
+            np.fill_diagonal(witness, False)
+            keep = ~np.any(witness, axis=1)
+
+            neighbor_ids = neighbor_ids[keep]
+            positions = positions[keep]
+
+        self.planar_cache = [key, neighbor_ids, positions]
+
+        return neighbor_ids, positions
+
+    def right_hand_neighbor(self, my_drone, ref_position):
+        """
+        Right-hand rule: find the first planar neighbor counterclockwise about me from the direction of "ref_position"
+        :param my_drone: the drone that installed the greedy routing
+        :param ref_position: the previous hop, or the destination when entering perimeter mode
+        :return: identifier of the selected neighbor, or the identifier of myself if there is no neighbor
+        """
+
+        neighbor_ids, positions = self.planar_neighbors(my_drone)
+
+        if len(neighbor_ids) == 0:
+            return my_drone.identifier
+
+        me = my_drone.coords
+        ref_bearing = math.atan2(ref_position[1] - me[1], ref_position[0] - me[0])
+        bearings = np.arctan2(positions[:, 1] - me[1], positions[:, 0] - me[0])
+
+        delta = np.mod(bearings - ref_bearing, 2 * np.pi)
+        delta[delta <= 1e-9] = 2 * np.pi  # the reference itself is the last choice
+
+        return int(neighbor_ids[np.argmin(delta)])
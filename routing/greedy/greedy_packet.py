@@ -1,4 +1,5 @@
 from entities.packet import Packet
+from utils import config
 
 
 class GreedyHelloPacket(Packet):
@@ -11,4 +12,12 @@ class GreedyHelloPacket(Packet):
         super().__init__(id_hello_packet, hello_packet_length, creation_time, simulator)
 
         self.src_drone = src_drone
-        self.cur_position = src_drone.coords
+
+        # snapshot of the motion state of the sender at "creation_time"
+        self.cur_position = list(src_drone.coords)
+        if config.STATIC_CASE == 0:
+            self.cur_velocity = list(src_drone.velocity)
+        else:
+            self.cur_velocity = [0, 0, 0]
+
+        self.hello_interval = 0  # announced hello interval of the sender
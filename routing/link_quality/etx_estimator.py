@@ -0,0 +1,121 @@
+from collections import defaultdict, deque
+
+
+class EtxEstimator:
+    """
+    Link-quality estimator based on ETX (Expected Transmission Count)
+
+    Each drone periodically broadcasts probes (the hello packets of the routing protocol). For each neighbor, the
+    reception times of its probes within the last "window_size" probe intervals are recorded, which gives the reverse
+    delivery ratio "d_r" (from the neighbor to me). Each probe also carries the reverse delivery ratios measured by
+    its sender, from which I learn the forward delivery ratio "d_f" (from me to the neighbor). The expected number of
+    transmissions (including retransmissions) needed to deliver a frame over the link is then:
+
+    ETX = 1 / (d_f * d_r)
+
+    A link at the edge of the communication range loses many probes and therefore has a large ETX, while a strong
+    link has an ETX close to 1. The delivery ratios are floored at "min_delivery_ratio" so that the ETX of a link
+    that is still heard is always finite. Before the neighbor reports its measurement, "d_f" is assumed to be 1.
+
+    Attributes:
+        env: simulation environment
+        my_drone: the drone that installed the estimator
+        probe_interval: default probe interval of the neighbors, used when a neighbor does not announce its interval
+        window_size: number of probe intervals in the measurement window
+        min_delivery_ratio: lower bound of the delivery ratios
+        reception_time: {neighbor: reception times of its probes within the window}
+        first_heard_time: {neighbor: time at which its first probe was received}
+        announced_interval: {neighbor: probe interval announced in its latest probe}
+        forward_ratio: {neighbor: delivery ratio of my probes, as reported by the neighbor}
+
+    References:
+        [1] D. S. J. De Couto, D. Aguayo, J. Bicket and R. Morris, "A High-Throughput Path Metric for Multi-Hop Wireless
+            Routing," in Proceedings of the 9th Annual International Conference on Mobile Computing and Networking
+            (MobiCom), pp. 134-146, 2003.
+
+    Author: Zihao Zhou, eezihaozhou@gmail.com
+    Created at: 2026/10/18
+    Updated at: 2026/10/18
+    """
+
+    def __init__(self, env, my_drone, probe_interval, window_size=10):
+        self.env = env
+        self.my_drone = my_drone
+        self.probe_interval = probe_interval
+        self.window_size = window_size
+        self.min_delivery_ratio = 0.1
+
+        self.reception_time = defaultdict(deque)
+        self.first_heard_time = dict()
+        self.announced_interval = dict()
+        self.forward_ratio = dict()
+
+    def record_probe(self, probe, cur_time):
+        """
+        Record the reception of a probe
+        :param probe: the received probe, "hello_interval" and "delivery_ratios" are used if available
+        :param cur_time: the moment when the probe is received
+        :return: none
+        """
+
+        src_id = probe.src_drone.identifier
+        if src_id == self.my_drone.identifier:
+            return
+
+        if src_id not in self.reception_time.keys():
+            self.first_heard_time[src_id] = cur_time
+
+        self.reception_time[src_id].append(cur_time)
+
+        if probe.hello_interval:
+            self.announced_interval[src_id] = probe.hello_interval
+
+        if probe.delivery_ratios is not None:
+            # the neighbor has not heard any of my probes within its window if I am not in its report
+            self.forward_ratio[src_id] = probe.delivery_ratios.get(self.my_drone.identifier, 0)
+
+    # remove the receptions that are out of the window
+    def slide_window(self, neighbor_id):
+        interval = self.announced_interval.get(neighbor_id, self.probe_interval)
+        reception_time = self.reception_time[neighbor_id]
+
+        while reception_time and reception_time[0] <= self.env.now - self.window_size * interval:
+            reception_time.popleft()
+
+        if not reception_time:  # the neighbor has not been heard for a whole window
+            del self.reception_time[neighbor_id]
+            self.first_heard_time.pop(neighbor_id, None)
+            self.forward_ratio.pop(neighbor_id, None)
+
+    # get the delivery ratio from certain neighbor to me
+    def get_reverse_ratio(self, neighbor_id):
+        if neighbor_id not in self.reception_time.keys():
+            return 0
+
+        self.slide_window(neighbor_id)
+        if neighbor_id not in self.reception_time.keys():
+            return 0
+
+        interval = self.announced_interval.get(neighbor_id, self.probe_interval)
+
+        # a neighbor heard for less than a window is only expected to have sent the probes since it was first heard
+        expected_num = min(self.window_size, (self.env.now - self.first_heard_time[neighbor_id]) / interval + 1)
+
+        return min(1.0, len(self.reception_time[neighbor_id]) / expected_num)
+
+    # get the delivery ratios of all neighbors, carried by my probes
+    def get_delivery_ratios(self):
+        delivery_ratios = dict()
+        for neighbor_id in list(self.reception_time.keys()):
+            ratio = self.get_reverse_ratio(neighbor_id)
+            if ratio > 0:
+                delivery_ratios[neighbor_id] = ratio
+
+        return delivery_ratios
+
+    # get the ETX of the link between me and certain neighbor
+    def get_etx(self, neighbor_id):
+        reverse_ratio = max(self.get_reverse_ratio(neighbor_id), self.min_delivery_ratio)
+        forward_ratio = max(self.forward_ratio.get(neighbor_id, 1.0), self.min_delivery_ratio)
+
+        return 1 / (forward_ratio * reverse_ratio)
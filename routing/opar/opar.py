@@ -1,9 +1,12 @@
 import copy
 import logging
 import math
+import random
 import numpy as np
 from entities.packet import DataPacket, AckPacket
 from topology.virtual_force.vf_packet import VfPacket
+from routing.opar.opar_packet import OparProbePacket
+from routing.link_quality.etx_estimator import EtxEstimator
 from utils import config
 from utils.util_function import euclidean_distance
 from phy.large_scale_fading import maximum_communication_range
@@ -29,7 +32,46 @@ class Opar:
         best_path: optimal routing path corresponding to "best_obj"
         w1: weight of the first term in objective function
         w2: weight of the second term in objective function
+        w3: weight of the load term in objective function, only used when "enable_load_balancing" is set
         max_comm_range: maximum communication range corresponding to the snr threshold
+        enable_etx_cost: whether to use the ETX of each link as its cost instead of 1
+        probe_interval: interval of broadcasting ETX probes, probes are only sent when "enable_etx_cost" is set
+        rng_probe: random generator of the jitter of the probes
+        link_estimator: ETX estimator fed by the probes of neighbors
+        delivery_ratio_entry_length: length of each delivery ratio carried by the probe (in bit)
+        enable_load_balancing: whether to take the queue occupancy of relays into account (LB-OPAR)
+        load_info_source: "oracle" reads the queues of relays directly, "probe" uses the occupancy advertised in
+                          their latest probes
+        neighbor_load: {neighbor: [queue occupancy carried by its latest probe, received time]}
+        queue_occupancy_length: length of the queue occupancy field carried by the probe (in bit)
+        enable_trajectory_prediction: whether to only keep the links that hold until a data packet is acknowledged
+        link_hold_time: time for which the link should hold, i.e., transmission of a data packet, a SIFS and an ACK
+
+    ETX cost:
+    OPAR itself has no hello packet, the link costs are derived from the global topology. When "enable_etx_cost" is
+    set, each drone broadcasts small probes periodically and estimates the ETX of the links to its neighbors (see
+    "EtxEstimator"). As the cost matrix is built with global knowledge, the cost of link (i, j) is read from the
+    estimator of drone i, so that marginal links that lose many frames are avoided.
+
+    Load balancing:
+    With unit costs, all flows are routed over the same central relays, whose queues fill up and dominate the tail of
+    the end-to-end delay. When "enable_load_balancing" is set, the queue occupancy (queue size / maximum queue size)
+    of each drone is added to the cost of the links towards it when searching paths, and the objective function of a
+    candidate path becomes:
+
+    obj = w1 * total link cost + w2 * link lifetime term + w3 * sum of the queue occupancy of relays
+
+    so that a slightly longer path through idle relays is preferred over a short path through a hotspot [2]. As only
+    relays are counted, the link towards the destination is not charged with its occupancy. The occupancy is either
+    read directly ("oracle") or piggybacked in the periodic probes ("probe"). In the latter case, each drone records
+    the occupancy carried by the probes of its neighbors, and the occupancy of a drone is taken from the latest of its
+    probes received by any drone, so that it is as stale as the probe interval.
+
+    Trajectory prediction:
+    At high speed, a link that exists when the path is computed may break before the data packet on it has been
+    acknowledged. When "enable_trajectory_prediction" is set, the expected positions of all drones after
+    "link_hold_time" and their uncertainty radii are obtained from their mobility models, and a link is only added to
+    the cost matrix if it holds even when both ends deviate from the expectation by their uncertainty radii.
 
     References:
         [1] M. Gharib, F. Afghah and E. Bentley, "OPAR: Optimized Predictive and Adaptive Routing for Cooperative UAV
@@ -39,7 +81,7 @@ class Opar:
 
     Author: Zihao Zhou, eezihaozhou@gmail.com
     Created at: 2024/3/19
-    Updated at: 2024/9/8
+    Updated at: 2026/10/18
     """
 
     def __init__(self, simulator, my_drone):
@@ -51,25 +93,132 @@ class Opar:
 
         self.w1 = 0.5
         self.w2 = 0.5
+        self.w3 = 0.5
 
         self.max_comm_range = maximum_communication_range()
+
+        self.enable_etx_cost = 0
+        self.probe_interval = 0.5 * 1e6  # unit: us
+        self.rng_probe = random.Random(self.my_drone.identifier + self.simulator.seed + 9)
+        self.link_estimator = EtxEstimator(self.simulator.env, my_drone, self.probe_interval)
+        self.delivery_ratio_entry_length = 24  # 16-bit identifier and 8-bit quantized ratio
+
+        self.enable_load_balancing = 0
+        self.load_info_source = 'oracle'
+        self.neighbor_load = dict()
+        self.queue_occupancy_length = 8  # quantized occupancy
+
+        self.enable_trajectory_prediction = 0
+        self.link_hold_time = (config.DATA_PACKET_LENGTH + config.ACK_PACKET_LENGTH) / config.BIT_RATE * 1e6 + \
+            config.SIFS_DURATION
+
         self.simulator.env.process(self.check_waiting_list())
+        self.simulator.env.process(self.broadcast_probe_periodically())
+
+    def probe_enabled(self):
+        return self.enable_etx_cost or (self.enable_load_balancing and self.load_info_source == 'probe')
+
+    def broadcast_probe_periodically(self):
+        # the probes are enabled or not before the simulation starts, otherwise this process ends at once
+        while self.probe_enabled():
+            config.GL_ID_HELLO_PACKET += 1
+
+            delivery_ratios = self.link_estimator.get_delivery_ratios() if self.enable_etx_cost else None
+            probe_length = config.HELLO_PACKET_LENGTH
+
+            if delivery_ratios is not None:
+                probe_length += self.delivery_ratio_entry_length * len(delivery_ratios)
+
+            if self.enable_load_balancing:
+                queue_occupancy = self.get_queue_occupancy()
+                probe_length += self.queue_occupancy_length
+            else:
+                queue_occupancy = None
+
+            probe = OparProbePacket(src_drone=self.my_drone,
+                                    creation_time=self.simulator.env.now,
+                                    id_hello_packet=config.GL_ID_HELLO_PACKET,
+                                    hello_packet_length=probe_length,
+                                    simulator=self.simulator,
+                                    delivery_ratios=delivery_ratios)
+            probe.transmission_mode = 1
+            probe.hello_interval = self.probe_interval
+            probe.queue_occupancy = queue_occupancy
+
+            self.simulator.metrics.control_packet_num += 1
+            self.my_drone.transmitting_queue.put(probe)
+
+            jitter = self.rng_probe.randint(1000, 2000)  # delay jitter
+            yield self.simulator.env.timeout(self.probe_interval + jitter)
 
     def calculate_cost_matrix(self):
         cost = np.zeros((self.simulator.n_drones, self.simulator.n_drones))
         cost.fill(np.inf)
 
+        if self.enable_trajectory_prediction:
+            # expected position and uncertainty radius of each drone when the data packet has been acknowledged
+            predictions = [drone.mobility_model.predict_position(self.link_hold_time) for drone in self.simulator.drones]
+
         for i in range(self.simulator.n_drones):
             for j in range((i+1), self.simulator.n_drones):
                 drone1 = self.simulator.drones[i]
                 drone2 = self.simulator.drones[j]
 
                 if (i != j) and (euclidean_distance(drone1.coords, drone2.coords) < self.max_comm_range):
-                    cost[i, j] = 1
-                    cost[j, i] = 1
+                    if self.enable_trajectory_prediction:
+                        (position1, radius1), (position2, radius2) = predictions[i], predictions[j]
+                        if euclidean_distance(position1, position2) + radius1 + radius2 > self.max_comm_range:
+                            continue  # the link is likely to break before the data packet is acknowledged
+
+                    if self.enable_etx_cost:
+                        link_cost = drone1.routing_protocol.link_estimator.get_etx(j)
+                    else:
+                        link_cost = 1
+
+                    cost[i, j] = link_cost
+                    cost[j, i] = link_cost
 
         return cost
 
+    # get the occupancy of my transmitting queue, in [0, 1]
+    def get_queue_occupancy(self):
+        return self.my_drone.transmitting_queue.qsize() / self.my_drone.max_queue_size
+
+    def calculate_load_vector(self):
+        """
+        Get the queue occupancy of all drones, read directly or from their latest probes
+        :return: numpy array, the i-th element is the queue occupancy of drone i
+        """
+
+        load = np.zeros(self.simulator.n_drones)
+
+        if self.load_info_source == 'probe':
+            received_time = np.full(self.simulator.n_drones, -np.inf)
+
+            for drone in self.simulator.drones:
+                for neighbor_id, (queue_occupancy, cur_time) in drone.routing_protocol.neighbor_load.items():
+                    if cur_time > received_time[neighbor_id]:
+                        load[neighbor_id] = queue_occupancy
+                        received_time[neighbor_id] = cur_time
+        else:
+            for drone in self.simulator.drones:
+                load[drone.identifier] = drone.routing_protocol.get_queue_occupancy()
+
+        return load
+
+    def calculate_path_load(self, path, load):
+        """
+        Calculate the load term of the objective function
+        :param path: routing path excluding the source, the last element is the destination
+        :param load: queue occupancy of all drones
+        :return: sum of the queue occupancy of relays
+        """
+
+        if load is None:
+            return 0
+
+        return float(np.sum(load[path[:-1]]))
+
     def dijkstra(self, cost, src_id, dst_id, minimum_link_lifetime):
         """
         Dijkstra's algorithm to find the shortest path
@@ -131,7 +280,19 @@ class Opar:
 
         if packet.src_drone is self.my_drone:  # if it is the source, optimization should be executed
             self.cost = self.calculate_cost_matrix()
-            temp_cost = self.cost
+
+            if self.enable_load_balancing:
+                # the cost of entering a drone grows with its queue occupancy
+                load = self.calculate_load_vector()
+
+                # the occupancy of a drone is added to the links towards it, except for the destination, which is
+                # not a relay (see "calculate_path_load")
+                relay_load = load.copy()
+                relay_load[packet.dst_drone.identifier] = 0
+                temp_cost = self.cost + self.w3 * relay_load[None, :]
+            else:
+                load = None
+                temp_cost = self.cost
             src_drone = self.my_drone  # packet.src_drone
             dst_drone = packet.dst_drone  # get the destination of the data packet
 
@@ -159,7 +320,7 @@ class Opar:
                         minimum_link_lifetime = delta_t
 
                 # calculate the objective function
-                obj = self.w1 * total_cost + self.w2 * t
+                obj = self.w1 * total_cost + self.w2 * t + self.w3 * self.calculate_path_load(path, load)
                 self.best_obj = obj
                 self.best_path = path
             else:
@@ -191,7 +352,7 @@ class Opar:
                             minimum_link_lifetime = delta_t
 
                     # calculate the objective function
-                    obj = self.w1 * total_cost + self.w2 * t
+                    obj = self.w1 * total_cost + self.w2 * t + self.w3 * self.calculate_path_load(path, load)
 
                     if obj < self.best_obj:
                         self.best_obj = obj
@@ -219,6 +380,22 @@ class Opar:
 
         return has_route, packet, enquire
 
+    def peek_next_hop(self, packet):
+        """
+        Look up the next hop of a data packet without any side effect, e.g., when the mac protocol scans its queue
+        for frame aggregation. Only relays can do so, since the source determines the path by the optimization
+        :param packet: the data packet
+        :return: identifier of the next hop, or "None" if it cannot be determined in this way
+        """
+
+        if packet.src_drone is self.my_drone or packet.routing_path is None:
+            return None
+
+        if len(packet.routing_path) > 1:
+            return packet.routing_path[1]  # the head of the routing path is myself
+        else:
+            return None
+
     def packet_reception(self, packet, src_drone_id):
         """
         Packet reception at network layer
@@ -231,7 +408,13 @@ class Opar:
         """
 
         current_time = self.simulator.env.now
-        if isinstance(packet, DataPacket):
+        if isinstance(packet, OparProbePacket):
+            self.link_estimator.record_probe(packet, current_time)
+
+            if packet.queue_occupancy is not None and packet.src_drone is not self.my_drone:
+                self.neighbor_load[src_drone_id] = [packet.queue_occupancy, current_time]
+
+        elif isinstance(packet, DataPacket):
             packet_copy = copy.copy(packet)
 
             logging.info('~~~Packet: %s is received by UAV: %s at: %s',
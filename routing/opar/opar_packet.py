@@ -0,0 +1,17 @@
+from entities.packet import Packet
+
+
+class OparProbePacket(Packet):
+    def __init__(self,
+                 src_drone,
+                 creation_time,
+                 id_hello_packet,
+                 hello_packet_length,
+                 simulator,
+                 delivery_ratios=None):
+        super().__init__(id_hello_packet, hello_packet_length, creation_time, simulator)
+
+        self.src_drone = src_drone
+        self.hello_interval = 0  # announced probe interval of the sender
+        self.delivery_ratios = delivery_ratios  # {neighbor: delivery ratio of its probes}
+        self.queue_occupancy = None  # queue occupancy of the sender, only carried when load balancing is enabled
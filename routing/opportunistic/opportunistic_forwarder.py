@@ -0,0 +1,128 @@
+import logging
+import numpy as np
+from phy.large_scale_fading import maximum_communication_range
+from utils import config
+
+# config logging
+logging.basicConfig(filename='running_log.log',
+                    filemode='w',  # there are two modes: 'a' and 'w'
+                    format='%(asctime)s - %(levelname)s - %(message)s',
+                    level=config.LOGGING_LEVEL
+                    )
+
+
+class OpportunisticForwarder:
+    """
+    Opportunistic forwarding shared by the routing protocols that rank their neighbors locally (Greedy and Q-routing)
+
+    Instead of a single next hop, the data packet carries an ordered list of candidate forwarders chosen by the routing
+    protocol, and the frame is delivered to all of them. The candidates reply their ACKs one after another in the order
+    of priority: the candidate of rank "k" defers its ACK by "k" ACK slots (see "Packet.get_ack_deferral"). The ACK of a
+    candidate is also sent to the other candidates (see "address_ack"), and a candidate that receives the ACK of a
+    higher-priority candidate before its own turn discards the packet silently. Since an ACK slot ends a SIFS before
+    the next candidate replies, the ACK has been received by then unless it is lost, e.g., by a collision, in which
+    case both candidates forward the packet. Therefore, the best-positioned drone that decodes the frame takes over,
+    and a frame that only a lower-priority candidate decodes is not wasted. Since the suppression relies on
+    overhearing, a neighbor only becomes a candidate if it is (predicted to be) within the communication range of all
+    candidates of higher priority. The sender accepts the first ACK, and its ACK timeout is extended by the deferral of
+    the last candidate.
+
+    Attributes:
+        simulator: the simulation platform that contains everything
+        my_drone: the drone that installed the routing protocol
+        max_candidate_num: maximum number of candidate forwarders carried by a data packet
+        max_comm_range: maximum communication range, used to check whether the candidates can hear each other
+        suppression_life_time: how long an overheard ACK is remembered
+        overheard_ack: {(packet id, sender of the data frame): time at which the ACK of another candidate is received}
+
+    References:
+        [1] S. Biswas and R. Morris, "ExOR: Opportunistic Multi-Hop Routing for Wireless Networks," in Proceedings of
+            the ACM SIGCOMM Conference, pp. 133-144, 2005.
+        [2] K. Zeng, W. Lou, J. Yang and D. R. Brown, "On Throughput Efficiency of Geographic Opportunistic Routing in
+            Multihop Wireless Networks," Mobile Networks and Applications, vol. 12, no. 5, pp. 347-357, 2007.
+
+    Author: Zihao Zhou, eezihaozhou@gmail.com
+    Created at: 2026/10/18
+    Updated at: 2026/10/19
+    """
+
+    def __init__(self, simulator, my_drone, max_candidate_num=3):
+        self.simulator = simulator
+        self.my_drone = my_drone
+        self.max_candidate_num = max_candidate_num
+        self.max_comm_range = maximum_communication_range()
+        self.suppression_life_time = 0.1 * 1e6  # unit: us
+        self.overheard_ack = dict()
+
+    def set_candidates(self, packet, ranked_ids, positions):
+        """
+        Attach the candidate forwarders to the data packet
+        :param packet: the data packet that needs to be sent
+        :param ranked_ids: identifiers of the neighbors ranked by the routing protocol, in descending order of priority
+        :param positions: (predicted) positions of these neighbors
+        :return: none
+        """
+
+        candidate_ids = [int(ranked_ids[0])]
+        selected = [0]
+
+        for index in range(1, len(ranked_ids)):
+            if len(candidate_ids) == self.max_candidate_num:
+                break
+
+            distances = np.linalg.norm(positions[selected] - positions[index], axis=1)
+            if np.all(distances <= self.max_comm_range):  # able to overhear the candidates of higher priority
+                candidate_ids.append(int(ranked_ids[index]))
+                selected.append(index)
+
+        packet.next_hop_id = candidate_ids[0]
+        packet.candidate_list = candidate_ids if len(candidate_ids) > 1 else None
+
+    def wait_for_priority(self, packet, src_drone_id):
+        """
+        Wait for my turn to reply the ACK, i.e., my ACK deferral and the SIFS before the ACK, and check whether a
+        higher-priority candidate has taken over the packet
+        :param packet: the received data packet
+        :param src_drone_id: previous hop
+        :return: "True" if I should forward (or accept) the packet and reply the ACK
+        """
+
+        if packet.candidate_list is None or self.my_drone.identifier not in packet.candidate_list:
+            yield self.simulator.env.timeout(config.SIFS_DURATION)
+            return True
+
+        rank = packet.candidate_list.index(self.my_drone.identifier)
+        yield self.simulator.env.timeout(packet.get_ack_deferral(rank) + config.SIFS_DURATION)
+
+        key = (packet.packet_id, src_drone_id)
+        if key in self.overheard_ack.keys():
+            logging.info('At time: %s, UAV: %s gives up packet: %s since a higher-priority candidate has taken over',
+                         self.simulator.env.now, self.my_drone.identifier, packet.packet_id)
+
+            self.simulator.metrics.suppressed_forwarder_num += 1
+            return False
+
+        return True
+
+    @staticmethod
+    def address_ack(ack_packet, packet):
+        """
+        Send my ACK to the other candidates as well, so that they give way to me once they receive it
+        :param ack_packet: my ACK
+        :param packet: the data frame being acknowledged as received, rather than my copy that may have been routed
+                       again (with new candidates) before my ACK is sent
+        :return: none
+        """
+
+        ack_packet.candidate_list = packet.candidate_list
+
+    # record the ACK of another candidate, which has taken over the packet
+    def overhear_ack(self, packet_id, src_drone_id):
+        self.purge()
+        self.overheard_ack[(packet_id, src_drone_id)] = self.simulator.env.now
+
+    # forget the ACKs overheard long ago
+    def purge(self):
+        for key in list(self.overheard_ack):
+            if self.overheard_ack[key] + self.suppression_life_time < self.simulator.env.now:
+                del self.overheard_ack[key]
@@ -3,6 +3,8 @@ import random
 import logging
 from entities.packet import DataPacket
 from routing.q_routing.q_routing_packet import QRoutingHelloPacket, QRoutingAckPacket
+from routing.adaptive_hello.adaptive_hello_controller import AdaptiveHelloController
+from routing.opportunistic.opportunistic_forwarder import OpportunisticForwarder
 from routing.q_routing.q_routing_table import QRoutingTable
 from utils import config
 
@@ -47,14 +49,45 @@ class QRouting:
         hello_interval: interval of sending hello packet
         learning_rate: used to guide the degree to which the Q-value is updated
         table: including neighbor table and Q-table
+        enable_adaptive_hello: whether to adjust the hello interval to the neighbor churn and relative speed
+        hello_controller: adaptive beaconing controller
+        enable_beacon_piggyback: whether to piggyback beacons on data and ACK frames, in which case a standalone hello
+                                 packet is only broadcast if no beacon was sent within the hello interval
+        last_beacon_time: the time at which the latest piggybacked beacon was sent
+        enable_hello_q_estimates: whether hello packets carry the best Q-value estimation of the sender
+        hello_learning_rate: learning rate of the updates driven by hello packets
+        q_estimate_entry_length: in bit, length of each (destination, estimation) entry in the hello packet
+        enable_opportunistic_forwarding: whether to send data packets to a ranked list of candidate forwarders
+        forwarder: opportunistic forwarding module
+
+    Piggybacked Q-estimates:
+    Updating the Q-values only by ACK packets means that a drone learns nothing about a neighbor until it has forwarded
+    data packets through it. When "enable_hello_q_estimates" is set, each hello packet of drone "y" carries
+    t_y(d) = min Q_y(d, z) for all destinations "d" that "y" has learned. Upon receiving it, drone "x" updates all these
+    entries in one batch, in the spirit of dual reinforcement Q-routing:
+
+    Q_x(d, y) <-- (1 - b) * Q_x(d, y) + b * (s + t_y(d))
+
+    where "s" is the nominal one-hop delay of a data packet and its ACK. Since the Q-values become informative earlier,
+    exploration is restricted to the neighbors that still have no learned Q-value for the destination
+
+    Opportunistic forwarding:
+    When "enable_opportunistic_forwarding" is set, a data packet is sent to the next hop chosen as usual followed by
+    the other neighbors with learned Q-values for the destination, in ascending order of Q-value. The candidate of the
+    highest priority that decodes the frame forwards it and replies the ACK, so the Q-value of the drone that actually
+    took over is the one updated (see "OpportunisticForwarder")
 
     References:
         [1] J. Boyan and M. Littman, "Packet Routing in Dynamically Changing Networks: A Reinforcement Learning
             Approach," Advances in Neural Information Processing Systems (NIPS), no. 6, 1993.
+        [2] S. Kumar and R. Miikkulainen, "Dual Reinforcement Q-Routing: An On-Line Adaptive Routing Algorithm," in
+            Proceedings of the Artificial Neural Networks in Engineering Conference, 1997.
+        [3] S. Kumar and R. Miikkulainen, "Confidence Based Dual Reinforcement Q-Routing: An Adaptive Online Network
+            Routing Algorithm," in Proceedings of the International Joint Conference on Artificial Intelligence, 1999.
 
     Author: Zihao Zhou, eezihaozhou@gmail.com
     Created at: 2024/8/20
-    Updated at: 2024/8/29
+    Updated at: 2026/10/19
 
     """
 
@@ -63,17 +96,53 @@ class QRouting:
         self.my_drone = my_drone
         self.hello_interval = 0.5 * 1e6  # broadcast hello packet every 0.5s
         self.learning_rate = 0.5
-        self.table = QRoutingTable(self.simulator.env, my_drone)
+        self.table = QRoutingTable(self.simulator.env, my_drone, enable_hello_q_estimates=0)
+
+        self.enable_adaptive_hello = 0
+        self.hello_controller = AdaptiveHelloController(self.simulator, my_drone, self.hello_interval)
+        self.enable_beacon_piggyback = 0
+        self.last_beacon_time = -float('inf')
+
+        self.hello_learning_rate = 0.3
+        self.q_estimate_entry_length = 32  # 16-bit destination id and 16-bit quantized Q-value
+
+        self.enable_opportunistic_forwarding = 0
+        self.forwarder = OpportunisticForwarder(self.simulator, my_drone)
+
         self.simulator.env.process(self.broadcast_hello_packet_periodically())
         self.simulator.env.process(self.check_waiting_list())
 
-    def broadcast_hello_packet(self, my_drone):
+    # the flag is kept by the Q-table, which also needs it to choose the neighbors worth exploring
+    @property
+    def enable_hello_q_estimates(self):
+        return self.table.enable_hello_q_estimates
+
+    @enable_hello_q_estimates.setter
+    def enable_hello_q_estimates(self, enable_hello_q_estimates):
+        self.table.enable_hello_q_estimates = enable_hello_q_estimates
+
+    def generate_hello_packet(self, my_drone):
         config.GL_ID_HELLO_PACKET += 1
+
+        if self.enable_hello_q_estimates:
+            q_estimates = self.table.get_q_estimates()
+            hello_packet_length = config.HELLO_PACKET_LENGTH + self.q_estimate_entry_length * len(q_estimates)
+        else:
+            q_estimates = None
+            hello_packet_length = config.HELLO_PACKET_LENGTH
+
         hello_pkd = QRoutingHelloPacket(src_drone=my_drone,
                                         creation_time=self.simulator.env.now,
                                         id_hello_packet=config.GL_ID_HELLO_PACKET,
-                                        hello_packet_length=config.HELLO_PACKET_LENGTH,
-                                        simulator=self.simulator)
+                                        hello_packet_length=hello_packet_length,
+                                        simulator=self.simulator,
+                                        q_estimates=q_estimates)
+        hello_pkd.hello_interval = self.hello_interval
+
+        return hello_pkd
+
+    def broadcast_hello_packet(self, my_drone):
+        hello_pkd = self.generate_hello_packet(my_drone)
         hello_pkd.transmission_mode = 1
 
         logging.info('At time: %s, UAV: %s has hello packet to broadcast',
@@ -84,10 +153,56 @@ class QRouting:
 
     def broadcast_hello_packet_periodically(self):
         while True:
-            self.broadcast_hello_packet(self.my_drone)
+            if self.enable_adaptive_hello:
+                self.table.purge()
+                neighbor_ids = [key for key in self.table.neighbor_table.keys() if key != self.my_drone.identifier]
+                relative_speed = self.table.get_relative_speed()
+                self.hello_interval = self.hello_controller.next_interval(neighbor_ids, relative_speed)
+
+            if self.enable_beacon_piggyback and \
+                    self.simulator.env.now - self.last_beacon_time < self.hello_interval:
+                # my neighbors have overheard a beacon recently, no need for a standalone hello packet
+                self.simulator.metrics.suppressed_hello_num += 1
+            else:
+                self.broadcast_hello_packet(self.my_drone)
+
             jitter = random.randint(1000, 2000)  # delay jitter
             yield self.simulator.env.timeout(self.hello_interval + jitter)
 
+    def piggyback_beacon(self, packet, max_beacon_length=None):
+        """
+        Piggyback my beacon (position, velocity and Q-estimates if enabled) on an outgoing data or ACK frame
+        :param packet: the outgoing frame
+        :param max_beacon_length: for an ACK frame, the beacon must not be longer than the beacon of the data frame
+                                  being acknowledged, otherwise the ACK would arrive after the ACK timeout
+        :return: none
+        """
+
+        beacon = self.generate_hello_packet(self.my_drone)
+
+        if max_beacon_length is not None and beacon.get_payload_length() > max_beacon_length:
+            return
+
+        packet.attach_beacon(beacon)
+
+    # the frame carrying my beacon is transmitted
+    def beacon_sent(self, beacon):
+        self.last_beacon_time = self.simulator.env.now
+        self.simulator.metrics.piggybacked_beacon_num += 1
+
+    def overhear_beacon(self, beacon, src_drone_id):
+        """
+        Refresh the neighbor table (and Q-table) according to a beacon overheard on a data or ACK frame
+        :param beacon: the piggybacked hello packet
+        :param src_drone_id: the sender of the frame
+        :return: none
+        """
+
+        self.table.add_neighbor(beacon, self.simulator.env.now)
+
+        if self.enable_hello_q_estimates and beacon.q_estimates is not None:
+            self.update_q_table_by_hello(beacon, src_drone_id)
+
     def next_hop_selection(self, packet):
         """
         Select the next hop according to the routing protocol
@@ -105,15 +220,56 @@ class QRouting:
         # choose best next hop according to the neighbor table
         packet.intermediate_drones.append(self.my_drone.identifier)
 
-        best_next_hop_id = self.table.best_neighbor(self.my_drone, dst_drone)
+        if isinstance(packet, DataPacket):
+            packet.candidate_list = None  # the candidates are chosen again at each hop
+
+        if self.enable_opportunistic_forwarding and isinstance(packet, DataPacket):
+            ranked_ids, positions = self.table.candidate_neighbors(self.my_drone, dst_drone)
+            if len(ranked_ids) != 0:
+                self.forwarder.set_candidates(packet, ranked_ids, positions)
+                best_next_hop_id = packet.next_hop_id
+            else:
+                best_next_hop_id = self.my_drone.identifier
+        else:
+            best_next_hop_id = self.table.best_neighbor(self.my_drone, dst_drone)
 
         if best_next_hop_id is self.my_drone.identifier:
             has_route = False  # no available next hop
         else:
             packet.next_hop_id = best_next_hop_id  # it has an available next hop drone
 
+            if self.enable_beacon_piggyback and isinstance(packet, DataPacket):
+                self.piggyback_beacon(packet)
+
         return has_route, packet, enquire
 
+    def peek_next_hop(self, packet):
+        """
+        Look up the next hop of a data packet without any side effect, e.g., when the mac protocol scans its queue
+        for frame aggregation. Only the neighbor with the unique minimum Q-value is returned, since exploration and
+        tie-breaking draw random numbers. The next hop selection may still explore another neighbor, in which case
+        the packet is simply selected again later
+        :param packet: the data packet
+        :return: identifier of the next hop, or "None" if it cannot be determined in this way
+        """
+
+        if self.enable_opportunistic_forwarding:
+            return None
+
+        self.table.purge()
+        neighbor_ids = self.table.get_neighbor_ids()
+
+        if len(neighbor_ids) == 0:
+            return None
+
+        q_values = self.table.get_q_values(neighbor_ids, packet.dst_drone.identifier)
+        candidate_of_min_q = neighbor_ids[q_values == q_values.min()]
+
+        if len(candidate_of_min_q) == 1:
+            return int(candidate_of_min_q[0])
+        else:
+            return None
+
     def packet_reception(self, packet, src_drone_id):
         """
         Packet reception at network layer
@@ -129,6 +285,9 @@ class QRouting:
         if isinstance(packet, QRoutingHelloPacket):
             self.table.add_neighbor(packet, current_time)  # update the neighbor table
 
+            if self.enable_hello_q_estimates and packet.q_estimates is not None:
+                self.update_q_table_by_hello(packet, src_drone_id)
+
         elif isinstance(packet, DataPacket):
             packet_copy = copy.copy(packet)
 
@@ -162,18 +321,35 @@ class QRouting:
                                                min_q=min_q,
                                                simulator=self.simulator)
 
-                yield self.simulator.env.timeout(config.SIFS_DURATION)  # switch from receiving to transmitting
+                if packet.candidate_list is not None:
+                    # give way to the candidates of higher priority, my turn includes the SIFS
+                    accepted = yield self.simulator.env.process(self.forwarder.wait_for_priority(packet,
+                                                                                                 src_drone_id))
+                    self.forwarder.address_ack(ack_packet, packet)
+                else:
+                    accepted = True
+                    yield self.simulator.env.timeout(config.SIFS_DURATION)  # switch from receiving to transmitting
 
                 # unicast the ack packet immediately without contention for the channel
-                if not self.my_drone.sleep:
+                if not self.my_drone.sleep and accepted:
+                    if self.enable_beacon_piggyback:
+                        self.piggyback_beacon(ack_packet, max_beacon_length=packet_copy.beacon_length)
+
                     ack_packet.increase_ttl()
                     self.my_drone.mac_protocol.phy.unicast(ack_packet, src_drone_id)
+
                     yield self.simulator.env.timeout(ack_packet.packet_length / config.BIT_RATE * 1e6)
                     self.simulator.drones[src_drone_id].receive()
                 else:
                     pass
             else:
-                if self.my_drone.transmitting_queue.qsize() < self.my_drone.max_queue_size:
+                accepted = True
+                if packet.candidate_list is not None:
+                    # give way to the candidates of higher priority, my turn includes the SIFS
+                    accepted = yield self.simulator.env.process(self.forwarder.wait_for_priority(packet,
+                                                                                                 src_drone_id))
+
+                if accepted and self.my_drone.transmitting_queue.qsize() < self.my_drone.max_queue_size:
                     self.my_drone.transmitting_queue.put(packet_copy)
                     packet_copy.waiting_start_time = self.simulator.env.now  # this packet starts to wait in the queue
 
@@ -194,12 +370,19 @@ class QRouting:
                                                    min_q=min_q,
                                                    simulator=self.simulator)
 
-                    yield self.simulator.env.timeout(config.SIFS_DURATION)  # switch from receiving to transmitting
+                    if packet.candidate_list is not None:
+                        self.forwarder.address_ack(ack_packet, packet)
+                    else:
+                        yield self.simulator.env.timeout(config.SIFS_DURATION)  # switch from receiving to transmitting
 
                     # unicast the ack packet immediately without contention for the channel
                     if not self.my_drone.sleep:
+                        if self.enable_beacon_piggyback:
+                            self.piggyback_beacon(ack_packet, max_beacon_length=packet_copy.beacon_length)
+
                         ack_packet.increase_ttl()
                         self.my_drone.mac_protocol.phy.unicast(ack_packet, src_drone_id)
+
                         yield self.simulator.env.timeout(ack_packet.packet_length / config.BIT_RATE * 1e6)
                         self.simulator.drones[src_drone_id].receive()
                     else:
@@ -207,6 +390,10 @@ class QRouting:
                 else:
                     pass
 
+        elif isinstance(packet, QRoutingAckPacket) and packet.dst_drone is not self.my_drone:
+            # the ACK of another candidate forwarder, which has taken over the packet
+            self.forwarder.overhear_ack(packet.ack_packet.packet_id, packet.dst_drone.identifier)
+
         elif isinstance(packet, QRoutingAckPacket):
             data_packet_acked = packet.ack_packet
             # update Q-table
@@ -246,12 +433,35 @@ class QRouting:
         else:
             f = 0
 
-        self.table.q_table[next_hop_id][dst_drone.identifier] = \
-            (1 - self.learning_rate) * self.table.q_table[next_hop_id][dst_drone.identifier] + \
+        old_q = self.table.get_q_value(next_hop_id, dst_drone.identifier)
+        new_q = (1 - self.learning_rate) * old_q + \
             self.learning_rate * (waiting_time + transmission_delay + (1 - f) * min_q)
+        self.table.set_q_value(next_hop_id, dst_drone.identifier, new_q)
+
+        logging.info('The Q-value of neighbor: %s regarding to destination: %s in UAV: %s is: %s',
+                     next_hop_id, dst_drone.identifier, self.my_drone.identifier, new_q)
+
+    def update_q_table_by_hello(self, packet, neighbor_id):
+        """
+        Batched update of the Q-values of the neighbor according to the estimations carried by its hello packet
+        :param packet: the received hello packet
+        :param neighbor_id: the sender of the hello packet
+        :return: none
+        """
+
+        # nominal delay of delivering a data packet to the neighbor, including the ACK
+        one_hop_delay = (config.DATA_PACKET_LENGTH + config.ACK_PACKET_LENGTH) / config.BIT_RATE * 1e6 + \
+            config.DIFS_DURATION + config.SIFS_DURATION
+
+        for dst_id, estimation in packet.q_estimates.items():
+            if dst_id != self.my_drone.identifier:
+                old_q = self.table.get_q_value(neighbor_id, dst_id)
+                new_q = (1 - self.hello_learning_rate) * old_q + \
+                    self.hello_learning_rate * (one_hop_delay + estimation)
+                self.table.set_q_value(neighbor_id, dst_id, new_q)
 
-        logging.info('The Q-table in UAV: %s is: %s',
-                     self.my_drone.identifier, self.table.q_table)
+        logging.info('At time: %s, UAV: %s updates %s Q-values of neighbor: %s by hello packet',
+                     self.simulator.env.now, self.my_drone.identifier, len(packet.q_estimates), neighbor_id)
 
     def check_waiting_list(self):
         while True:
@@ -1,17 +1,63 @@
 import math
-import random
 import numpy as np
 from collections import defaultdict
+from phy.large_scale_fading import maximum_communication_range
+from utils import config
 
 
 class QRoutingTable:
-    def __init__(self, env, my_drone):
+    """
+    Neighbor table and Q-table of Q-routing
+
+    type of the neighbor table: dictionary
+    the structure of the neighbor table is:
+    {drone1: [coords1, updated time1, velocity1, sampled time1], drone2: [coords2, updated time2, ...], ...}
+    the position and velocity are a snapshot taken by the neighbor when it created the hello packet. When
+    "enable_position_prediction" is set, the positions of all neighbors are extrapolated to the current moment at once,
+    and the neighbors predicted to have left my communication range are not chosen as next hop. The hello packet also
+    announces the hello interval of its sender, and the item is kept alive for at least "life_time_factor" times it
+
+    type of the Q-table: numpy array of shape (n_drones, n_drones), indexed by (neighbor, destination)
+    the Q-value of a (neighbor, destination) pair that has never been updated is "default_q_value", and "q_learned"
+    marks the pairs that have been updated at least once. The Q-values of a group of neighbors regarding to a
+    destination are gathered at once by indexing the column of the destination with the array of neighbor ids
+
+    Attributes:
+        env: simulation environment
+        my_drone: the drone that installed the Q-routing
+        neighbor_table: dictionary in python, records the neighbors
+        default_q_value: initial Q-value of all (neighbor, destination) pairs
+        q_table: numpy array, records the Q-value of each (neighbor, destination) pair
+        q_learned: numpy array, whether the Q-value of each (neighbor, destination) pair has been learned
+        entry_life_time: lifetime of each item in the neighbor table
+        life_time_factor: an item is valid for at least this many hello intervals announced by the neighbor
+        announced_interval: {drone: hello interval announced in its latest hello packet}
+        enable_position_prediction: whether to extrapolate the positions of neighbors according to their velocities
+        max_comm_range: maximum communication range, neighbors predicted beyond this range are not selected
+        rng_exploration: random generator of this drone, used for exploration and tie-breaking
+        enable_hello_q_estimates: whether Q-values are also learned from hello packets, in which case only the
+                                  neighbors without learned Q-value are explored
+
+    Author: Zihao Zhou, eezihaozhou@gmail.com
+    Created at: 2024/8/20
+    Updated at: 2026/10/19
+    """
+
+    def __init__(self, env, my_drone, enable_hello_q_estimates=0):
         self.env = env
         self.my_drone = my_drone
         self.neighbor_table = defaultdict(list)
-        self.q_table = 30000 * np.ones((my_drone.simulator.n_drones, my_drone.simulator.n_drones))  # initialization
+        self.default_q_value = 30000  # initialization
+        self.q_table = np.full((my_drone.simulator.n_drones, my_drone.simulator.n_drones), self.default_q_value,
+                               dtype=float)
+        self.q_learned = np.zeros((my_drone.simulator.n_drones, my_drone.simulator.n_drones), dtype=bool)
         self.entry_life_time = 2.5 * 1e6  # unit: us
-        self.random_sd = self.my_drone.identifier * 1000
+        self.life_time_factor = 2
+        self.announced_interval = dict()
+        self.enable_position_prediction = 0
+        self.max_comm_range = maximum_communication_range()
+        self.rng_exploration = np.random.default_rng(self.my_drone.identifier + self.my_drone.simulator.seed + 2)
+        self.enable_hello_q_estimates = enable_hello_q_estimates
 
     # determine if the neighbor table is empty
     def is_empty(self):
@@ -22,7 +68,7 @@ class QRoutingTable:
         if drone_id not in self.neighbor_table.keys():
             raise RuntimeError('This item is not in the neighbor table')
         else:
-            return self.neighbor_table[drone_id][-1]
+            return self.neighbor_table[drone_id][1]
 
     def add_neighbor(self, hello_packet, cur_time):
         """
@@ -34,17 +80,23 @@ class QRoutingTable:
 
         drone_id = hello_packet.src_drone.identifier
         position = hello_packet.cur_position
+        velocity = hello_packet.cur_velocity
 
-        self.neighbor_table[drone_id] = [position, cur_time]
+        self.neighbor_table[drone_id] = [position, cur_time, velocity, hello_packet.creation_time]
+        self.announced_interval[drone_id] = hello_packet.hello_interval
 
     # delete the specified item
     def remove_neighbor(self, drone_id):
         del self.neighbor_table[drone_id]
 
+    # get the lifetime of certain item
+    def get_entry_life_time(self, drone_id):
+        return max(self.entry_life_time, self.life_time_factor * self.announced_interval.get(drone_id, 0))
+
     # determine whether a certain drone is one's neighbor
     def is_neighbor(self, drone_id):
         if drone_id in self.neighbor_table.keys():
-            if self.get_updated_time(drone_id) + self.entry_life_time > self.env.now:  # valid neighbor
+            if self.get_updated_time(drone_id) + self.get_entry_life_time(drone_id) > self.env.now:  # valid neighbor
                 return True
         else:
             return False
@@ -57,62 +109,160 @@ class QRoutingTable:
 
         for key in list(self.neighbor_table):
             updated_time = self.get_updated_time(key)
-            if updated_time + self.entry_life_time <= self.env.now:  # expired
+            if updated_time + self.get_entry_life_time(key) <= self.env.now:  # expired
                 self.remove_neighbor(key)
 
     # clear neighbor table
     def clear(self):
         self.neighbor_table.clear()
 
+    # get the Q-value of certain neighbor regarding to the destination
+    def get_q_value(self, neighbor_id, dst_drone_id):
+        return float(self.q_table[neighbor_id, dst_drone_id])
+
+    # set the Q-value of certain neighbor regarding to the destination
+    def set_q_value(self, neighbor_id, dst_drone_id, q_value):
+        self.q_table[neighbor_id, dst_drone_id] = q_value
+        self.q_learned[neighbor_id, dst_drone_id] = True
+
+    # get the Q-values of a group of neighbors regarding to the destination
+    def get_q_values(self, neighbor_ids, dst_drone_id):
+        return self.q_table[np.asarray(neighbor_ids, dtype=int), dst_drone_id]
+
+    # get the identifiers of my valid neighbors (excluding myself) as an array
+    def get_neighbor_ids(self):
+        neighbor_ids = np.fromiter(self.neighbor_table.keys(), dtype=int, count=len(self.neighbor_table))
+        neighbor_ids = neighbor_ids[neighbor_ids != self.my_drone.identifier]
+
+        if self.enable_position_prediction and len(neighbor_ids) != 0:
+            neighbor_ids = neighbor_ids[self.predict_in_range(neighbor_ids)]
+
+        return neighbor_ids
+
+    # get the maximum speed of my neighbors relative to me, unit: m/s
+    def get_relative_speed(self):
+        neighbor_ids = np.fromiter(self.neighbor_table.keys(), dtype=int, count=len(self.neighbor_table))
+        neighbor_ids = neighbor_ids[neighbor_ids != self.my_drone.identifier]
+
+        if len(neighbor_ids) == 0:
+            return 0
+
+        velocities = np.array([self.neighbor_table[neighbor_id][2] for neighbor_id in neighbor_ids], dtype=float)
+        my_velocity = [0, 0, 0] if config.STATIC_CASE else self.my_drone.velocity
+        return float(np.max(np.linalg.norm(velocities - np.array(my_velocity), axis=1)))
+
+    def predict_positions(self, neighbor_ids):
+        """
+        Extrapolate the positions of a group of neighbors to the current moment in a vectorized way
+        :param neighbor_ids: identifiers of the neighbors
+        :return: numpy array, the predicted position of each neighbor
+        """
+
+        entries = [self.neighbor_table[neighbor_id] for neighbor_id in neighbor_ids]
+        positions = np.array([entry[0] for entry in entries], dtype=float).reshape(-1, 3)
+        velocities = np.array([entry[2] for entry in entries], dtype=float).reshape(-1, 3)
+        elapsed_time = (self.env.now - np.array([entry[3] for entry in entries], dtype=float)) / 1e6  # unit: s
+
+        return positions + velocities * elapsed_time[:, None]
+
+    # "True" if the neighbor is predicted to be still within my communication range
+    def predict_in_range(self, neighbor_ids):
+        predicted_positions = self.predict_positions(neighbor_ids)
+        distances = np.linalg.norm(predicted_positions - np.array(self.my_drone.coords, dtype=float), axis=1)
+
+        return distances <= self.max_comm_range
+
     # get the minimum Q-value of my neighbors
     def get_min_q_value(self, dst_drone_id):
         self.purge()
 
         min_q = 1e10  # initial value
-        for neighbor in self.neighbor_table.keys():
-            min_q_temp = self.q_table[neighbor][dst_drone_id]
-            if min_q_temp <= min_q:
-                min_q = min_q_temp
+        if not self.is_empty():
+            neighbor_ids = list(self.neighbor_table.keys())
+            min_q = min(min_q, self.get_q_values(neighbor_ids, dst_drone_id).min())
 
         return min_q
 
+    def get_q_estimates(self):
+        """
+        Get my best estimation of the delivery time to each destination, i.e., the minimum Q-value among my neighbors.
+        Only the destinations for which at least one neighbor has a learned Q-value are included
+        :return: a dictionary, {dst1: estimation1, dst2: estimation2, ...}
+        """
+
+        self.purge()
+
+        q_estimates = dict()
+        if not self.is_empty():
+            neighbor_ids = np.fromiter(self.neighbor_table.keys(), dtype=int, count=len(self.neighbor_table))
+
+            learned = self.q_learned[neighbor_ids].any(axis=0)
+            learned[self.my_drone.identifier] = False
+
+            # neighbors without learned Q-value still hold the default value
+            min_q = self.q_table[neighbor_ids].min(axis=0)
+            q_estimates = {int(dst_id): float(min_q[dst_id]) for dst_id in np.flatnonzero(learned)}
+
+        q_estimates[self.my_drone.identifier] = 0  # I am the destination
+
+        return q_estimates
+
     def best_neighbor(self, my_drone, dst_drone):
         """
         Choose the best next hop according to the Q-table
-        :param my_drone: the drone that installed the GPSR
+
+        The Q-values of all neighbors are read into one array, the neighbor with minimum Q-value is selected and ties
+        are broken randomly. Exploration and tie-breaking draw from the drone's own random generator, so that the
+        decisions are reproducible for a given simulation seed and the global random state is not touched
+        :param my_drone: the drone that installed the Q-routing
         :param dst_drone: the destination of the data packet
-        :return: none
+        :return: identifier of the best next hop, or the identifier of myself if there is no neighbor
         """
 
         self.purge()
 
         dst_id = dst_drone.identifier
+        neighbor_ids = self.get_neighbor_ids()
 
-        random.seed(self.random_sd)
+        if len(neighbor_ids) == 0:
+            return my_drone.identifier
 
-        if random.random() < 0.9 * math.pow(0.5, self.env.now / 1e6):
-            best_id = random.choice(list(self.neighbor_table.keys()))
-            self.random_sd += 1
+        if self.enable_hello_q_estimates:
+            # the Q-values piggybacked on hello packets are already learned, only the neighbors whose Q-value
+            # regarding to this destination is still unknown are worth exploring
+            exploration_ids = neighbor_ids[~self.q_learned[neighbor_ids, dst_id]]
         else:
-            best_q_value = 1e10
-            best_id = my_drone.identifier
+            exploration_ids = neighbor_ids
+
+        if len(exploration_ids) != 0 and self.rng_exploration.random() < 0.9 * math.pow(0.5, self.env.now / 1e6):
+            best_id = exploration_ids[self.rng_exploration.integers(len(exploration_ids))]
+        else:
+            q_values = self.get_q_values(neighbor_ids, dst_id)
+            candidate_of_min_q = neighbor_ids[q_values == q_values.min()]
+            best_id = candidate_of_min_q[self.rng_exploration.integers(len(candidate_of_min_q))]
+
+        return int(best_id)
 
-            candidate_of_min_q_list = []
+    def candidate_neighbors(self, my_drone, dst_drone):
+        """
+        Rank the neighbors as candidate forwarders for opportunistic forwarding. The first candidate is chosen by
+        "best_neighbor" so that the exploration is kept, and it is followed by the other neighbors with learned Q-values
+        regarding to the destination, in ascending order of Q-value
+        :param my_drone: the drone that installed the Q-routing
+        :param dst_drone: the destination of the data packet
+        :return: identifiers of the candidates and their (predicted) positions, empty if there is no neighbor
+        """
 
-            for neighbor in self.neighbor_table.keys():
-                if neighbor != self.my_drone.identifier:  # cannot forward the packet to myself
-                    next_hop_q_value = self.q_table[neighbor][dst_id]
-                    if next_hop_q_value <= best_q_value:
-                        best_q_value = next_hop_q_value
+        best_id = self.best_neighbor(my_drone, dst_drone)
 
-            for neighbor in self.neighbor_table.keys():
-                if neighbor != self.my_drone.identifier:
-                    if self.q_table[neighbor][dst_id] == best_q_value:
-                        candidate_of_min_q_list.append(neighbor)
+        if best_id == my_drone.identifier:
+            return np.array([], dtype=int), np.empty((0, 3))
+
+        dst_id = dst_drone.identifier
+        neighbor_ids = self.get_neighbor_ids()
+        neighbor_ids = neighbor_ids[(neighbor_ids != best_id) & self.q_learned[neighbor_ids, dst_id]]
 
-            if len(candidate_of_min_q_list) != 0:
-                random.seed(self.random_sd)
-                best_id = random.choice(candidate_of_min_q_list)
-                self.random_sd += 1
+        q_values = self.get_q_values(neighbor_ids, dst_id)
+        candidate_ids = np.concatenate(([best_id], neighbor_ids[np.argsort(q_values, kind='stable')])).astype(int)
 
-        return best_id
+        return candidate_ids, self.predict_positions(candidate_ids)
@@ -20,6 +20,22 @@ class Metrics:
        calculated and finally averaged
     5. Hop count: used to record the number of router output ports through which the packet should pass.
 
+    Protocol-specific counters are only printed when the corresponding mechanism is active:
+    1. DSDV triggered updates: number of triggered updates sent and suppressed, and number of route advertisements
+       delayed because of settling time
+    2. GRAd broadcast storm mitigation: number of control and data rebroadcasts suppressed
+    3. Greedy perimeter mode: number of packets that entered perimeter mode, and number of face traversals that
+       looped back to the first edge
+    4. Adaptive hello interval: number of hello packets broadcast by each drone and their average interval
+    5. Beacon piggybacking: number of beacons piggybacked on data/ACK frames and standalone hello packets saved
+    6. Opportunistic forwarding: number of candidates that gave way to a candidate of higher priority
+    7. Frame aggregation: number of A-MPDUs sent and the average number of subframes in them
+    8. Rate adaptation: number of unicast data frames sent at each bit rate
+    9. Multi-channel operation: number of times the data radios are tuned to another channel
+    10. TDMA: number of times the slot schedule is computed and the average number of slots in a frame
+    11. Successive interference cancellation: number of packets that could only be decoded after cancelling the
+        stronger packets overlapping with them
+
     References:
         [1] Rani. N, Sharma. P, Sharma. P., "Performance Comparison of Various Routing Protocols in Different Mobility
             Models," in arXiv preprint arXiv:1209.5507, 2012.
@@ -28,7 +44,7 @@ class Metrics:
 
     Author: Zihao Zhou, eezihaozhou@gmail.com
     Created at: 2024/1/11
-    Updated at: 2024/8/31
+    Updated at: 2026/10/18
     """
 
     def __init__(self, simulator):
@@ -53,6 +69,35 @@ class Metrics:
 
         self.collision_num = 0
 
+        self.triggered_update_num = 0
+        self.suppressed_triggered_update_num = 0
+        self.damped_route_num = 0
+
+        self.suppressed_control_rebroadcast_num = 0
+        self.suppressed_data_rebroadcast_num = 0
+
+        self.perimeter_entry_num = 0
+        self.perimeter_loop_num = 0
+
+        self.hello_num_dict = defaultdict(int)  # per drone, only recorded when the adaptive hello interval is enabled
+        self.hello_interval_dict = defaultdict(list)
+
+        self.piggybacked_beacon_num = 0
+        self.suppressed_hello_num = 0
+
+        self.suppressed_forwarder_num = 0
+
+        self.aggregated_frame_num = 0
+        self.aggregated_subframe_num = 0
+
+        self.bit_rate_dict = defaultdict(int)  # only recorded when rate adaptation is enabled
+
+        self.channel_switch_num = 0
+
+        self.tdma_frame_length = []  # number of slots in a frame, recorded each time the TDMA schedule is computed
+
+        self.sic_decoded_num = 0
+
     def print_metrics(self):
         # calculate the average end-to-end delay
         for key in self.deliver_time_dict.keys():
@@ -84,3 +129,47 @@ class Metrics:
         print('Average hop count is: ', hop_cnt)
         print('Collision num is: ', self.collision_num)
         print('Average mac delay is: ', average_mac_delay, 'ms')
+
+        if self.triggered_update_num or self.suppressed_triggered_update_num:
+            print('Triggered update num is: ', self.triggered_update_num,
+                  ', suppressed: ', self.suppressed_triggered_update_num)
+            print('Damped route advertisement num is: ', self.damped_route_num)
+
+        if self.suppressed_control_rebroadcast_num or self.suppressed_data_rebroadcast_num:
+            print('Suppressed rebroadcast num is: ', self.suppressed_control_rebroadcast_num, ' (control), ',
+                  self.suppressed_data_rebroadcast_num, ' (data)')
+
+        if self.perimeter_entry_num:
+            print('Perimeter mode entry num is: ', self.perimeter_entry_num, ', loop: ', self.perimeter_loop_num)
+
+        if self.hello_num_dict:
+            hello_nums = list(self.hello_num_dict.values())
+            hello_intervals = [np.mean(intervals) for intervals in self.hello_interval_dict.values()]
+            print('Hello packet num per drone is: ', np.mean(hello_nums), ' (min: ', min(hello_nums), ', max: ',
+                  max(hello_nums), ')')
+            print('Average hello interval is: ', np.mean(hello_intervals) / 1e3, 'ms')
+
+        if self.piggybacked_beacon_num:
+            print('Piggybacked beacon num is: ', self.piggybacked_beacon_num,
+                  ', suppressed hello num: ', self.suppressed_hello_num)
+
+        if self.suppressed_forwarder_num:
+            print('Suppressed candidate forwarder num is: ', self.suppressed_forwarder_num)
+
+        if self.aggregated_frame_num:
+            print('Aggregated frame num is: ', self.aggregated_frame_num, ', average subframe num: ',
+                  self.aggregated_subframe_num / self.aggregated_frame_num)
+
+        if self.bit_rate_dict:
+            print('Unicast data frame num at each bit rate is: ',
+                  {bit_rate / 1e6: num for bit_rate, num in sorted(self.bit_rate_dict.items())}, ' (Mbps: num)')
+
+        if self.channel_switch_num:
+            print('Channel switch num is: ', self.channel_switch_num)
+
+        if self.tdma_frame_length:
+            print('TDMA schedule computation num is: ', len(self.tdma_frame_length), ', average frame length: ',
+                  np.mean(self.tdma_frame_length), ' slots')
+
+        if self.sic_decoded_num:
+            print('Packet num decoded after interference cancellation is: ', self.sic_decoded_num)
@@ -1,6 +1,8 @@
 import random
 import numpy as np
 from phy.channel import Channel
+from phy.channel_assignment import ChannelAssignment
+from mac.tdma import TdmaSchedule
 from entities.drone import Drone
 from simulator.metrics import Metrics
 from mobility import start_coords
@@ -18,12 +20,14 @@ class Simulator:
         n_drones: number of the drones
         channel_states: a dictionary, used to describe the channel usage
         channel: wireless channel
+        channel_assignment: assigns the data channels of drones in multi-channel operation
+        tdma_schedule: assigns the slots of drones that use TDMA
         metrics: Metrics class, used to record the network performance
         drones: a list, contains all drone instances
 
     Author: Zihao Zhou, eezihaozhou@gmail.com
     Created at: 2024/1/11
-    Updated at: 2024/8/16
+    Updated at: 2026/10/18
     """
 
     def __init__(self,
@@ -57,6 +61,9 @@ class Simulator:
                           inbox=self.channel.create_inbox_for_receiver(i), simulator=self)
             self.drones.append(drone)
 
+        self.channel_assignment = ChannelAssignment(self)
+        self.tdma_schedule = TdmaSchedule(self)
+
         scatter_plot(self)
 
         self.env.process(self.show_performance())
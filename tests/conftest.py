@@ -0,0 +1,58 @@
+import logging
+import os
+import tempfile
+from utils import config
+
+# the modules of the simulator configure the logging to "running_log.log" in the working directory when they are
+# imported, unless it has been configured before, so the tests only log the warnings into a temporary file
+config.LOGGING_LEVEL = logging.WARNING
+logging.basicConfig(filename=os.path.join(tempfile.gettempdir(), 'flynet_tests.log'),
+                    filemode='w',
+                    level=config.LOGGING_LEVEL
+                    )
+
+import matplotlib  # noqa: E402
+matplotlib.use('Agg')  # the simulator plots the initial positions of the drones
+
+import simpy  # noqa: E402
+import pytest  # noqa: E402
+import entities.drone  # noqa: E402
+from entities.packet import DataPacket  # noqa: E402
+from simulator.simulator import Simulator  # noqa: E402
+
+
+@pytest.fixture
+def make_simulator(monkeypatch):
+    def make(mac_class=None, n_drones=4, seed=2024):
+        """
+        Build a small network, nothing happens until the environment runs
+        :param mac_class: the mac protocol installed on all drones, "CsmaCa" if it is not given
+        :param n_drones: number of drones
+        :param seed: seed of the simulation
+        :return: the simulator
+        """
+
+        if mac_class is not None:
+            monkeypatch.setattr(entities.drone, 'CsmaCa', mac_class)
+
+        monkeypatch.setattr(config, 'NUMBER_OF_DRONES', n_drones)  # the destinations of the data packets
+
+        env = simpy.Environment()
+        channel_states = {i: simpy.Resource(env, capacity=1) for i in range(n_drones)}
+
+        return Simulator(seed=seed, env=env, channel_states=channel_states, n_drones=n_drones)
+
+    return make
+
+
+@pytest.fixture
+def make_data_packet():
+    def make(simulator, src_drone, dst_drone, packet_id=1):
+        pkd = DataPacket(src_drone, dst_drone, simulator.env.now, packet_id, config.DATA_PACKET_LENGTH, simulator)
+        pkd.transmission_mode = 0
+        pkd.next_hop_id = dst_drone.identifier
+        pkd.backoff_start_time = simulator.env.now
+
+        return pkd
+
+    return make
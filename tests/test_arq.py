@@ -0,0 +1,28 @@
+import pytest
+from utils import config
+
+
+@pytest.mark.parametrize('enable_blocking', [1, 0])
+def test_rts_failure_on_the_last_attempt_releases_the_frame(make_simulator, make_data_packet, enable_blocking):
+    simulator = make_simulator()
+    drone = simulator.drones[0]
+    drone.enable_blocking = enable_blocking
+    mac = drone.mac_protocol
+
+    # an earlier attempt of the frame is still waiting for its ACK
+    pkd = make_data_packet(simulator, drone, simulator.drones[1])
+    pkd.number_retransmission_attempt[drone.identifier] = 1
+    mac.start_wait_ack(pkd)
+
+    if enable_blocking:
+        assert drone.blocking()
+    else:
+        assert mac.get_outstanding_num(pkd.next_hop_id) == 1
+
+    # the RTS of the last attempt is not answered
+    pkd.number_retransmission_attempt[drone.identifier] = config.MAX_RETRANSMISSION_ATTEMPT
+    mac.handshake_failure(pkd)
+
+    assert not drone.blocking()
+    assert mac.get_outstanding_num() == 0
+    assert len(simulator.metrics.mac_delay) == 1
@@ -0,0 +1,135 @@
+import simpy
+import pytest
+from entities.packet import DataPacket
+from mac.slotted_aloha import SlottedAloha
+from mac.p_persistent_csma import PPersistentCsma
+from phy.phy import Phy
+from utils import config
+
+
+class RecordingPhy(Phy):
+    """
+    Physical layer that only records the transmissions of the drone instead of putting them into the channel
+    """
+
+    def __init__(self, mac, transmissions):
+        super().__init__(mac)
+        self.transmissions = transmissions
+
+    def unicast(self, packet, next_hop_id):
+        self.transmissions.append((self.env.now, self.env.now + packet.get_transmission_time()))
+
+    def broadcast(self, packet):
+        self.transmissions.append((self.env.now, self.env.now + packet.get_transmission_time()))
+
+
+class SaturatedDrone:
+    """
+    Drone whose transmitting queue is never empty, all drones are located at the same point, i.e., they share a
+    single collision domain
+    """
+
+    def __init__(self, node_id, simulator):
+        self.identifier = node_id
+        self.simulator = simulator
+        self.env = simulator.env
+        self.coords = [0, 0, 0]
+        self.enable_blocking = 1
+        self.mac_process_finish = dict()
+        self.mac_protocol = None
+
+    def feed_packet(self, transmission_mode, packet_length):
+        packet_id = 0
+        while True:
+            packet_id += 1
+            pkd = DataPacket(self, None, self.env.now, self.identifier * 1000000 + packet_id, packet_length,
+                             self.simulator)
+            pkd.transmission_mode = transmission_mode
+            pkd.next_hop_id = (self.identifier + 1) % len(self.simulator.drones)
+            pkd.number_retransmission_attempt[self.identifier] += 1
+
+            yield self.env.process(self.mac_protocol.mac_send(pkd))
+
+
+class SingleCollisionDomain:
+    def __init__(self, mac_class, drone_num, seed=2024):
+        self.env = simpy.Environment()
+        self.seed = seed
+        self.channel_states = {i: simpy.Resource(self.env, capacity=1) for i in range(drone_num)}
+        self.transmissions = []
+
+        self.drones = []
+        for i in range(drone_num):
+            drone = SaturatedDrone(i, self)
+            self.drones.append(drone)
+
+        for drone in self.drones:
+            drone.mac_protocol = mac_class(drone)
+            drone.mac_protocol.phy = RecordingPhy(drone.mac_protocol, self.transmissions)
+            drone.mac_protocol.enable_ack = False
+
+    def run(self, transmission_mode, packet_length, duration):
+        for drone in self.drones:
+            self.env.process(drone.feed_packet(transmission_mode, packet_length))
+
+        self.env.run(until=duration)
+
+        return [(start, end) for start, end in self.transmissions if end <= duration]
+
+
+def get_successful_transmissions(transmissions):
+    # a transmission succeeds if it does not overlap with any other transmission
+    transmissions = sorted(transmissions)
+    successful = []
+    busy_until = 0  # the end of the previous transmissions
+    for i, (start, end) in enumerate(transmissions):
+        overlapped = busy_until > start or (i + 1 < len(transmissions) and transmissions[i + 1][0] < end)
+        if not overlapped:
+            successful.append((start, end))
+
+        busy_until = max(busy_until, end)
+
+    return successful
+
+
+@pytest.mark.parametrize('drone_num, broadcast_window', [(10, 20), (20, 40), (20, 20)])
+def test_slotted_aloha_throughput(drone_num, broadcast_window):
+    slot_num = 20000
+    slot_duration = config.ALOHA_SLOT_DURATION
+
+    network = SingleCollisionDomain(SlottedAloha, drone_num)
+    for drone in network.drones:
+        drone.mac_protocol.broadcast_window = broadcast_window
+
+    # the broadcast frames are sent in random slots, thus each slot carries a random number of transmissions
+    transmissions = network.run(1, config.DATA_PACKET_LENGTH, slot_num * slot_duration)
+    successful = get_successful_transmissions(transmissions)
+
+    assert all(start == pytest.approx(round(start / slot_duration) * slot_duration) for start, _ in transmissions)
+
+    offered_load = len(transmissions) / slot_num
+    throughput = len(successful) / slot_num
+
+    assert throughput == pytest.approx(SlottedAloha.analytic_throughput(offered_load), rel=0.1)
+
+
+@pytest.mark.parametrize('drone_num, persistence_probability', [(5, 0.1), (10, 0.05), (20, 0.02)])
+def test_p_persistent_csma_throughput(drone_num, persistence_probability):
+    duration = 1 * 1e6
+
+    network = SingleCollisionDomain(PPersistentCsma, drone_num)
+    for drone in network.drones:
+        drone.mac_protocol.persistence_probability = persistence_probability
+
+    # a frame lasts 10 slots, so that the channel is sensed idle right after the end of a transmission
+    packet_length = 10 * config.SLOT_DURATION * config.BIT_RATE / 1e6
+    transmissions = network.run(0, packet_length, duration)
+    successful = get_successful_transmissions(transmissions)
+
+    transmission_duration = transmissions[0][1] - transmissions[0][0]
+    assert transmission_duration == pytest.approx(10 * config.SLOT_DURATION)
+
+    throughput = sum(end - start for start, end in successful) / duration
+    expected = PPersistentCsma.analytic_throughput(drone_num, persistence_probability, transmission_duration)
+
+    assert throughput == pytest.approx(expected, rel=0.1)
@@ -0,0 +1,34 @@
+import pytest
+from mac.csma_ca import CsmaCa
+from mac.tdma import Tdma
+from mac.slotted_aloha import SlottedAloha
+from mac.p_persistent_csma import PPersistentCsma
+from mac.pure_aloha import PureAloha
+from phy.large_scale_fading import maximum_communication_range
+from utils.util_function import euclidean_distance
+
+
+@pytest.mark.parametrize('mac_class', [CsmaCa, Tdma, SlottedAloha, PPersistentCsma, PureAloha])
+def test_unicast_frame_is_sent_on_the_channel_of_the_next_hop(make_simulator, make_data_packet, mac_class):
+    simulator = make_simulator(mac_class)
+    simulator.channel_assignment.enable_multi_channel = 1
+    simulator.env.run(until=1)
+
+    drone = simulator.drones[0]
+    mac = drone.mac_protocol
+
+    # a neighbor listening to another data channel
+    next_hop = min((other for other in simulator.drones
+                    if other.mac_protocol.phy.data_channel != mac.phy.data_channel),
+                   key=lambda other: euclidean_distance(other.coords, drone.coords))
+    assert euclidean_distance(next_hop.coords, drone.coords) < maximum_communication_range()
+
+    results = []
+    mac.report_ack_result = lambda pkd, success: results.append((pkd.packet_id, success))
+
+    pkd = make_data_packet(simulator, drone, next_hop, packet_id=-1)
+    simulator.env.process(drone.packet_coming(pkd))
+    simulator.env.run(until=simulator.env.now + 0.1 * 1e6)
+
+    assert (-1, True) in results
+    assert mac.phy.tuned_channel == mac.phy.data_channel
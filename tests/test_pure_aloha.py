@@ -0,0 +1,14 @@
+from mac.pure_aloha import PureAloha
+
+
+def test_sliding_window(make_simulator):
+    simulator = make_simulator(PureAloha)
+    for drone in simulator.drones:
+        drone.enable_blocking = 0
+
+    simulator.env.run(until=0.5 * 1e6)
+
+    assert simulator.metrics.datapacket_generated_num > 0
+    assert len(simulator.metrics.datapacket_arrived) > 0
+    assert all(drone.mac_protocol.get_outstanding_num() <= drone.mac_protocol.max_outstanding_num
+               for drone in simulator.drones)
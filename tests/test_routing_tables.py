@@ -0,0 +1,122 @@
+import random
+from types import SimpleNamespace
+import numpy as np
+import pytest
+import simpy
+from routing.dsdv.dsdv_routing_table import DsdvRoutingTable
+from routing.dsdv.dsdv_array_routing_table import DsdvArrayRoutingTable
+from routing.q_routing.q_routing_table import QRoutingTable
+
+
+class DictQTable:
+    """
+    Q-table stored in a dictionary {(neighbor, dst): q_value}, the reference of the array-backed Q-table
+    """
+
+    def __init__(self, default_q_value):
+        self.q_table = dict()
+        self.default_q_value = default_q_value
+
+    def set_q_value(self, neighbor_id, dst_drone_id, q_value):
+        self.q_table[(neighbor_id, dst_drone_id)] = q_value
+
+    def get_q_values(self, neighbor_ids, dst_drone_id):
+        return np.array([self.q_table.get((neighbor_id, dst_drone_id), self.default_q_value)
+                         for neighbor_id in neighbor_ids], dtype=float)
+
+
+def make_hello_packets(src_drone, n_drones, rng):
+    """
+    Build the same advertisement of a neighbor in the format of both DSDV routing tables
+    :return: hello packet carrying a dictionary, and hello packet carrying the (metric, seq_num) arrays
+    """
+
+    table = dict()
+    adv_metric = np.full(n_drones, np.inf)
+    adv_seq_num = np.full(n_drones, -1, dtype=int)
+
+    for dst_id in range(n_drones):
+        if dst_id == src_drone.identifier:
+            metric, seq_num = 0, dst_id * 2 + 2 * rng.randint(0, 5)
+        elif rng.random() < 0.6:
+            seq_num = dst_id * 2 + rng.randint(0, 10)
+            metric = float('inf') if seq_num % 2 else rng.randint(1, 4)  # odd sequence number means broken
+        else:
+            continue
+
+        table[dst_id] = [src_drone.identifier, metric, seq_num, 0]
+        adv_metric[dst_id] = metric
+        adv_seq_num[dst_id] = seq_num
+
+    dict_packet = SimpleNamespace(src_drone=src_drone, hello_interval=0.5 * 1e6, routing_table=table)
+    array_packet = SimpleNamespace(src_drone=src_drone, hello_interval=0.5 * 1e6,
+                                   routing_table=(adv_metric, adv_seq_num))
+
+    return dict_packet, array_packet
+
+
+def test_dsdv_array_table_matches_dict_table(make_simulator):
+    n_drones = 8
+    simulator = make_simulator(n_drones=n_drones)
+    my_drone = simulator.drones[0]
+
+    env = simpy.Environment()
+    dict_table = DsdvRoutingTable(env, my_drone)
+    array_table = DsdvArrayRoutingTable(env, my_drone)
+    rng = random.Random(2024)
+
+    for _ in range(200):
+        env.run(until=env.now + rng.randint(1, 400) * 1e3)
+
+        if rng.random() < 0.2:
+            assert dict_table.purge() == array_table.purge()
+        else:
+            src_drone = simulator.drones[rng.randint(1, n_drones - 1)]
+            link_cost = rng.choice([1, 1.5])
+            dict_packet, array_packet = make_hello_packets(src_drone, n_drones, rng)
+
+            dict_table.update_item(dict_packet, env.now, link_cost)
+            array_table.update_item(array_packet, env.now, link_cost)
+
+        for dst_id in range(n_drones):
+            assert dict_table.has_entry(dst_id) == array_table.has_entry(dst_id)
+
+            if dst_id in dict_table.routing_table.keys():
+                assert dict_table.routing_table[dst_id][1] == array_table.metric[dst_id]
+                assert dict_table.routing_table[dst_id][2] == array_table.seq_num[dst_id]
+                assert dict_table.settling_time[dst_id] == pytest.approx(array_table.settling_time[dst_id])
+            else:
+                assert array_table.seq_num[dst_id] == -1
+
+        assert sorted(dict_table.get_neighbor_ids()) == sorted(array_table.get_neighbor_ids())
+
+
+def test_q_table_matches_dict_table(make_simulator):
+    n_drones = 8
+    simulator = make_simulator(n_drones=n_drones)
+    my_drone = simulator.drones[0]
+
+    # exploration is negligible this late, so that the best neighbor is the one with minimum Q-value
+    env = simpy.Environment(initial_time=100 * 1e6)
+    table = QRoutingTable(env, my_drone)
+    reference = DictQTable(table.default_q_value)
+    rng = random.Random(2024)
+
+    neighbor_ids = list(range(1, n_drones))
+    for neighbor_id in neighbor_ids:
+        table.neighbor_table[neighbor_id] = [simulator.drones[neighbor_id].coords, env.now, [0, 0, 0], env.now]
+
+    for _ in range(100):
+        neighbor_id = rng.choice(neighbor_ids)
+        dst_id = rng.randint(0, n_drones - 1)
+        q_value = rng.uniform(0, 2 * table.default_q_value)
+
+        table.set_q_value(neighbor_id, dst_id, q_value)
+        reference.set_q_value(neighbor_id, dst_id, q_value)
+
+        for dst_id in range(n_drones):
+            expected = reference.get_q_values(neighbor_ids, dst_id)
+            assert table.get_q_values(neighbor_ids, dst_id) == pytest.approx(expected)
+
+            best_neighbor = table.best_neighbor(my_drone, simulator.drones[dst_id])
+            assert expected[neighbor_ids.index(best_neighbor)] == expected.min()
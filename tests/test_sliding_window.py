@@ -0,0 +1,32 @@
+from entities.packet import DataPacket
+
+
+def test_full_window_does_not_block_other_next_hops(make_simulator, make_data_packet, monkeypatch):
+    simulator = make_simulator()
+    drone = simulator.drones[0]
+    drone.enable_blocking = 0
+    mac = drone.mac_protocol
+
+    # the window towards drone 1 is full
+    for i in range(mac.window_size):
+        mac.outstanding_frames['wait_ack_test_' + str(i)] = 1
+
+    sent = []
+
+    def packet_coming(pkd):
+        if isinstance(pkd, DataPacket):
+            sent.append(pkd.packet_id)
+        yield simulator.env.timeout(0)
+
+    monkeypatch.setattr(drone.routing_protocol, 'next_hop_selection', lambda packet: (True, packet, False))
+    monkeypatch.setattr(drone, 'packet_coming', packet_coming)
+
+    drone.transmitting_queue.put(make_data_packet(simulator, drone, simulator.drones[1], packet_id=-1))
+    drone.transmitting_queue.put(make_data_packet(simulator, drone, simulator.drones[2], packet_id=-2))
+
+    simulator.env.run(until=1000)
+    assert sent == [-2]
+
+    mac.release_frame('wait_ack_test_0')
+    simulator.env.run(until=2000)
+    assert sent == [-2, -1]
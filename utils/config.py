@@ -56,6 +56,11 @@ DATA_PACKET_LENGTH = IP_HEADER_LENGTH + MAC_HEADER_LENGTH + PHY_HEADER_LENGTH +
 
 ACK_PACKET_LENGTH = ACK_HEADER_LENGTH + 14 * 8  # bit
 
+RTS_PACKET_LENGTH = ACK_HEADER_LENGTH + 20 * 8  # bit, control frames share the header of ACK packet
+CTS_PACKET_LENGTH = ACK_HEADER_LENGTH + 14 * 8  # bit
+BLOCK_ACK_PACKET_LENGTH = ACK_HEADER_LENGTH + 32 * 8  # bit, compressed bitmap
+AMPDU_DELIMITER_LENGTH = 4 * 8  # bit, precedes each subframe of an A-MPDU
+
 HELLO_PACKET_PAYLOAD_LENGTH = 256  # bit
 HELLO_PACKET_LENGTH = IP_HEADER_LENGTH + MAC_HEADER_LENGTH + PHY_HEADER_LENGTH + HELLO_PACKET_PAYLOAD_LENGTH
 
@@ -65,13 +70,23 @@ GL_ID_ACK_PACKET = 20000
 GL_ID_VF_PACKET = 30000
 GL_ID_GRAD_MESSAGE = 40000
 GL_ID_CHIRP_PACKET = 50000
+GL_ID_RTS_PACKET = 60000
+GL_ID_CTS_PACKET = 70000
+GL_ID_AGGREGATED_PACKET = 80000
 
 # ------------------ physical layer parameters ------------------- #
 BIT_RATE = IEEE_802_11['bit_rate']
 BIT_TRANSMISSION_TIME = 1/BIT_RATE * 1e6
 BANDWIDTH = IEEE_802_11['bandwidth']
+# SINR thresholds of the bit rates of IEEE 802.11b, in dB, the threshold of the default bit rate is "SNR_THRESHOLD"
+SNR_THRESHOLD_OF_BIT_RATE = {1 * 1e6: 4, 2 * 1e6: SNR_THRESHOLD, 5.5 * 1e6: 8, 11 * 1e6: 10}
 SENSING_RANGE = 600  # in meter, defines the area where a sending node can disturb a transmission from a third node
 
+# channels used in multi-channel operation, only channels 1, 6 and 11 of IEEE 802.11b are non-overlapping
+CONTROL_CHANNEL = 1  # common channel, on which all broadcast frames are sent
+DATA_CHANNELS = [6, 11]  # channels on which unicast frames are sent
+CHANNEL_SWITCHING_TIME = 100  # us, the time needed to tune the radio to another channel
+
 # --------------------- mac layer parameters --------------------- #
 SLOT_DURATION = IEEE_802_11['slot_duration']
 SIFS_DURATION = IEEE_802_11['SIFS']
@@ -79,3 +94,14 @@ DIFS_DURATION = SIFS_DURATION + (2 * SLOT_DURATION)
 CW_MIN = 201  # initial contention window size
 ACK_TIMEOUT = ACK_PACKET_LENGTH / BIT_RATE * 1e6 + SIFS_DURATION + 50  # maximum waiting time for ACK (0.1 s)
 MAX_RETRANSMISSION_ATTEMPT = 5
+RTS_THRESHOLD = 500 * 8  # bit, only the unicast frames not shorter than it are preceded by RTS/CTS (if enabled)
+CTS_TIMEOUT = CTS_PACKET_LENGTH / BIT_RATE * 1e6 + SIFS_DURATION + 50  # maximum waiting time for CTS
+
+# ---------------------- TDMA parameters ------------------------ #
+TDMA_GUARD_TIME = 2 * SLOT_DURATION  # us, separates two adjacent slots
+# us, a slot accommodates a data packet and its ACK (both may carry a piggybacked beacon)
+TDMA_SLOT_DURATION = ((DATA_PACKET_LENGTH + ACK_PACKET_LENGTH + 2 * HELLO_PACKET_PAYLOAD_LENGTH) / BIT_RATE * 1e6 +
+                      SIFS_DURATION + TDMA_GUARD_TIME)
+
+# ------------------- slotted ALOHA parameters ------------------ #
+ALOHA_SLOT_DURATION = TDMA_SLOT_DURATION  # us, a slot accommodates a data packet and its ACK
@@ -28,20 +28,50 @@ def has_intersection(interval1, interval2):
     return False
 
 
-def check_channel_availability(channel_states, sender_drone, drones):
+def check_channel_availability(channel_states, sender_drone, drones, channel=None):
     """
     Check if the channel is busy or idle
     :param channel_states: a dictionary, indicates the use of the channel by different drones
     :param sender_drone: the drone that is about to send packet
     :param drones: a list, which contains all the drones in the simulation
+    :param channel: only the drones transmitting on this channel are sensed, all drones are sensed if it is "None"
     :return: if the channel is busy, return "False", else, return "True"
     """
 
     for node_id in channel_states.keys():
         if len(channel_states[node_id].users) != 0:
+            if channel is not None and drones[node_id].mac_protocol.phy.transmitting_channel != channel:
+                continue
+
             if node_id != sender_drone.identifier:
                 d = euclidean_distance(sender_drone.coords, drones[node_id].coords)
                 if d < config.SENSING_RANGE:
                     return False
 
     return True
+
+
+def segment_intersection(p1, p2, q1, q2):
+    """
+    Calculate the intersection of two line segments projected on the horizontal (x-y) plane
+    :param p1: one end of the first segment
+    :param p2: the other end of the first segment
+    :param q1: one end of the second segment
+    :param q2: the other end of the second segment
+    :return: the intersection [x, y], or "None" if the two segments do not cross each other
+    """
+
+    r = (p2[0] - p1[0], p2[1] - p1[1])
+    s = (q2[0] - q1[0], q2[1] - q1[1])
+    denominator = r[0] * s[1] - r[1] * s[0]
+
+    if abs(denominator) < 1e-12:  # parallel or collinear
+        return None
+
+    t = ((q1[0] - p1[0]) * s[1] - (q1[1] - p1[1]) * s[0]) / denominator
+    u = ((q1[0] - p1[0]) * r[1] - (q1[1] - p1[1]) * r[0]) / denominator
+
+    if 0 < t < 1 and 0 <= u <= 1:
+        return [p1[0] + t * r[0], p1[1] + t * r[1]]
+    else:
+        return None